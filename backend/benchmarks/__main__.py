@@ -0,0 +1,146 @@
+import argparse
+import asyncio
+import platform
+import sys
+import time
+from pathlib import Path
+
+import httpx
+
+from backend.benchmarks.baseline import compare, format_report, load_baseline, save_baseline
+from backend.benchmarks.runner import (
+    SCENARIOS,
+    app_client,
+    create_engine,
+    load_context,
+    run_scenario,
+    use_storage,
+)
+from backend.benchmarks.seed import PROFILES, seed
+from backend.src.services.storage import get_storage
+from backend.src.types.date import utc_now
+
+DATA_PATH = Path(__file__).parent / ".data"
+DEFAULT_DATABASE_URL = f"sqlite+aiosqlite:///{DATA_PATH / 'bench.db'}"
+
+
+async def seed_command(args: argparse.Namespace) -> int:
+    scale = PROFILES[args.profile]
+    use_storage(args.storage_path)
+    engine = create_engine(args.database_url, concurrency=1)
+    started = time.perf_counter()
+    try:
+        await seed(engine, get_storage(), scale, args.seed)
+    finally:
+        await engine.dispose()
+    print(
+        f"Seeded {scale.users} users, {scale.workspaces} workspaces and {scale.files} files "
+        f"in {time.perf_counter() - started:.1f}s"
+    )
+    return 0
+
+
+async def run_command(args: argparse.Namespace) -> int:
+    use_storage(args.storage_path)
+    engine = create_engine(args.database_url, args.concurrency)
+    try:
+        context = await load_context(engine, args.users)
+        if args.base_url:
+            client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+        else:
+            client = app_client(engine)
+        results = {}
+        async with client:
+            for name in args.scenarios:
+                result = await run_scenario(
+                    client, name, context, args.requests, args.concurrency, args.warmup
+                )
+                results[name] = result.summary()
+    finally:
+        await engine.dispose()
+
+    print(format_report(results))
+
+    if args.save_baseline:
+        save_baseline(
+            args.save_baseline,
+            results,
+            {
+                "profile": args.profile,
+                "database": engine.dialect.name,
+                "target": args.base_url or "in-process",
+                "requests": args.requests,
+                "concurrency": args.concurrency,
+                "python": platform.python_version(),
+                "machine": platform.machine(),
+                "recorded_at": utc_now().isoformat(),
+            },
+        )
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        regressions = compare(load_baseline(args.baseline), results, args.latency_tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            return 1
+        print(f"No regression against {args.baseline}")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.benchmarks", description="Seed and load-test the Data Room API"
+    )
+    parser.add_argument(
+        "--database-url",
+        default=DEFAULT_DATABASE_URL,
+        help="Database dedicated to benchmarks; seeding wipes it (default: a local SQLite file)",
+    )
+    parser.add_argument(
+        "--storage-path",
+        type=Path,
+        default=DATA_PATH / "storage",
+        help="Directory of the local storage backend",
+    )
+    parser.add_argument("--profile", choices=PROFILES, default="ci", help="Data set size")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Generate the data set")
+    seed_parser.add_argument("--seed", type=int, default=0, help="Random generator seed")
+    seed_parser.set_defaults(handler=seed_command)
+
+    run_parser = commands.add_parser("run", help="Load-test the API on the seeded data set")
+    run_parser.add_argument(
+        "--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS), metavar="SCENARIO"
+    )
+    run_parser.add_argument("--requests", type=int, default=500, help="Requests per scenario")
+    run_parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight")
+    run_parser.add_argument("--warmup", type=int, default=20, help="Unmeasured requests first")
+    run_parser.add_argument("--users", type=int, default=50, help="Distinct users to act as")
+    run_parser.add_argument(
+        "--base-url",
+        help="Load-test a running server instead of the app in this process; it must use the "
+        "same database, storage and SECRET_KEY",
+    )
+    run_parser.add_argument("--save-baseline", type=Path, help="Write the results to this file")
+    run_parser.add_argument("--baseline", type=Path, help="Fail on regressions against this file")
+    run_parser.add_argument(
+        "--latency-tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed relative slowdown before latency or throughput count as regressed",
+    )
+    run_parser.set_defaults(handler=run_command)
+    return parser
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    if args.database_url == DEFAULT_DATABASE_URL:
+        DATA_PATH.mkdir(parents=True, exist_ok=True)
+    return asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+import json
+from pathlib import Path
+
+Summary = dict[str, float | int | None]
+
+# Averages move by a few hundredths with the order requests hit caches; one more query per
+# request moves them by 1
+QUERY_TOLERANCE = 0.1
+
+
+def format_report(results: dict[str, Summary]) -> str:
+    """Render scenario summaries as an aligned text table"""
+    columns = (
+        "requests",
+        "errors",
+        "throughput_rps",
+        "p50_ms",
+        "p95_ms",
+        "p99_ms",
+        "queries_per_request",
+    )
+    rows = [("scenario", *columns)]
+    for name, summary in results.items():
+        rows.append(
+            (name, *("-" if summary[key] is None else str(summary[key]) for key in columns))
+        )
+    widths = [max(len(row[index]) for row in rows) for index in range(len(rows[0]))]
+    return "\n".join(
+        "  ".join(cell.ljust(width) for cell, width in zip(row, widths, strict=True)).rstrip()
+        for row in rows
+    )
+
+
+def save_baseline(path: Path, results: dict[str, Summary], metadata: dict) -> None:
+    """Write the summaries of a run, and how it was run, as a JSON baseline"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"metadata": metadata, "results": results}, indent=2) + "\n")
+
+
+def load_baseline(path: Path) -> dict[str, Summary]:
+    """Read the scenario summaries of a JSON baseline"""
+    return json.loads(path.read_text())["results"]
+
+
+def compare(
+    baseline: dict[str, Summary], results: dict[str, Summary], latency_tolerance: float
+) -> list[str]:
+    """Find the scenarios that got worse than their baseline
+
+    Query counts barely vary between runs, so any real increase is a regression. Latency and throughput
+    vary between runs and machines, so they only regress beyond `latency_tolerance`.
+
+    Args:
+        baseline: Summaries of the reference run
+        results: Summaries of the current run
+        latency_tolerance: Allowed relative slowdown, e.g. 0.25 for 25%
+
+    Returns:
+        list[str]: One description per regression, empty if there is none
+    """
+    regressions = []
+    for name, reference in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if current["errors"] and not reference["errors"]:
+            regressions.append(f"{name}: {current['errors']} failed requests")
+        before, after = reference["queries_per_request"], current["queries_per_request"]
+        if before is not None and after is not None and after > before + QUERY_TOLERANCE:
+            regressions.append(f"{name}: queries per request went from {before} to {after}")
+        for key in ("p95_ms", "p99_ms"):
+            if current[key] > reference[key] * (1 + latency_tolerance):
+                regressions.append(f"{name}: {key} went from {reference[key]} to {current[key]}")
+        minimum = reference["throughput_rps"] / (1 + latency_tolerance)
+        if current["throughput_rps"] < minimum:
+            regressions.append(
+                f"{name}: throughput went from {reference['throughput_rps']} "
+                f"to {current['throughput_rps']} requests/s"
+            )
+    return regressions
@@ -0,0 +1,282 @@
+import asyncio
+import random
+import re
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+
+import httpx
+import jwt
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import col, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.asgi import app
+from backend.src.config.settings import app_settings
+from backend.src.database.instrumentation import TimedQueuePool, instrument_engine
+from backend.src.database.session import get_read_session, get_session, open_session
+from backend.src.models.file import File
+from backend.src.models.user import User
+from backend.src.models.workspace import WorkspaceMember
+from backend.src.services.storage import get_storage
+from backend.src.types.date import utc_now
+from backend.src.types.roles import RoleEnum
+
+# Query count the metrics middleware reports, e.g. `db;desc="3 queries";dur=1.2`
+DB_QUERIES = re.compile(r'db;desc="(\d+) queries"')
+UPLOAD_SIZE = 64 * 1024
+
+
+def create_engine(url: str, concurrency: int) -> AsyncEngine:
+    """Create an engine sized for the benchmark, counting queries like the app's engines"""
+    # SQLite serializes writers; wait for the lock like Postgres would wait on row locks
+    connect_args = {"timeout": 30} if url.startswith("sqlite") else {}
+    engine = create_async_engine(
+        url,
+        connect_args=connect_args,
+        poolclass=TimedQueuePool,
+        pool_logging_name="primary",
+        pool_size=concurrency,
+        # A request can hold two connections, e.g. a permission check and a read session
+        max_overflow=concurrency,
+    )
+    instrument_engine(engine, "primary")
+    return engine
+
+
+def use_storage(path: Path) -> None:
+    """Point the local storage backend at the benchmark's files"""
+    app_settings.STORAGE_BASE_PATH = path
+    get_storage.cache_clear()
+
+
+def app_client(engine: AsyncEngine) -> httpx.AsyncClient:
+    """Client calling the app in this process, with its sessions on the benchmark database"""
+
+    async def get_session_override(request: Request):
+        async with open_session(engine, None, request.state) as session:
+            yield session
+
+    async def get_read_session_override(request: Request):
+        async with open_session(engine, None, request.state, read_only=True) as session:
+            yield session
+
+    app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_read_session_override
+    # Unhandled errors become 500 responses, counted as failed requests like on a server
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    return httpx.AsyncClient(transport=transport, base_url="http://benchmark")
+
+
+@dataclass
+class VirtualUser:
+    """Authenticated user the load is generated for, with the objects it may access"""
+
+    headers: dict[str, str]
+    workspace_ids: list[int]
+    # (workspace id, file id) of files in workspaces the user is a member of
+    files: list[tuple[int, int]]
+
+
+@dataclass
+class Context:
+    """Everything a scenario needs to build its requests"""
+
+    users: list[VirtualUser]
+    rng: random.Random = field(default_factory=lambda: random.Random(0))
+
+    def pick(self) -> VirtualUser:
+        return self.rng.choice(self.users)
+
+
+Scenario = Callable[[httpx.AsyncClient, Context, int], Awaitable[httpx.Response]]
+
+
+async def current_user(client: httpx.AsyncClient, context: Context, index: int) -> httpx.Response:
+    return await client.get("/api/auth/me", headers=context.pick().headers)
+
+
+async def list_workspaces(
+    client: httpx.AsyncClient, context: Context, index: int
+) -> httpx.Response:
+    return await client.get("/api/workspaces/", headers=context.pick().headers)
+
+
+async def list_files(client: httpx.AsyncClient, context: Context, index: int) -> httpx.Response:
+    user = context.pick()
+    workspace_id = context.rng.choice(user.workspace_ids)
+    return await client.get(f"/api/workspaces/{workspace_id}/files/", headers=user.headers)
+
+
+async def upload(client: httpx.AsyncClient, context: Context, index: int) -> httpx.Response:
+    user = context.pick()
+    workspace_id = context.rng.choice(user.workspace_ids)
+    # Unique content, so every upload stores a new blob instead of only adding a reference
+    content = index.to_bytes(8) + context.rng.randbytes(UPLOAD_SIZE - 8)
+    return await client.post(
+        f"/api/workspaces/{workspace_id}/files/import/google-drive",
+        files={"file": (f"upload-{index}.bin", content, "application/octet-stream")},
+        headers=user.headers,
+    )
+
+
+async def download(client: httpx.AsyncClient, context: Context, index: int) -> httpx.Response:
+    user = context.pick()
+    workspace_id, file_id = context.rng.choice(user.files)
+    return await client.get(
+        f"/api/workspaces/{workspace_id}/files/{file_id}/download", headers=user.headers
+    )
+
+
+SCENARIOS: dict[str, Scenario] = {
+    "current_user": current_user,
+    "list_workspaces": list_workspaces,
+    "list_files": list_files,
+    "upload": upload,
+    "download": download,
+}
+
+
+def access_token(user_id: int, email: str) -> str:
+    """Sign an access token like the login route does, valid for the whole run"""
+    return jwt.encode(
+        {"sub": str(user_id), "email": email, "exp": utc_now() + timedelta(hours=1)},
+        app_settings.SECRET_KEY.get_secret_value(),
+        algorithm=app_settings.ALGORITHM,
+    )
+
+
+async def load_context(engine: AsyncEngine, users: int, files_per_user: int = 20) -> Context:
+    """Pick the users to generate load for among the seeded ones
+
+    Only memberships allowing uploads are kept, so every scenario can use any of them.
+
+    Args:
+        engine: Engine of the seeded database
+        users: Number of distinct users to spread the requests over
+        files_per_user: Files sampled from each user's workspaces for downloads
+    """
+    context = Context(users=[])
+    async with AsyncSession(engine) as session:
+        rows = await session.exec(select(User.id, User.email).order_by(User.id).limit(users))
+        for user_id, email in rows.all():
+            workspace_ids = list(
+                await session.exec(
+                    select(WorkspaceMember.workspace_id).where(
+                        WorkspaceMember.user_id == user_id,
+                        col(WorkspaceMember.role).in_([RoleEnum.ADMIN, RoleEnum.USER]),
+                    )
+                )
+            )
+            if not workspace_ids:
+                continue
+            files = await session.exec(
+                select(File.workspace_id, File.id)
+                .where(col(File.workspace_id).in_(workspace_ids))
+                .order_by(func.random())
+                .limit(files_per_user)
+            )
+            context.users.append(
+                VirtualUser(
+                    headers={"Authorization": f"Bearer {access_token(user_id, email)}"},
+                    workspace_ids=workspace_ids,
+                    files=[tuple(row) for row in files.all()],
+                )
+            )
+    if not context.users:
+        raise RuntimeError("No seeded user is a member of a workspace, seed the database first")
+    return context
+
+
+@dataclass
+class Sample:
+    latency: float
+    status_code: int
+    queries: int | None
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Value below which `fraction` of the sorted `values` fall, by nearest rank"""
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, round(fraction * len(values)) - 1))
+    return values[rank]
+
+
+@dataclass
+class ScenarioResult:
+    """Measurements of one scenario run"""
+
+    name: str
+    concurrency: int
+    duration: float
+    samples: list[Sample]
+
+    def summary(self) -> dict[str, float | int | None]:
+        """Throughput, latency percentiles in milliseconds and queries per request"""
+        latencies = sorted(sample.latency * 1000 for sample in self.samples)
+        queries = [sample.queries for sample in self.samples if sample.queries is not None]
+        errors = sum(1 for sample in self.samples if sample.status_code >= 400)
+        return {
+            "requests": len(self.samples),
+            "errors": errors,
+            "concurrency": self.concurrency,
+            "throughput_rps": round(len(self.samples) / self.duration, 1) if self.duration else 0,
+            "p50_ms": round(percentile(latencies, 0.50), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+            "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+        }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    context: Context,
+    requests: int,
+    concurrency: int,
+    warmup: int = 0,
+) -> ScenarioResult:
+    """Send requests of one scenario with a fixed number of them in flight
+
+    Each of the `concurrency` workers sends its next request as soon as the previous one is
+    answered (a closed loop), so throughput is what the app sustains at that concurrency.
+
+    Args:
+        client: Client sending the requests to the app
+        name: Key of the scenario in SCENARIOS
+        context: Users to send the requests as
+        requests: Number of measured requests
+        concurrency: Number of requests in flight at any time
+        warmup: Requests sent before measuring, to fill pools and caches
+
+    Returns:
+        ScenarioResult: Latency, status and query count of every measured request
+    """
+    scenario = SCENARIOS[name]
+    for index in range(warmup):
+        await scenario(client, context, requests + index)
+
+    samples: list[Sample] = []
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        for index in counter:
+            started = time.perf_counter()
+            response = await scenario(client, context, index)
+            await response.aread()
+            latency = time.perf_counter() - started
+            match = DB_QUERIES.search(response.headers.get("server-timing", ""))
+            samples.append(
+                Sample(latency, response.status_code, int(match.group(1)) if match else None)
+            )
+
+    started = time.perf_counter()
+    async with asyncio.TaskGroup() as group:
+        for _ in range(concurrency):
+            group.create_task(worker())
+    return ScenarioResult(name, concurrency, time.perf_counter() - started, samples)
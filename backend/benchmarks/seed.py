@@ -0,0 +1,202 @@
+import hashlib
+import random
+from collections.abc import AsyncIterator, Iterable, Iterator
+from dataclasses import dataclass
+from datetime import timedelta
+from itertools import islice
+
+from sqlalchemy import Table, insert, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlmodel import SQLModel
+
+from backend.src.models.blob import Blob
+from backend.src.models.file import File
+from backend.src.models.user import User
+from backend.src.models.workspace import Workspace, WorkspaceMember
+from backend.src.services.blobs import blob_key
+from backend.src.services.storage import StorageBackend
+from backend.src.types.date import utc_now
+from backend.src.types.roles import RoleEnum
+
+INSERT_BATCH_SIZE = 5_000
+# Distinct file contents; files share them like duplicated documents share blobs
+BLOB_SIZES = (4 * 1024, 16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024)
+BLOBS_PER_SIZE = 4
+MIME_TYPES = ("application/pdf", "image/png", "text/plain", "application/zip")
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Size of the seeded data set
+
+    Args:
+        workspaces: Number of workspaces
+        files_per_workspace: Files in each workspace
+        members_per_workspace: Members of each workspace, the first one being its admin
+        users: Users the memberships are drawn from
+    """
+
+    workspaces: int
+    files_per_workspace: int
+    members_per_workspace: int
+    users: int
+
+    @property
+    def files(self) -> int:
+        return self.workspaces * self.files_per_workspace
+
+
+PROFILES = {
+    # 10k workspaces, 1M files, 50 members each: a large production tenant
+    "full": Scale(
+        workspaces=10_000, files_per_workspace=100, members_per_workspace=50, users=5_000
+    ),
+    # Small enough to seed and run in a minute on SQLite, for CI
+    "ci": Scale(workspaces=200, files_per_workspace=50, members_per_workspace=10, users=200),
+}
+
+
+def _batches(rows: Iterable[dict], size: int = INSERT_BATCH_SIZE) -> Iterator[list[dict]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+async def _insert(connection: AsyncConnection, table: Table, rows: Iterable[dict]) -> None:
+    for batch in _batches(rows):
+        await connection.execute(insert(table), batch)
+
+
+async def _content(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+
+async def _store_blobs(storage: StorageBackend, rng: random.Random) -> list[tuple[str, int]]:
+    # Written straight to their keys: the tables are recreated afterwards, and no garbage
+    # collection runs meanwhile
+    blobs = []
+    for size in BLOB_SIZES:
+        for _ in range(BLOBS_PER_SIZE):
+            data = rng.randbytes(size)
+            digest = hashlib.sha256(data).hexdigest()
+            await storage.write(blob_key(digest), _content(data))
+            blobs.append((digest, size))
+    return blobs
+
+
+async def seed(engine: AsyncEngine, storage: StorageBackend, scale: Scale, seed: int = 0) -> None:
+    """Replace the content of a database with a generated data set
+
+    Every table is dropped and recreated, then filled with bulk inserts, so this must only be
+    pointed at a database dedicated to benchmarks. Ids are assigned explicitly and the data is
+    derived from `seed`, so two runs at the same scale produce the same data set. The schema
+    is the one of the imported models, so the app must be imported first to get all tables.
+
+    Args:
+        engine: Engine of the benchmark database
+        storage: Storage the file contents are written to
+        scale: Size of the data set
+        seed: Seed of the random generator
+    """
+    rng = random.Random(seed)
+    blobs = await _store_blobs(storage, rng)
+    now = utc_now()
+
+    file_blobs = [rng.randrange(len(blobs)) for _ in range(scale.files)]
+    # Drawn up front, so the rows below can be generated lazily batch by batch
+    members = [
+        rng.sample(range(1, scale.users + 1), scale.members_per_workspace)
+        for _ in range(scale.workspaces)
+    ]
+
+    def users() -> Iterator[dict]:
+        for user_id in range(1, scale.users + 1):
+            yield {
+                "id": user_id,
+                "email": f"bench-{user_id}@example.com",
+                "full_name": f"Benchmark User {user_id}",
+                "google_user_id": f"bench-{user_id}",
+                "created_at": now,
+                "updated_at": now,
+            }
+
+    def workspaces() -> Iterator[dict]:
+        for index in range(scale.workspaces):
+            sizes = [
+                blobs[file_blobs[index * scale.files_per_workspace + position]][1]
+                for position in range(scale.files_per_workspace)
+            ]
+            created_at = now - timedelta(minutes=scale.workspaces - index)
+            yield {
+                "id": index + 1,
+                "name": f"Workspace {index + 1}",
+                "created_by": members[index][0],
+                "file_count": len(sizes),
+                "total_bytes": sum(sizes),
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    def memberships() -> Iterator[dict]:
+        for index, user_ids in enumerate(members):
+            for position, user_id in enumerate(user_ids):
+                yield {
+                    "user_id": user_id,
+                    "workspace_id": index + 1,
+                    "role": RoleEnum.ADMIN if position == 0 else RoleEnum.USER,
+                    "created_at": now,
+                }
+
+    def files() -> Iterator[dict]:
+        for file_id, blob_index in enumerate(file_blobs, start=1):
+            workspace_index = (file_id - 1) // scale.files_per_workspace
+            digest, size = blobs[blob_index]
+            created_at = now - timedelta(seconds=scale.files - file_id)
+            yield {
+                "id": file_id,
+                "name": f"document-{file_id}.bin",
+                "file_path": blob_key(digest),
+                "file_size": size,
+                "mime_type": MIME_TYPES[file_id % len(MIME_TYPES)],
+                "workspace_id": workspace_index + 1,
+                "uploaded_by": members[workspace_index][0],
+                "blob_digest": digest,
+                "created_at": created_at,
+                "updated_at": created_at,
+            }
+
+    references = [0] * len(blobs)
+    for blob_index in file_blobs:
+        references[blob_index] += 1
+
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.drop_all)
+        await connection.run_sync(SQLModel.metadata.create_all)
+        await _insert(connection, User.__table__, users())
+        await _insert(connection, Workspace.__table__, workspaces())
+        await _insert(connection, WorkspaceMember.__table__, memberships())
+        await _insert(
+            connection,
+            Blob.__table__,
+            [
+                {
+                    "digest": digest,
+                    "size": size,
+                    "ref_count": count,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for (digest, size), count in zip(blobs, references, strict=True)
+            ],
+        )
+        await _insert(connection, File.__table__, files())
+
+        if engine.dialect.name == "postgresql":
+            # Explicit ids do not advance the sequences the app inserts with
+            for table in ("users", "workspaces", "files"):
+                await connection.execute(
+                    text(
+                        f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                        f"(SELECT max(id) FROM {table}))"
+                    )
+                )
@@ -0,0 +1,153 @@
+import datetime as dt
+import hashlib
+import threading
+import time
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.config.settings import app_settings
+from backend.src.models.token_blacklist import TokenBlacklist
+from backend.src.models.user import User
+from backend.src.services.ttl_cache import TTLCache
+from backend.src.types.date import as_utc, utc_now
+
+# Blacklist rows committed by slower transactions may carry a timestamp slightly older than
+# the last refresh, so every refresh looks back this far
+REFRESH_OVERLAP = dt.timedelta(seconds=60)
+
+
+def token_hash(token: str) -> str:
+    """Build the fixed-size key a verified token is cached under
+
+    Args:
+        token: Encoded JWT
+
+    Returns:
+        str: SHA-256 hex digest of the token
+    """
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def revocation_key(token: str, payload: dict) -> str:
+    """Build the key a token is blacklisted under
+
+    Tokens issued without a `jti` claim fall back to the digest of the whole token.
+
+    Args:
+        token: Encoded JWT
+        payload: Decoded token payload
+
+    Returns:
+        str: SHA-256 hex digest of the token's `jti`
+    """
+    jti = payload.get("jti")
+    if jti is None:
+        return token_hash(token)
+    return hashlib.sha256(str(jti).encode()).hexdigest()
+
+
+class RevokedTokens:
+    """In-memory mirror of the token blacklist
+
+    The mirror is refreshed incrementally: each refresh only loads rows blacklisted since the
+    previous one, and entries are dropped once the token they revoke has expired. Tokens revoked
+    by another process are picked up within one refresh interval.
+
+    Args:
+        refresh_interval: Minimum number of seconds between two refreshes
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._entries: dict[str, dt.datetime] = {}
+        self._synced_at: dt.datetime | None = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    async def refresh(self, session: AsyncSession, force: bool = False) -> None:
+        """Load blacklist entries added since the last refresh, if it is due
+
+        Args:
+            session: Database session
+            force: Refresh even if the refresh interval has not elapsed
+        """
+        if not force and time.monotonic() < self._next_refresh:
+            return
+        # Claim the refresh up front so concurrent requests do not all query at once
+        self._next_refresh = time.monotonic() + self.refresh_interval
+
+        now = utc_now()
+        statement = select(TokenBlacklist.jti_hash, TokenBlacklist.expires_at).where(
+            TokenBlacklist.expires_at > now
+        )
+        if self._synced_at is not None:
+            statement = statement.where(
+                TokenBlacklist.blacklisted_at >= self._synced_at - REFRESH_OVERLAP
+            )
+        rows = (await session.exec(statement)).all()
+
+        with self._lock:
+            for key, expires_at in rows:
+                self._entries[key] = as_utc(expires_at)
+            self._entries = {key: exp for key, exp in self._entries.items() if exp > now}
+            self._synced_at = now
+
+    def add(self, key: str, expires_at: dt.datetime) -> None:
+        """Record a revocation made by this process"""
+        with self._lock:
+            self._entries[key] = as_utc(expires_at)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def clear(self) -> None:
+        """Forget every entry and force a full reload on the next refresh"""
+        with self._lock:
+            self._entries.clear()
+            self._synced_at = None
+            self._next_refresh = 0.0
+
+
+# Verified tokens mapped to their revocation key and a snapshot of their user's columns
+token_cache = TTLCache(
+    max_size=app_settings.TOKEN_CACHE_MAX_SIZE, ttl=app_settings.TOKEN_CACHE_TTL_SECONDS
+)
+revoked_tokens = RevokedTokens(refresh_interval=app_settings.TOKEN_REVOCATION_REFRESH_SECONDS)
+
+
+def cache_user(key: str, revoked_as: str, user: User, expires_at: float | None) -> None:
+    """Cache the user a verified token belongs to, never past the token's expiry
+
+    Args:
+        key: Token hash
+        revoked_as: Revocation key of the token
+        user: Authenticated user
+        expires_at: Token expiry as a UNIX timestamp, if any
+    """
+    ttl = token_cache.ttl
+    if expires_at is not None:
+        ttl = min(ttl, expires_at - time.time())
+    if ttl > 0:
+        token_cache.set(key, (revoked_as, user.model_dump()), ttl=ttl)
+
+
+def cached_user(key: str) -> tuple[str, User] | None:
+    """Get the revocation key and a detached copy of the user cached for a token, if any"""
+    entry = token_cache.get(key)
+    if entry is None:
+        return None
+    revoked_as, snapshot = entry
+    return revoked_as, User.model_validate(snapshot)
+
+
+def revoke_token(key: str, revoked_as: str, expires_at: dt.datetime) -> None:
+    """Apply a logout to this process' caches right away
+
+    Args:
+        key: Token hash
+        revoked_as: Revocation key of the token
+        expires_at: Expiry of the revoked token
+    """
+    revoked_tokens.add(revoked_as, expires_at)
+    token_cache.pop(key)
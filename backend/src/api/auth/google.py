@@ -0,0 +1,140 @@
+import asyncio
+import math
+import re
+import time
+
+import httpx
+import jwt
+
+GOOGLE_ISSUERS = ["accounts.google.com", "https://accounts.google.com"]
+# Keys are kept this long when the key server sends no caching headers
+DEFAULT_MAX_AGE_SECONDS = 3600
+# Keys are fetched again this long before they expire, so logins never wait on Google
+REFRESH_AHEAD_SECONDS = 300
+# Minimum delay between two fetches, so tokens with unknown key ids cannot flood Google
+MIN_REFETCH_SECONDS = 30
+MAX_AGE = re.compile(r"(?:^|,)\s*max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+
+def cache_lifetime(headers: httpx.Headers) -> float:
+    """Get the number of seconds a key server response may be cached for
+
+    Args:
+        headers: Headers of the response
+
+    Returns:
+        float: `max-age` of the Cache-Control header minus the Age header, zero when caching
+        is not allowed, or the default lifetime when the response says nothing
+    """
+    cache_control = headers.get("cache-control", "").lower()
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = MAX_AGE.search(cache_control)
+    if not match:
+        return DEFAULT_MAX_AGE_SECONDS
+    age = headers.get("age", "0")
+    return max(int(match[1]) - (int(age) if age.isdigit() else 0), 0)
+
+
+class GoogleKeySet:
+    """In-memory cache of the public keys Google signs ID tokens with
+
+    Keys are fetched again in the background shortly before the Cache-Control lifetime of the
+    last response runs out, so verifying a token is a local signature check. A token signed
+    with a key that is not cached yet, as happens right after Google rotates its keys, fetches
+    the keys on the spot, at most once per `MIN_REFETCH_SECONDS`.
+
+    Args:
+        http: Shared HTTP client
+        url: URL of the key server's JWKS document
+    """
+
+    def __init__(self, http: httpx.AsyncClient, url: str):
+        self.http = http
+        self.url = url
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._expires_at = 0.0
+        self._attempted_at = -math.inf
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    async def refresh(self) -> None:
+        """Fetch the keys, unless another caller fetched them while this one waited
+
+        Raises:
+            httpx.HTTPError: If the key server cannot be reached or answers with an error
+            jwt.PyJWKSetError: If the response holds no usable key
+        """
+        attempted_at = self._attempted_at
+        async with self._lock:
+            if self._attempted_at != attempted_at:
+                return
+            self._attempted_at = time.monotonic()
+
+            response = await self.http.get(self.url)
+            response.raise_for_status()
+            key_set = jwt.PyJWKSet.from_dict(response.json())
+            self._keys = {key.key_id: key for key in key_set.keys}
+            self._expires_at = time.monotonic() + cache_lifetime(response.headers)
+
+    async def get_key(self, key_id: str | None) -> jwt.PyJWK:
+        """Get the key a token was signed with
+
+        Args:
+            key_id: `kid` header of the token
+
+        Returns:
+            jwt.PyJWK: Public key
+
+        Raises:
+            jwt.InvalidTokenError: If no key has this id
+        """
+        key = self._keys.get(key_id)
+        if key is None and time.monotonic() - self._attempted_at >= MIN_REFETCH_SECONDS:
+            await self.refresh()
+            key = self._keys.get(key_id)
+        if key is None:
+            raise jwt.InvalidTokenError("Unknown signing key")
+        return key
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Warning: Failed to fetch the Google signing keys: {str(e)}")
+            delay = self._expires_at - time.monotonic() - REFRESH_AHEAD_SECONDS
+            await asyncio.sleep(max(delay, MIN_REFETCH_SECONDS))
+
+    def start(self) -> None:
+        """Fetch the keys now and keep them fresh in the background"""
+        self._task = asyncio.create_task(self._run(), name="google-keys")
+
+    async def stop(self) -> None:
+        """Stop refreshing the keys"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+async def verify_google_id_token(token: str, keys: GoogleKeySet, audience: str) -> dict:
+    """Verify a Google ID token locally and decode its claims
+
+    Args:
+        token: Encoded ID token
+        keys: Cached Google signing keys
+        audience: OAuth client id the token must be issued for
+
+    Returns:
+        dict: Claims of the token
+
+    Raises:
+        jwt.InvalidTokenError: If the token is malformed, expired, issued for another client
+        or not signed by Google
+    """
+    header = jwt.get_unverified_header(token)
+    key = await keys.get_key(header.get("kid"))
+    return jwt.decode(
+        token, key, algorithms=["RS256"], audience=audience, issuer=GOOGLE_ISSUERS, leeway=30
+    )
@@ -0,0 +1,110 @@
+from collections.abc import Awaitable, Callable
+
+from fastapi import Depends, HTTPException
+from sqlmodel import and_, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette import status
+
+from backend.src.api.auth.security import get_current_user
+from backend.src.config.settings import app_settings
+from backend.src.database.session import get_session
+from backend.src.models.user import User
+from backend.src.models.workspace import Workspace, WorkspaceMember
+from backend.src.services.ttl_cache import TTLCache
+from backend.src.types.roles import RoleEnum
+
+# Each role can do everything the roles ranked below it can
+ROLE_RANKS = {RoleEnum.VIEWER: 0, RoleEnum.USER: 1, RoleEnum.ADMIN: 2}
+
+# (workspace id, user id) mapped to the user's role, or None if they are not a member.
+# Entries are dropped when this process changes a membership; changes made by other processes
+# are picked up once the entry expires
+membership_cache = TTLCache(
+    max_size=app_settings.MEMBERSHIP_CACHE_MAX_SIZE, ttl=app_settings.MEMBERSHIP_CACHE_TTL_SECONDS
+)
+
+_NOT_CACHED = object()
+
+
+async def get_workspace_role(
+    session: AsyncSession, workspace_id: int, user_id: int
+) -> RoleEnum | None:
+    """Resolve a user's role in a workspace in a single query, using the membership cache
+
+    Args:
+        session: Database session
+        workspace_id: Workspace to look up
+        user_id: User to look up
+
+    Returns:
+        RoleEnum | None: The user's role, or None if they are not a member
+
+    Raises:
+        HTTPException: If the workspace does not exist or was deleted
+    """
+    key = (workspace_id, user_id)
+    role = membership_cache.get(key, _NOT_CACHED)
+    if role is not _NOT_CACHED:
+        return role
+
+    row = (
+        await session.exec(
+            select(Workspace.id, WorkspaceMember.role)
+            .outerjoin(
+                WorkspaceMember,
+                and_(
+                    WorkspaceMember.workspace_id == Workspace.id,
+                    WorkspaceMember.user_id == user_id,
+                ),
+            )
+            .where(Workspace.id == workspace_id, Workspace.deleted_at.is_(None))
+        )
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+
+    role = row[1]
+    membership_cache.set(key, role)
+    return role
+
+
+def invalidate_membership(workspace_id: int, user_id: int | None = None) -> None:
+    """Drop cached roles after a membership change
+
+    Args:
+        workspace_id: Workspace whose memberships changed
+        user_id: Member that changed, or None for every member of the workspace
+    """
+    if user_id is not None:
+        membership_cache.pop((workspace_id, user_id))
+    else:
+        membership_cache.pop_matching(lambda key: key[0] == workspace_id)
+
+
+def require_workspace_role(
+    minimum: RoleEnum = RoleEnum.VIEWER,
+) -> Callable[..., Awaitable[RoleEnum]]:
+    """Build a dependency that authorizes the current user on the `workspace_id` path parameter
+
+    Args:
+        minimum: Lowest role allowed through
+
+    Returns:
+        Callable: FastAPI dependency returning the user's role in the workspace
+    """
+
+    async def dependency(
+        workspace_id: int,
+        current_user: User = Depends(get_current_user),
+        session: AsyncSession = Depends(get_session),
+    ) -> RoleEnum:
+        role = await get_workspace_role(session, workspace_id, current_user.id)
+        if role is None:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+        if ROLE_RANKS[role] < ROLE_RANKS[minimum]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions"
+            )
+        return role
+
+    return dependency
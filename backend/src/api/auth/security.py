@@ -1,10 +1,17 @@
 import jwt
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from passlib.context import CryptContext
-from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from starlette import status
 
+from backend.src.api.auth.cache import (
+    cache_user,
+    cached_user,
+    revocation_key,
+    revoked_tokens,
+    token_hash,
+)
 from backend.src.config.settings import app_settings
 from backend.src.database.session import get_session
 from backend.src.models.token_blacklist import TokenBlacklist
@@ -14,18 +21,17 @@ PWD_CONTEXT = CryptContext(schemes=["bcrypt"], deprecated="auto")
 SECURITY = HTTPBearer()
 
 
-def is_token_blacklisted(token: str, session: Session) -> bool:
+async def is_token_blacklisted(jti_hash: str, session: AsyncSession) -> bool:
     """Check if token is blacklisted
 
     Args:
-        token: JWT token to check
+        jti_hash: Revocation key of the token, see `revocation_key`
         session: Database session
 
     Returns:
         bool: True if token is blacklisted
     """
-    blacklisted = session.exec(select(TokenBlacklist).where(TokenBlacklist.token == token)).first()
-    return blacklisted is not None
+    return await session.get(TokenBlacklist, jti_hash) is not None
 
 
 def verify_token(token: str) -> dict | None:
@@ -72,12 +78,20 @@ def get_password_hash(password: str) -> str:
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(SECURITY),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> type[User]:
     """Get current authenticated user from JWT token
 
+    Verified tokens are cached together with a snapshot of their user, so repeated requests
+    with the same token are authenticated without touching the database.
+
+    The user id is recorded on the request state, so database sessions can route the user's
+    reads to the primary right after they wrote.
+
     Args:
+        request: Current request
         credentials: HTTP Authorization credentials with Bearer token
         session: Database session
 
@@ -94,26 +108,41 @@ async def get_current_user(
     )
 
     token = credentials.credentials
+    key = token_hash(token)
+    revoked_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Token has been revoked",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
-    # Check if token is blacklisted
-    if is_token_blacklisted(token, session):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has been revoked",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    # Revocations are mirrored in memory, so this only queries once per refresh interval
+    await revoked_tokens.refresh(session)
+
+    cached = cached_user(key)
+    if cached is not None:
+        revoked_as, user = cached
+        if revoked_as in revoked_tokens:
+            raise revoked_exception
+        request.state.user_id = user.id
+        return user
 
     payload = verify_token(token)
 
     if payload is None:
         raise credentials_exception
 
+    revoked_as = revocation_key(token, payload)
+    if revoked_as in revoked_tokens:
+        raise revoked_exception
+
     user_id: int | None = payload.get("sub")
     if user_id is None:
         raise credentials_exception
 
-    user = session.get(User, int(user_id))
+    user = await session.get(User, int(user_id))
     if user is None:
         raise credentials_exception
 
+    cache_user(key, revoked_as, user, payload.get("exp"))
+    request.state.user_id = user.id
     return user
@@ -0,0 +1,63 @@
+from collections.abc import Awaitable, Callable, Sequence
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.services.downloads import weak_etag_match
+from backend.src.services.pagination import NEXT_CURSOR_HEADER
+from backend.src.services.response_cache import CachedPage, ResponseCache
+
+# Clients may keep listings, but must revalidate them with their ETag before use
+CACHE_CONTROL = "private, no-cache"
+
+
+def listing_page(items: Sequence[BaseModel], next_cursor: str | None) -> CachedPage:
+    """Serialize a page of response models like FastAPI would, field aliases included"""
+    body = b"[" + b",".join(item.model_dump_json(by_alias=True).encode() for item in items) + b"]"
+    return CachedPage(body=body, next_cursor=next_cursor)
+
+
+async def serve_cached(
+    request: Request,
+    response_cache: ResponseCache | None,
+    session: AsyncSession,
+    scope: str,
+    params: Sequence[object],
+    build: Callable[[], Awaitable[CachedPage]],
+) -> Response:
+    """Serve a listing page from the cache, building and caching it on a miss
+
+    The response carries a weak ETag of its content, and is a 304 without a body when the
+    request's If-None-Match already holds it. Pages going into the cache are built on the
+    primary: a lagging replica would cache data older than the version for every reader.
+
+    Args:
+        request: Incoming request
+        response_cache: Cache, or None if caching is disabled
+        session: Session `build` queries, routed to the primary on a cache miss
+        scope: Version scope whose changes invalidate the page
+        params: Everything else the page depends on, such as the user, cursor and limit
+        build: Load and serialize the page; errors it raises are not cached
+
+    Returns:
+        Response: The page, or a 304
+    """
+    if response_cache is None:
+        page = await build()
+    else:
+        # Read before building, so a change committed meanwhile moves readers to a new key
+        key = response_cache.key(scope, await response_cache.version(scope), *params)
+        page = await response_cache.get(key)
+        if page is None:
+            session.info["use_primary"] = True
+            page = await build()
+            await response_cache.set(key, page)
+
+    headers = {"ETag": page.etag, "Cache-Control": CACHE_CONTROL}
+    if page.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and weak_etag_match(if_none_match, page.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=page.body, media_type="application/json", headers=headers)
@@ -0,0 +1,92 @@
+import hmac
+import time
+
+from fastapi import APIRouter, HTTPException, Request
+from starlette.datastructures import MutableHeaders
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.src.config.settings import app_settings
+from backend.src.services.metrics import (
+    REQUEST_DB_DURATION,
+    REQUEST_DB_QUERIES,
+    REQUEST_DURATION,
+    RequestMetrics,
+    current_request,
+    registry,
+)
+
+metrics_router = APIRouter(tags=["metrics"])
+
+
+class MetricsMiddleware:
+    """Time every request and count the database and storage work done for it
+
+    The numbers are added to the per-route histograms once the last byte of the response is
+    sent, so background tasks running after the response do not count towards its latency,
+    and are reported to the client in a Server-Timing header.
+
+    This is a plain ASGI middleware, so streamed responses are not buffered and the request
+    context reaches the endpoint and its dependencies.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics(scope=scope)
+        token = current_request.set(metrics)
+        started = time.perf_counter()
+        status_code = 500
+        recorded = False
+
+        def record() -> None:
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            method, route = scope["method"], metrics.route
+            REQUEST_DURATION.observe(
+                time.perf_counter() - started, method=method, route=route, status=str(status_code)
+            )
+            REQUEST_DB_QUERIES.observe(metrics.db_queries, method=method, route=route)
+            REQUEST_DB_DURATION.observe(metrics.db_seconds, method=method, route=route)
+
+        async def send_with_metrics(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", metrics.server_timing(time.perf_counter() - started)
+                )
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            record()
+            current_request.reset(token)
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics(request: Request):
+    """Expose the metrics of this process in the Prometheus text format
+
+    They reveal traffic and internals, so they are only served once METRICS_TOKEN is set, to
+    scrapers sending it as a bearer token.
+    """
+    token = app_settings.METRICS_TOKEN
+    if token is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    expected = f"Bearer {token.get_secret_value()}"
+    if not hmac.compare_digest(request.headers.get("authorization", ""), expected):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,11 +1,13 @@
 from datetime import timedelta
+from uuid import uuid4
 
-import httpx
 import jwt
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from backend.src.api.auth.cache import revocation_key, revoke_token, token_hash
+from backend.src.api.auth.google import GoogleKeySet, verify_google_id_token
 from backend.src.api.auth.security import get_current_user
 from backend.src.config.settings import app_settings
 from backend.src.database.session import get_session
@@ -17,6 +19,7 @@ from backend.src.schemas.auth import (
     TokenResponse,
 )
 from backend.src.schemas.user import UserResponse
+from backend.src.services.users import upsert_google_user
 from backend.src.types.date import utc_now
 from backend.src.types.roles import RoleEnum
 
@@ -24,10 +27,16 @@ auth_router = APIRouter(prefix="/auth", tags=["auth"])
 SECURITY = HTTPBearer()
 
 
+def get_google_keys(request: Request) -> GoogleKeySet:
+    """Get the Google signing keys cached since the application started"""
+    return request.app.state.google_keys
+
+
 @auth_router.post("/google", response_model=TokenResponse)
 async def google_login(
     request: GoogleLoginRequest,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
+    google_keys: GoogleKeySet = Depends(get_google_keys),
 ):
     """Login with Google OAuth
     Verifies Google ID token, creates/finds user, and returns JWT access token.
@@ -35,36 +44,18 @@ async def google_login(
     Args:
         request: Google login request with JWT credential
         session: Database session
+        google_keys: Cached Google signing keys the ID token is verified against
 
     Returns:
         TokenResponse: Access token and user info
     """
     try:
-        # Verify Google token using Google's tokeninfo endpoint
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                "https://oauth2.googleapis.com/tokeninfo",
-                params={"id_token": request.credential},
-                timeout=10.0,
-            )
-
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid Google token",
-                )
-
-            token_info = response.json()
-
+        # Verify the signature, audience, issuer and expiry against Google's cached keys
+        token_info = await verify_google_id_token(
+            request.credential, google_keys, app_settings.GOOGLE_CLIENT_ID
+        )
         google_login_response = GoogleLoginResponse.model_validate(token_info)
 
-        # Validate token audience
-        if google_login_response.audience != app_settings.GOOGLE_CLIENT_ID:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"Invalid token audience. Got: {token_info.get('aud')}, Expected: {app_settings.GOOGLE_CLIENT_ID}",
-            )
-
         # Validate email verification
         if not google_login_response.email_verified:
             raise HTTPException(
@@ -78,26 +69,15 @@ async def google_login(
                 detail="Email not provided",
             )
 
-        # Find or create user
-        user = session.exec(
-            select(User).where(User.google_user_id == google_login_response.user_id)
-        ).first()
-
-        if not user:
-            user = User(
-                email=google_login_response.email,
-                full_name=google_login_response.name,
-                google_user_id=google_login_response.user_id,
-                google_picture=google_login_response.picture,
-            )
-            session.add(user)
-            session.commit()
-            session.refresh(user)
+        # Create the user, or bring their profile up to date, in a single round-trip
+        user = await upsert_google_user(session, google_login_response)
+        await session.commit()
 
         # Generate JWT token
         token_data = {
             "sub": str(user.id),
             "email": user.email,
+            "jti": uuid4().hex,
             "exp": utc_now() + timedelta(minutes=app_settings.ACCESS_TOKEN_EXPIRE_MINUTES),
         }
 
@@ -118,6 +98,11 @@ async def google_login(
 
     except HTTPException:
         raise
+    except jwt.InvalidTokenError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid Google token",
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -142,7 +127,7 @@ async def get_me(current_user: User = Depends(get_current_user)) -> User:
 async def logout(
     credentials: HTTPAuthorizationCredentials = Depends(SECURITY),
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ) -> None:
     """Logout user by blacklisting their current token
 
@@ -178,12 +163,15 @@ async def logout(
         )
 
     # Add token to blacklist
+    revoked_as = revocation_key(token, payload)
     blacklisted_token = TokenBlacklist(
-        token=token,
+        jti_hash=revoked_as,
         user_id=current_user.id,
         expires_at=expires_at,
+        expires_bucket=expires_at.date(),
     )
     session.add(blacklisted_token)
-    session.commit()
+    await session.commit()
+    revoke_token(token_hash(token), revoked_as, expires_at)
 
     return None
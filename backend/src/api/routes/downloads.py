@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from starlette.responses import RedirectResponse, Response
+
+from backend.src.config.settings import app_settings
+from backend.src.services.downloads import file_response, is_not_modified, not_modified_response
+from backend.src.services.previews import PREVIEW_LAST_MODIFIED, PREVIEW_MEDIA_TYPE, preview_key
+from backend.src.services.signed_urls import verify_download, verify_preview
+from backend.src.services.storage import StorageBackend, get_storage
+from backend.src.types.date import utc_now
+
+downloads_router = APIRouter(prefix="/files", tags=["files"])
+
+
+@downloads_router.get("/signed/{token}", name="download_signed_file")
+async def download_signed_file(
+    token: str,
+    request: Request,
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Download a file through a signed URL
+
+    Only the signature and expiry are checked, so serving the file needs no database access.
+    """
+    download = verify_download(token)
+    if download is None:
+        raise HTTPException(status_code=403, detail="Invalid or expired download link")
+
+    remaining = max(int((download.expires_at - utc_now()).total_seconds()), 0)
+    cache_control = f"private, max-age={remaining}"
+
+    if is_not_modified(request.headers, download.etag, download.last_modified):
+        return not_modified_response(download.etag, download.last_modified, cache_control)
+
+    presigned_url = await storage.presigned_url(
+        download.key,
+        filename=download.filename,
+        media_type=download.media_type,
+        expires_in=remaining,
+    )
+    if presigned_url:
+        return RedirectResponse(presigned_url, status_code=307)
+
+    if not await storage.exists(download.key):
+        raise HTTPException(status_code=404, detail="Physical file not found")
+
+    return file_response(
+        request.headers,
+        storage,
+        download.key,
+        filename=download.filename,
+        media_type=download.media_type,
+        size=download.size,
+        etag=download.etag,
+        last_modified=download.last_modified,
+        cache_control=cache_control,
+    )
+
+
+@downloads_router.get("/previews/{token}", name="file_preview")
+async def get_file_preview(
+    token: str,
+    request: Request,
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Serve a generated preview of a file through a signed URL
+
+    The URLs are handed out in file responses, so only members of a workspace holding the file
+    can show its preview. What a preview serves never changes, so browsers may keep it for as
+    long as its URL is valid.
+    """
+    preview = verify_preview(token)
+    if preview is None:
+        raise HTTPException(status_code=403, detail="Invalid or expired preview link")
+    if preview.size not in app_settings.PREVIEW_SIZES:
+        raise HTTPException(status_code=404, detail="Preview not found")
+
+    remaining = max(int((preview.expires_at - utc_now()).total_seconds()), 0)
+    etag = f'"{preview.digest}-{preview.size}"'
+    headers = {"Cache-Control": f"private, max-age={remaining}, immutable", "ETag": etag}
+    # Content of a preview never changes, so a cached copy of any date is current
+    if is_not_modified(request.headers, etag, PREVIEW_LAST_MODIFIED):
+        return Response(status_code=304, headers=headers)
+
+    key = preview_key(preview.digest, preview.size)
+    if not await storage.exists(key):
+        raise HTTPException(status_code=404, detail="Preview not found")
+
+    content = b"".join([chunk async for chunk in storage.read(key)])
+    return Response(content, media_type=PREVIEW_MEDIA_TYPE, headers=headers)
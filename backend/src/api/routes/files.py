@@ -1,184 +1,448 @@
-import shutil
-
-from fastapi import APIRouter, Depends, Form, HTTPException, UploadFile
-from sqlmodel import Session, select
-from starlette.responses import FileResponse as StarletteFileResponse
-
+from collections import Counter
+
+import anyio
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Form,
+    HTTPException,
+    Query,
+    Request,
+    UploadFile,
+)
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.responses import RedirectResponse, StreamingResponse
+
+from backend.src.api.auth.permissions import require_workspace_role
 from backend.src.api.auth.security import get_current_user
+from backend.src.api.caching import listing_page, serve_cached
 from backend.src.config.settings import app_settings
-from backend.src.database.session import get_session
+from backend.src.database.session import get_read_session, get_session
 from backend.src.models.file import File
 from backend.src.models.user import User
-from backend.src.models.workspace import Workspace, WorkspaceMember
-from backend.src.schemas.file import FileResponse
-from backend.src.types.date import utc_now
+from backend.src.models.workspace import Workspace
+from backend.src.schemas.file import (
+    BatchUploadResult,
+    DownloadUrlResponse,
+    DownloadUrlsRequest,
+    FileResponse,
+)
+from backend.src.services.archives import stream_zip
+from backend.src.services.blobs import (
+    acquire_blob,
+    blob_key,
+    ensure_blob_row,
+    release_blob,
+    store_stream,
+)
+from backend.src.services.downloads import (
+    DOWNLOAD_CACHE_CONTROL,
+    content_disposition,
+    file_etag,
+    file_response,
+    is_not_modified,
+    not_modified_response,
+)
+from backend.src.services.pagination import SortOrder, paginate
+from backend.src.services.previews import schedule_previews, to_file_response
+from backend.src.services.response_cache import (
+    CachedPage,
+    ResponseCache,
+    get_response_cache,
+    invalidate_workspace,
+    workspace_scope,
+)
+from backend.src.services.search import schedule_indexing
+from backend.src.services.signed_urls import sign_download
+from backend.src.services.storage import StorageBackend, get_storage, iter_upload_file
+from backend.src.services.workspaces import QuotaExceededError, record_usage
+from backend.src.types.roles import RoleEnum
 
 files_router = APIRouter()
 
 
-@files_router.get("/", response_model=list[FileResponse])
-def get_workspace_files(
-    workspace_id: int,
-    current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
-):
-    """Get all files in a workspace"""
-    workspace = session.get(Workspace, workspace_id)
-    if not workspace:
-        raise HTTPException(status_code=404, detail="Workspace not found")
-
-    # Check if user is a member
-    is_member = session.exec(
-        select(WorkspaceMember).where(
-            WorkspaceMember.workspace_id == workspace_id, WorkspaceMember.user_id == current_user.id
-        )
-    ).first()
+async def _get_workspace_file(workspace_id: int, file_id: int, session: AsyncSession) -> File:
+    """Load a file of a workspace the caller was already authorized on
+
+    Raises:
+        HTTPException: If the file is missing or belongs to another workspace
+    """
+    db_file = await session.get(File, file_id)
+    if not db_file:
+        raise HTTPException(status_code=404, detail="File not found")
 
-    if not is_member:
-        raise HTTPException(status_code=403, detail="Access denied")
+    if db_file.workspace_id != workspace_id:
+        raise HTTPException(status_code=403, detail="File does not belong to this workspace")
 
-    # Get files for this workspace
-    files = session.exec(select(File).where(File.workspace_id == workspace_id)).all()
+    return db_file
 
-    return files
 
+@files_router.get(
+    "/", response_model=list[FileResponse], dependencies=[Depends(require_workspace_role())]
+)
+async def get_workspace_files(
+    workspace_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
+    response_cache: ResponseCache | None = Depends(get_response_cache),
+    cursor: str | None = None,
+    limit: int = Query(app_settings.PAGE_SIZE_DEFAULT, ge=1, le=app_settings.PAGE_SIZE_MAX),
+    order: SortOrder = "asc",
+):
+    """Get a page of files in a workspace"""
+
+    async def build() -> CachedPage:
+        # Get a page of files for this workspace
+        try:
+            files, next_cursor = await paginate(
+                session,
+                select(File).where(File.workspace_id == workspace_id),
+                File.created_at,
+                File.id,
+                cursor,
+                limit,
+                order,
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return listing_page([to_file_response(file) for file in files], next_cursor)
+
+    return await serve_cached(
+        request,
+        response_cache,
+        session,
+        workspace_scope(workspace_id),
+        ("files", workspace_id, cursor, limit, order),
+        build,
+    )
 
-@files_router.post("/import/google-drive", response_model=FileResponse)
+
+@files_router.post(
+    "/import/google-drive",
+    response_model=FileResponse,
+    dependencies=[Depends(require_workspace_role(RoleEnum.USER))],
+)
 async def import_from_google_drive(
     workspace_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = UploadFile(...),
     google_drive_id: None | str = Form(None),
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
 ):
     """Import a file from Google Drive to a workspace"""
-    workspace = session.get(Workspace, workspace_id)
-    if not workspace:
-        raise HTTPException(status_code=404, detail="Workspace not found")
-
-    is_member = session.exec(
-        select(WorkspaceMember).where(
-            WorkspaceMember.workspace_id == workspace_id, WorkspaceMember.user_id == current_user.id
-        )
-    ).first()
-
-    if not is_member:
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    # Create workspace-specific directory
-    workspace_dir = app_settings.STORAGE_BASE_PATH / str(workspace_id)
-    workspace_dir.mkdir(parents=True, exist_ok=True)
-
-    # Generate unique filename
-    timestamp = utc_now()
-    unique_filename = f"{timestamp}_{file.filename}"
-    file_path = workspace_dir / unique_filename
-
-    # Save the file
+    # Save the file into the content-addressed blob store without blocking the event loop
     try:
-        with file_path.open("wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        digest, file_size = await store_stream(session.bind, storage, iter_upload_file(file))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save file: {str(e)}")
     finally:
-        file.file.close()
-
-    file_size = file_path.stat().st_size
+        await file.close()
 
     db_file = File(
         name=file.filename or "unknown",
-        file_path=str(file_path),
+        file_path=blob_key(digest),
         file_size=file_size,
         mime_type=file.content_type,
         workspace_id=workspace_id,
         uploaded_by=current_user.id,
         google_drive_id=google_drive_id,
+        blob_digest=digest,
     )
 
+    await acquire_blob(session, digest, file_size)
     session.add(db_file)
-    session.commit()
-    session.refresh(db_file)
+    try:
+        await record_usage(session, workspace_id, 1, file_size)
+    except QuotaExceededError as e:
+        await session.rollback()
+        await ensure_blob_row(session, digest, file_size)
+        await session.commit()
+        raise HTTPException(status_code=413, detail=str(e))
+    await session.commit()
+    await session.refresh(db_file)
+    await invalidate_workspace(session, workspace_id)
+    schedule_previews(background_tasks, session.bind, storage, [db_file])
+    schedule_indexing(background_tasks, session.bind, storage, [db_file])
+
+    return to_file_response(db_file)
+
+
+async def _store_batch(
+    engine: AsyncEngine, storage: StorageBackend, files: list[UploadFile]
+) -> list[tuple[str, int] | Exception]:
+    """Store uploaded files as blobs concurrently, at most BATCH_UPLOAD_CONCURRENCY at a time
+
+    Returns:
+        list: Digest and size of each stored file, or the error that prevented storing it
+    """
+    results: list[tuple[str, int] | Exception] = [None] * len(files)
+    limiter = anyio.CapacityLimiter(app_settings.BATCH_UPLOAD_CONCURRENCY)
+
+    async def store(index: int, file: UploadFile) -> None:
+        async with limiter:
+            try:
+                results[index] = await store_stream(engine, storage, iter_upload_file(file))
+            except Exception as e:
+                results[index] = e
+            finally:
+                await file.close()
+
+    async with anyio.create_task_group() as task_group:
+        for index, file in enumerate(files):
+            task_group.start_soon(store, index, file)
+
+    return results
+
+
+@files_router.post(
+    "/batch",
+    response_model=list[BatchUploadResult],
+    dependencies=[Depends(require_workspace_role(RoleEnum.USER))],
+)
+async def batch_upload(
+    workspace_id: int,
+    files: list[UploadFile],
+    background_tasks: BackgroundTasks,
+    google_drive_ids: list[str] = Form([]),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Upload several files to a workspace in one request
+
+    Files are written to storage concurrently and registered in a single transaction with one
+    bulk insert. Each item of the response reports whether that file was stored; a file that
+    cannot be saved does not fail the others.
+    """
+    if len(files) > app_settings.BATCH_UPLOAD_MAX_FILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many files, at most {app_settings.BATCH_UPLOAD_MAX_FILES} per batch",
+        )
+    if google_drive_ids and len(google_drive_ids) != len(files):
+        raise HTTPException(
+            status_code=400, detail="google_drive_ids must have one entry per uploaded file"
+        )
 
-    return FileResponse.model_validate(db_file)
+    stored = await _store_batch(session.bind, storage, files)
+
+    results: list[BatchUploadResult] = []
+    pending: list[tuple[BatchUploadResult, File]] = []
+    references: Counter[str] = Counter()
+    for index, (file, outcome) in enumerate(zip(files, stored, strict=True)):
+        result = BatchUploadResult(filename=file.filename or "unknown")
+        results.append(result)
+        if isinstance(outcome, Exception):
+            result.error = f"Failed to save file: {str(outcome)}"
+            continue
+
+        digest, file_size = outcome
+        references[digest] += 1
+        db_file = File(
+            name=result.filename,
+            file_path=blob_key(digest),
+            file_size=file_size,
+            mime_type=file.content_type,
+            workspace_id=workspace_id,
+            uploaded_by=current_user.id,
+            google_drive_id=google_drive_ids[index] if google_drive_ids else None,
+            blob_digest=digest,
+        )
+        pending.append((result, db_file))
+
+    if pending:
+        sizes = {db_file.blob_digest: db_file.file_size for _, db_file in pending}
+        for digest, count in references.items():
+            await acquire_blob(session, digest, sizes[digest], count)
+        try:
+            total_size = sum(db_file.file_size for _, db_file in pending)
+            await record_usage(session, workspace_id, len(pending), total_size)
+        except QuotaExceededError as e:
+            await session.rollback()
+            for digest, size in sizes.items():
+                await ensure_blob_row(session, digest, size)
+            await session.commit()
+            for result, _ in pending:
+                result.error = str(e)
+            return results
+
+        rows = [db_file.model_dump(exclude={"id"}) for _, db_file in pending]
+        created = (
+            (
+                await session.exec(
+                    insert(File).returning(File, sort_by_parameter_order=True), params=rows
+                )
+            )
+            .scalars()
+            .all()
+        )
+        for (result, _), db_file in zip(pending, created, strict=True):
+            result.file = to_file_response(db_file)
+        await session.commit()
+        await invalidate_workspace(session, workspace_id)
+        schedule_previews(background_tasks, session.bind, storage, created)
+        schedule_indexing(background_tasks, session.bind, storage, created)
+
+    return results
 
 
 @files_router.delete("/{file_id}", status_code=204)
-def delete_file(
+async def delete_file(
     workspace_id: int,
     file_id: int,
+    role: RoleEnum = Depends(require_workspace_role(RoleEnum.USER)),
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
 ):
-    """Delete a file from a workspace"""
-
-    workspace = session.get(Workspace, workspace_id)
-    if not workspace:
-        raise HTTPException(status_code=404, detail="Workspace not found")
-
-    is_member = session.exec(
-        select(WorkspaceMember).where(
-            WorkspaceMember.workspace_id == workspace_id, WorkspaceMember.user_id == current_user.id
-        )
-    ).first()
-
-    if not is_member:
-        raise HTTPException(status_code=403, detail="Access denied")
-
-    db_file = session.get(File, file_id)
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
+    """Delete a file from a workspace
+
+    Admins can delete any file, users only the files they uploaded.
+    """
+    db_file = await _get_workspace_file(workspace_id, file_id, session)
+    if role != RoleEnum.ADMIN and db_file.uploaded_by != current_user.id:
+        raise HTTPException(status_code=403, detail="Insufficient permissions")
+
+    if db_file.blob_digest:
+        # Shared content is kept until no file references it anymore
+        await release_blob(session, db_file.blob_digest)
+    else:
+        try:
+            await storage.delete(db_file.file_path)
+        except Exception as e:
+            print(f"Warning: Failed to delete physical file: {str(e)}")
+
+    await record_usage(session, workspace_id, -1, -db_file.file_size)
+    await session.delete(db_file)
+    await session.commit()
+    await invalidate_workspace(session, workspace_id)
 
-    if db_file.workspace_id != workspace_id:
-        raise HTTPException(status_code=403, detail="File does not belong to this workspace")
+    return None
 
-    try:
-        file_path = app_settings.STORAGE_BASE_PATH / db_file.file_path
-        if file_path.exists():
-            file_path.unlink()
-    except Exception as e:
-        print(f"Warning: Failed to delete physical file: {str(e)}")
 
-    session.delete(db_file)
-    session.commit()
+@files_router.get("/export", dependencies=[Depends(require_workspace_role())])
+async def export_files(
+    workspace_id: int,
+    file_ids: list[int] | None = Query(None, max_length=app_settings.PAGE_SIZE_MAX),
+    session: AsyncSession = Depends(get_read_session),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Download the files of a workspace, or a selection of them, as one ZIP archive
 
-    return None
+    The archive is generated while it is sent, so nothing is buffered on disk or in memory.
+    """
+    workspace = await session.get(Workspace, workspace_id)
+    statement = (
+        select(File).where(File.workspace_id == workspace_id).order_by(File.created_at, File.id)
+    )
+    if file_ids is not None:
+        statement = statement.where(File.id.in_(file_ids))
+    files = (await session.exec(statement)).all()
+
+    return StreamingResponse(
+        stream_zip(storage, list(files)),
+        media_type="application/zip",
+        headers={
+            "Cache-Control": DOWNLOAD_CACHE_CONTROL,
+            "Content-Disposition": content_disposition(f"{workspace.name}.zip"),
+        },
+    )
 
 
-@files_router.get("/{file_id}/download")
-def download_file(
+@files_router.get("/{file_id}/download", dependencies=[Depends(require_workspace_role())])
+async def download_file(
     workspace_id: int,
     file_id: int,
-    current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
+    storage: StorageBackend = Depends(get_storage),
 ):
-    """Download a file from a workspace"""
+    """Download a file from a workspace
 
-    workspace = session.get(Workspace, workspace_id)
-    if not workspace:
-        raise HTTPException(status_code=404, detail="Workspace not found")
+    Supports conditional requests (If-None-Match / If-Modified-Since) and byte ranges.
+    """
+    db_file = await _get_workspace_file(workspace_id, file_id, session)
 
-    is_member = session.exec(
-        select(WorkspaceMember).where(
-            WorkspaceMember.workspace_id == workspace_id, WorkspaceMember.user_id == current_user.id
-        )
-    ).first()
+    etag = file_etag(db_file)
+    if is_not_modified(request.headers, etag, db_file.updated_at):
+        return not_modified_response(etag, db_file.updated_at)
 
-    if not is_member:
-        raise HTTPException(status_code=403, detail="Access denied")
+    media_type = db_file.mime_type or "application/octet-stream"
 
-    db_file = session.get(File, file_id)
-    if not db_file:
-        raise HTTPException(status_code=404, detail="File not found")
-
-    if db_file.workspace_id != workspace_id:
-        raise HTTPException(status_code=403, detail="File does not belong to this workspace")
+    # Let backends that can serve downloads themselves take the traffic off the API
+    presigned_url = await storage.presigned_url(
+        db_file.file_path,
+        filename=db_file.name,
+        media_type=media_type,
+        expires_in=app_settings.S3_PRESIGNED_URL_EXPIRE_SECONDS,
+    )
+    if presigned_url:
+        return RedirectResponse(presigned_url, status_code=307)
 
-    file_path = app_settings.STORAGE_BASE_PATH / db_file.file_path
-    if not file_path.exists():
+    if not await storage.exists(db_file.file_path):
         raise HTTPException(status_code=404, detail="Physical file not found")
 
-    return StarletteFileResponse(
-        path=str(file_path),
+    return file_response(
+        request.headers,
+        storage,
+        db_file.file_path,
         filename=db_file.name,
-        media_type=db_file.mime_type or "application/octet-stream",
+        media_type=media_type,
+        size=db_file.file_size,
+        etag=etag,
+        last_modified=db_file.updated_at,
     )
+
+
+def _signed_url(request: Request, db_file: File) -> DownloadUrlResponse:
+    token, expires_at = sign_download(db_file)
+    return DownloadUrlResponse(
+        file_id=db_file.id,
+        url=str(request.url_for("download_signed_file", token=token)),
+        expires_at=expires_at,
+    )
+
+
+@files_router.post(
+    "/download-urls",
+    response_model=list[DownloadUrlResponse],
+    dependencies=[Depends(require_workspace_role())],
+)
+async def create_download_urls(
+    workspace_id: int,
+    body: DownloadUrlsRequest,
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
+):
+    """Issue short-lived signed download URLs for several files at once
+
+    The URLs can be fetched without credentials, e.g. from <img> tags in gallery views.
+    """
+    files = (
+        await session.exec(
+            select(File).where(File.workspace_id == workspace_id, File.id.in_(body.file_ids))
+        )
+    ).all()
+
+    return [_signed_url(request, db_file) for db_file in files]
+
+
+@files_router.post(
+    "/{file_id}/download-url",
+    response_model=DownloadUrlResponse,
+    dependencies=[Depends(require_workspace_role())],
+)
+async def create_download_url(
+    workspace_id: int,
+    file_id: int,
+    request: Request,
+    session: AsyncSession = Depends(get_read_session),
+):
+    """Issue a short-lived signed download URL for a file"""
+    db_file = await _get_workspace_file(workspace_id, file_id, session)
+    return _signed_url(request, db_file)
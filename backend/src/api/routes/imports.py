@@ -0,0 +1,107 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.api.auth.permissions import require_workspace_role
+from backend.src.api.auth.security import get_current_user
+from backend.src.database.session import get_session
+from backend.src.models.import_job import ImportItem, ImportJob
+from backend.src.models.user import User
+from backend.src.schemas.drive_import import (
+    DriveImportCreate,
+    DriveImportItemResponse,
+    DriveImportJobResponse,
+)
+from backend.src.services.drive_import import DriveImporter, ImportTask
+from backend.src.types.imports import ImportStatusEnum
+from backend.src.types.roles import RoleEnum
+
+imports_router = APIRouter()
+
+FINISHED = {ImportStatusEnum.SUCCEEDED, ImportStatusEnum.FAILED}
+
+
+def get_drive_importer(request: Request) -> DriveImporter:
+    """Get the Drive import worker pool started with the application"""
+    return request.app.state.drive_importer
+
+
+def _to_response(job: ImportJob, items: list[ImportItem]) -> DriveImportJobResponse:
+    finished = all(item.status in FINISHED for item in items)
+    return DriveImportJobResponse(
+        id=job.id,
+        workspace_id=job.workspace_id,
+        status="completed" if finished else "running",
+        succeeded=sum(item.status == ImportStatusEnum.SUCCEEDED for item in items),
+        failed=sum(item.status == ImportStatusEnum.FAILED for item in items),
+        created_at=job.created_at,
+        items=[DriveImportItemResponse.model_validate(item) for item in items],
+    )
+
+
+@imports_router.post(
+    "/",
+    response_model=DriveImportJobResponse,
+    status_code=202,
+    dependencies=[Depends(require_workspace_role(RoleEnum.USER))],
+)
+async def create_import(
+    workspace_id: int,
+    body: DriveImportCreate,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    importer: DriveImporter = Depends(get_drive_importer),
+):
+    """Import Google Drive files into a workspace on the server
+
+    The files are streamed from Drive into storage in the background; poll the returned job
+    for progress.
+    """
+    job = ImportJob(workspace_id=workspace_id, created_by=current_user.id)
+    items = [
+        ImportItem(job_id=job.id, google_drive_id=drive_id) for drive_id in body.google_drive_ids
+    ]
+    session.add(job)
+    # There is no relationship ordering the inserts, so the job must exist before its items
+    await session.flush()
+    session.add_all(items)
+    await session.commit()
+
+    importer.submit(
+        [
+            ImportTask(
+                item_id=item.id,
+                job_id=job.id,
+                workspace_id=workspace_id,
+                user_id=current_user.id,
+                google_drive_id=item.google_drive_id,
+            )
+            for item in items
+        ],
+        body.access_token,
+    )
+    return _to_response(job, items)
+
+
+@imports_router.get(
+    "/{job_id}",
+    response_model=DriveImportJobResponse,
+    dependencies=[Depends(require_workspace_role())],
+)
+async def get_import(
+    workspace_id: int,
+    job_id: str,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Get the progress of an import job started by the current user"""
+    job = await session.get(ImportJob, job_id)
+    if not job or job.workspace_id != workspace_id or job.created_by != current_user.id:
+        raise HTTPException(status_code=404, detail="Import not found")
+
+    items = (
+        await session.exec(
+            select(ImportItem).where(ImportItem.job_id == job_id).order_by(ImportItem.id)
+        )
+    ).all()
+    return _to_response(job, list(items))
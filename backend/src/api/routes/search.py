@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.api.auth.security import get_current_user
+from backend.src.config.settings import app_settings
+from backend.src.database.session import get_read_session
+from backend.src.models.user import User
+from backend.src.schemas.search import SearchResult
+from backend.src.services.pagination import NEXT_CURSOR_HEADER
+from backend.src.services.previews import to_file_response
+from backend.src.services.search import search_files
+
+search_router = APIRouter(prefix="/search", tags=["search"])
+
+
+@search_router.get("/", response_model=list[SearchResult])
+async def search(
+    response: Response,
+    q: str = Query(min_length=1, max_length=200),
+    workspace_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = Query(app_settings.PAGE_SIZE_DEFAULT, ge=1, le=app_settings.PAGE_SIZE_MAX),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+):
+    """Search files by name and content across the workspaces of the current user
+
+    Results are ordered by relevance. Snippets are HTML-escaped, with matches wrapped in <mark>.
+    """
+    try:
+        hits, next_cursor = await search_files(
+            session, current_user.id, q, workspace_id, cursor, limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return [
+        SearchResult(file=to_file_response(hit.file), rank=hit.rank, snippet=hit.snippet)
+        for hit in hits
+    ]
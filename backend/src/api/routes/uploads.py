@@ -0,0 +1,240 @@
+from collections.abc import AsyncIterator
+from dataclasses import asdict
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from sqlmodel import delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.requests import ClientDisconnect
+
+from backend.src.api.auth.permissions import require_workspace_role
+from backend.src.api.auth.security import get_current_user
+from backend.src.config.settings import app_settings
+from backend.src.database.session import get_session
+from backend.src.models.file import File
+from backend.src.models.upload_session import UploadSession
+from backend.src.models.user import User
+from backend.src.schemas.file import FileResponse
+from backend.src.schemas.upload import UploadSessionCreate, UploadSessionResponse
+from backend.src.services.blobs import acquire_blob, blob_key, ensure_blob_row, store_key, temp_key
+from backend.src.services.previews import schedule_previews, to_file_response
+from backend.src.services.response_cache import invalidate_workspace
+from backend.src.services.search import schedule_indexing
+from backend.src.services.storage import StorageBackend, StoragePart, get_storage
+from backend.src.services.workspaces import QuotaExceededError, check_quota, record_usage
+from backend.src.types.date import utc_now
+from backend.src.types.roles import RoleEnum
+
+# Uploading needs the same role as adding files any other way
+uploads_router = APIRouter(dependencies=[Depends(require_workspace_role(RoleEnum.USER))])
+
+
+async def _get_upload_session(
+    workspace_id: int, upload_id: str, current_user: User, session: AsyncSession
+) -> UploadSession:
+    """Load an upload session owned by the current user
+
+    Raises:
+        HTTPException: If the upload session does not exist or belongs to someone else
+    """
+    upload = await session.get(UploadSession, upload_id)
+    if not upload or upload.workspace_id != workspace_id or upload.uploaded_by != current_user.id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+
+    return upload
+
+
+def _to_response(upload: UploadSession, storage: StorageBackend) -> UploadSessionResponse:
+    return UploadSessionResponse(
+        id=upload.id,
+        filename=upload.filename,
+        size=upload.total_size,
+        offset=upload.received_size,
+        chunk_size=max(app_settings.UPLOAD_CHUNK_SIZE, storage.min_part_size),
+        created_at=upload.created_at,
+        updated_at=upload.updated_at,
+    )
+
+
+async def _request_chunks(request: Request) -> AsyncIterator[bytes]:
+    """Stream the request body, stopping quietly if the client goes away"""
+    try:
+        async for chunk in request.stream():
+            yield chunk
+    except ClientDisconnect:
+        return
+
+
+@uploads_router.post("/", response_model=UploadSessionResponse, status_code=201)
+async def create_upload(
+    workspace_id: int,
+    upload: UploadSessionCreate,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Start a chunked upload to a workspace"""
+    try:
+        await check_quota(session, workspace_id, upload.size)
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    storage_key = temp_key()
+    storage_upload_id = await storage.create_multipart(storage_key)
+
+    upload_session = UploadSession(
+        workspace_id=workspace_id,
+        uploaded_by=current_user.id,
+        filename=upload.filename,
+        mime_type=upload.mime_type,
+        google_drive_id=upload.google_drive_id,
+        total_size=upload.size,
+        storage_key=storage_key,
+        storage_upload_id=storage_upload_id,
+    )
+    session.add(upload_session)
+    await session.commit()
+    await session.refresh(upload_session)
+
+    return _to_response(upload_session, storage)
+
+
+@uploads_router.get("/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload(
+    workspace_id: int,
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Get the state of a chunked upload, including the offset to resume from"""
+    upload = await _get_upload_session(workspace_id, upload_id, current_user, session)
+    return _to_response(upload, storage)
+
+
+@uploads_router.put("/{upload_id}", response_model=UploadSessionResponse)
+async def upload_chunk(
+    workspace_id: int,
+    upload_id: str,
+    request: Request,
+    offset: int = Query(ge=0),
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Append a chunk to a chunked upload
+
+    The chunk must start at the offset the server already has. If the connection drops
+    mid-chunk, the bytes received so far are kept when the storage backend can hold them as a
+    part, and the client resumes from the returned offset.
+    """
+    upload = await _get_upload_session(workspace_id, upload_id, current_user, session)
+
+    if offset != upload.received_size:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Offset mismatch, expected {upload.received_size}",
+            headers={"Upload-Offset": str(upload.received_size)},
+        )
+
+    content_length = request.headers.get("content-length")
+    if content_length and offset + int(content_length) > upload.total_size:
+        raise HTTPException(status_code=413, detail="Chunk exceeds the declared file size")
+
+    try:
+        part = await storage.upload_part(
+            upload.storage_key,
+            upload.storage_upload_id,
+            part_number=len(upload.parts) + 1,
+            offset=offset,
+            chunks=_request_chunks(request),
+            limit=upload.total_size - offset,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    # Parts below the backend minimum are only valid as the last one; otherwise the client
+    # sends the chunk again and it overwrites this part
+    is_last = offset + part.size == upload.total_size
+    if part.size and (is_last or part.size >= storage.min_part_size):
+        upload.parts = [*upload.parts, asdict(part)]
+        upload.received_size = offset + part.size
+        upload.updated_at = utc_now()
+        session.add(upload)
+        await session.commit()
+        await session.refresh(upload)
+
+    return _to_response(upload, storage)
+
+
+@uploads_router.post("/{upload_id}/complete", response_model=FileResponse)
+async def complete_upload(
+    workspace_id: int,
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Finish a chunked upload and register the assembled file in the workspace"""
+    upload = await _get_upload_session(workspace_id, upload_id, current_user, session)
+
+    if upload.received_size != upload.total_size:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Upload incomplete, received {upload.received_size} of {upload.total_size} bytes",
+        )
+
+    await storage.complete_multipart(
+        upload.storage_key,
+        upload.storage_upload_id,
+        [StoragePart(**part) for part in upload.parts],
+    )
+    digest, file_size = await store_key(session.bind, storage, upload.storage_key)
+
+    db_file = File(
+        name=upload.filename,
+        file_path=blob_key(digest),
+        file_size=file_size,
+        mime_type=upload.mime_type,
+        workspace_id=workspace_id,
+        uploaded_by=current_user.id,
+        google_drive_id=upload.google_drive_id,
+        blob_digest=digest,
+    )
+    await acquire_blob(session, digest, file_size)
+    session.add(db_file)
+    await session.delete(upload)
+    try:
+        await record_usage(session, workspace_id, 1, file_size)
+    except QuotaExceededError as e:
+        await session.rollback()
+        await session.exec(delete(UploadSession).where(UploadSession.id == upload_id))
+        # The stored content stays registered without references, for garbage collection
+        await ensure_blob_row(session, digest, file_size)
+        await session.commit()
+        raise HTTPException(status_code=413, detail=str(e))
+    await session.commit()
+    await session.refresh(db_file)
+    await invalidate_workspace(session, workspace_id)
+    schedule_previews(background_tasks, session.bind, storage, [db_file])
+    schedule_indexing(background_tasks, session.bind, storage, [db_file])
+
+    return to_file_response(db_file)
+
+
+@uploads_router.delete("/{upload_id}", status_code=204)
+async def abort_upload(
+    workspace_id: int,
+    upload_id: str,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Abort a chunked upload and discard the bytes received so far"""
+    upload = await _get_upload_session(workspace_id, upload_id, current_user, session)
+
+    await storage.abort_multipart(upload.storage_key, upload.storage_upload_id)
+    await session.delete(upload)
+    await session.commit()
+
+    return None
@@ -1,77 +1,109 @@
-import shutil
-
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from backend.src.api.auth.permissions import invalidate_membership, require_workspace_role
 from backend.src.api.auth.security import get_current_user
+from backend.src.api.caching import listing_page, serve_cached
 from backend.src.api.routes.files import files_router
+from backend.src.api.routes.imports import imports_router
+from backend.src.api.routes.uploads import uploads_router
 from backend.src.config.settings import app_settings
-from backend.src.database.session import get_session
+from backend.src.database.session import get_read_session, get_session
 from backend.src.models.user import User
 from backend.src.models.workspace import Workspace, WorkspaceMember
+from backend.src.models.workspace_deletion import WorkspaceDeletion
 from backend.src.schemas.workspace import (
     WorkspaceAddMember,
     WorkspaceCreate,
-    WorkspaceMemberResponse,
+    WorkspaceDeletionResponse,
     WorkspaceResponse,
 )
+from backend.src.services.pagination import SortOrder, paginate
+from backend.src.services.response_cache import (
+    CachedPage,
+    ResponseCache,
+    get_response_cache,
+    invalidate,
+    user_scope,
+)
+from backend.src.services.storage import StorageBackend, get_storage
+from backend.src.services.workspace_deletion import schedule_purge, start_workspace_deletion
+from backend.src.services.workspaces import (
+    WITH_MEMBERS,
+    get_workspace_with_members,
+    to_workspace_response,
+)
 from backend.src.types.roles import RoleEnum
 
 workspace_router = APIRouter(prefix="/workspaces", tags=["workspaces"])
 
 # Include files subrouter
+workspace_router.include_router(
+    uploads_router, prefix="/{workspace_id}/files/uploads", tags=["files"]
+)
+workspace_router.include_router(
+    imports_router, prefix="/{workspace_id}/files/imports", tags=["files"]
+)
 workspace_router.include_router(files_router, prefix="/{workspace_id}/files", tags=["files"])
 
 
+def _to_deletion_response(deletion: WorkspaceDeletion) -> WorkspaceDeletionResponse:
+    return WorkspaceDeletionResponse(
+        id=deletion.id,
+        workspace_id=deletion.workspace_id,
+        status="completed" if deletion.finished_at else "running",
+        total_files=deletion.total_files,
+        deleted_files=deletion.deleted_files,
+        created_at=deletion.created_at,
+        finished_at=deletion.finished_at,
+    )
+
+
 @workspace_router.get("/", response_model=list[WorkspaceResponse])
-def get_workspaces(
+async def get_workspaces(
+    request: Request,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
-    skip: int = 0,
-    limit: int = 100,
+    session: AsyncSession = Depends(get_read_session),
+    response_cache: ResponseCache | None = Depends(get_response_cache),
+    cursor: str | None = None,
+    limit: int = Query(app_settings.PAGE_SIZE_DEFAULT, ge=1, le=app_settings.PAGE_SIZE_MAX),
+    order: SortOrder = "asc",
 ):
-    """Get workspaces for the current authenticated user"""
-    statement = (
-        select(Workspace)
-        .join(WorkspaceMember)
-        .where(WorkspaceMember.user_id == current_user.id)
-        .offset(skip)
-        .limit(limit)
-    )
-    workspaces = session.exec(statement).all()
-
-    response = []
-    for workspace in workspaces:
-        members = [
-            WorkspaceMemberResponse(
-                id=member.user.id,
-                email=member.user.email,
-                name=member.user.full_name,
-                picture=member.user.google_picture,
-                role=member.role,
-            )
-            for member in workspace.members
-        ]
-        response.append(
-            WorkspaceResponse(
-                id=workspace.id,
-                name=workspace.name,
-                description=workspace.description,
-                created_at=workspace.created_at,
-                updated_at=workspace.updated_at,
-                created_by=workspace.created_by,
-                members=members,
+    """Get a page of workspaces for the current authenticated user"""
+
+    async def build() -> CachedPage:
+        statement = (
+            select(Workspace)
+            .join(WorkspaceMember)
+            .where(WorkspaceMember.user_id == current_user.id)
+            .options(WITH_MEMBERS)
+        )
+        try:
+            workspaces, next_cursor = await paginate(
+                session, statement, Workspace.created_at, Workspace.id, cursor, limit, order
             )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return listing_page(
+            [to_workspace_response(workspace) for workspace in workspaces], next_cursor
         )
 
-    return response
+    return await serve_cached(
+        request,
+        response_cache,
+        session,
+        user_scope(current_user.id),
+        ("workspaces", current_user.id, cursor, limit, order),
+        build,
+    )
 
 
 @workspace_router.post("/", response_model=WorkspaceResponse)
-def create_workspace(
+async def create_workspace(
     workspace: WorkspaceCreate,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
     """Create a new workspace and add the current user as admin"""
 
@@ -79,113 +111,101 @@ def create_workspace(
         name=workspace.name, description=workspace.description, created_by=current_user.id
     )
     session.add(new_workspace)
-    session.commit()
-    session.refresh(new_workspace)
+    await session.commit()
+    await session.refresh(new_workspace)
 
     # Add creator as ADMIN member
     workspace_member = WorkspaceMember(
         workspace_id=new_workspace.id, user_id=current_user.id, role=RoleEnum.ADMIN
     )
     session.add(workspace_member)
-    session.commit()
-    session.refresh(workspace_member)
-
-    return WorkspaceResponse(
-        id=new_workspace.id,
-        name=new_workspace.name,
-        description=new_workspace.description,
-        created_at=new_workspace.created_at,
-        updated_at=new_workspace.updated_at,
-        created_by=new_workspace.created_by,
-        members=[
-            WorkspaceMemberResponse(
-                id=current_user.id,
-                email=current_user.email,
-                name=current_user.full_name,
-                picture=current_user.google_picture,
-                role=RoleEnum.ADMIN,
-            )
-        ],
-    )
+    await session.commit()
+    await invalidate(user_ids=[current_user.id])
 
+    return to_workspace_response(await get_workspace_with_members(session, new_workspace.id))
 
-@workspace_router.put("/{workspace_id}", response_model=WorkspaceResponse)
-def update_workspace(
+
+@workspace_router.put(
+    "/{workspace_id}",
+    response_model=WorkspaceResponse,
+    dependencies=[Depends(require_workspace_role(RoleEnum.ADMIN))],
+)
+async def update_workspace(
     workspace_id: int,
     workspace: WorkspaceCreate,
-    current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
     """Update an existing workspace"""
-    existing_workspace = session.get(Workspace, workspace_id)
+    existing_workspace = await session.get(Workspace, workspace_id)
     if not existing_workspace:
         raise HTTPException(status_code=404, detail="Workspace not found")
 
     existing_workspace.name = workspace.name
     existing_workspace.description = workspace.description
     session.add(existing_workspace)
-    session.commit()
-    session.refresh(existing_workspace)
-
-    members = [
-        WorkspaceMemberResponse(
-            id=member.user.id,
-            email=member.user.email,
-            name=member.user.full_name,
-            picture=member.user.google_picture,
-            role=member.role,
-        )
-        for member in existing_workspace.members
-    ]
-
-    return WorkspaceResponse(
-        id=existing_workspace.id,
-        name=existing_workspace.name,
-        description=existing_workspace.description,
-        created_at=existing_workspace.created_at,
-        updated_at=existing_workspace.updated_at,
-        created_by=existing_workspace.created_by,
-        members=members,
-    )
+    await session.commit()
+
+    updated_workspace = await get_workspace_with_members(session, workspace_id)
+    await invalidate([workspace_id], [member.user_id for member in updated_workspace.members])
+    return to_workspace_response(updated_workspace)
 
 
-@workspace_router.delete("/{workspace_id}")
-def delete_workspace(
+@workspace_router.delete(
+    "/{workspace_id}",
+    response_model=WorkspaceDeletionResponse,
+    status_code=202,
+    dependencies=[Depends(require_workspace_role(RoleEnum.ADMIN))],
+)
+async def delete_workspace(
     workspace_id: int,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session),
-) -> None:
-    """Delete a workspace"""
-    existing_workspace = session.get(Workspace, workspace_id)
+    session: AsyncSession = Depends(get_session),
+    storage: StorageBackend = Depends(get_storage),
+):
+    """Delete a workspace
+
+    The workspace is gone for its members right away; its files are removed in the
+    background, and the returned deletion can be polled for progress.
+    """
+    existing_workspace = await session.get(Workspace, workspace_id)
     if not existing_workspace:
         raise HTTPException(status_code=404, detail="Workspace not found")
 
-    workspace_dir = app_settings.STORAGE_BASE_PATH / str(workspace_id)
-    if workspace_dir.exists():
-        try:
-            shutil.rmtree(workspace_dir)
-        except Exception as e:
-            print(f"Warning: Failed to delete workspace directory: {str(e)}")
+    deletion = await start_workspace_deletion(session, existing_workspace, current_user.id)
+    invalidate_membership(workspace_id)
+    schedule_purge(background_tasks, session.bind, storage, deletion)
+
+    return _to_deletion_response(deletion)
 
-    session.delete(existing_workspace)
-    session.commit()
 
-    return
+@workspace_router.get("/deletions/{deletion_id}", response_model=WorkspaceDeletionResponse)
+async def get_workspace_deletion(
+    deletion_id: str,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """Get the progress of a workspace deletion started by the current user"""
+    deletion = await session.get(WorkspaceDeletion, deletion_id)
+    if not deletion or deletion.requested_by != current_user.id:
+        raise HTTPException(status_code=404, detail="Deletion not found")
+
+    return _to_deletion_response(deletion)
 
 
-@workspace_router.post("/{workspace_id}/members", response_model=WorkspaceResponse)
-def add_workspace_member(
+@workspace_router.post(
+    "/{workspace_id}/members",
+    response_model=WorkspaceResponse,
+    dependencies=[Depends(require_workspace_role(RoleEnum.ADMIN))],
+)
+async def add_workspace_member(
     workspace_id: int,
     member: WorkspaceAddMember,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
 ):
     """Add a member to a workspace by email (creates user if needed)"""
-    existing_workspace = session.get(Workspace, workspace_id)
-    if not existing_workspace:
-        raise HTTPException(status_code=404, detail="Workspace not found")
-
     # Try to find existing user by email
-    user_to_add = session.exec(select(User).where(User.email == member.email)).first()
+    user_to_add = (await session.exec(select(User).where(User.email == member.email))).first()
 
     if not user_to_add:
         # User doesn't exist yet - store email for invitation
@@ -196,9 +216,12 @@ def add_workspace_member(
         )
 
     # Check if user is already a member
-    existing_member = session.exec(
-        select(WorkspaceMember).where(
-            WorkspaceMember.workspace_id == workspace_id, WorkspaceMember.user_id == user_to_add.id
+    existing_member = (
+        await session.exec(
+            select(WorkspaceMember).where(
+                WorkspaceMember.workspace_id == workspace_id,
+                WorkspaceMember.user_id == user_to_add.id,
+            )
         )
     ).first()
     if existing_member:
@@ -208,26 +231,9 @@ def add_workspace_member(
         workspace_id=workspace_id, user_id=user_to_add.id, role=member.role
     )
     session.add(workspace_member)
-    session.commit()
-    session.refresh(existing_workspace)
-
-    members = [
-        WorkspaceMemberResponse(
-            id=m.user.id,
-            email=m.user.email,
-            name=m.user.full_name,
-            picture=m.user.google_picture,
-            role=m.role,
-        )
-        for m in existing_workspace.members
-    ]
-
-    return WorkspaceResponse(
-        id=existing_workspace.id,
-        name=existing_workspace.name,
-        description=existing_workspace.description,
-        created_at=existing_workspace.created_at,
-        updated_at=existing_workspace.updated_at,
-        created_by=existing_workspace.created_by,
-        members=members,
-    )
+    await session.commit()
+    invalidate_membership(workspace_id, user_to_add.id)
+
+    updated_workspace = await get_workspace_with_members(session, workspace_id)
+    await invalidate([workspace_id], [member.user_id for member in updated_workspace.members])
+    return to_workspace_response(updated_workspace)
@@ -1,23 +1,23 @@
 from contextlib import asynccontextmanager
 
+import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import Session, delete
 
+from backend.src.api.auth.google import GoogleKeySet
+from backend.src.api.metrics import MetricsMiddleware, metrics_router
 from backend.src.api.routes.auth import auth_router
+from backend.src.api.routes.downloads import downloads_router
+from backend.src.api.routes.search import search_router
 from backend.src.api.routes.workspace import workspace_router
 from backend.src.config.settings import app_settings
 from backend.src.database.session import create_db_and_tables, engine
-from backend.src.models.token_blacklist import TokenBlacklist
-from backend.src.types.date import utc_now
-
-
-def cleanup_expired_tokens():
-    """Remove expired tokens from blacklist"""
-    with Session(engine) as session:
-        statement = delete(TokenBlacklist).where(TokenBlacklist.expires_at < utc_now())
-        session.exec(statement)
-        session.commit()
+from backend.src.services.drive_import import DriveImporter
+from backend.src.services.maintenance import build_scheduler
+from backend.src.services.pagination import NEXT_CURSOR_HEADER
+from backend.src.services.process_pool import shutdown_process_pool
+from backend.src.services.response_cache import get_response_cache
+from backend.src.services.storage import get_storage
 
 
 @asynccontextmanager
@@ -25,11 +25,31 @@ async def lifespan_event(app: FastAPI):
     print("Starting up...")
     # Create tables only if they don't exist (dev mode)
     # TODO: Later, use alembic migrations for production
-    create_db_and_tables()
-    # Clean up expired tokens on startup
-    cleanup_expired_tokens()
+    await create_db_and_tables()
+    # Periodic maintenance: expired tokens, orphan blobs, abandoned uploads and imports
+    scheduler = build_scheduler(engine, get_storage())
+    app.state.scheduler = scheduler
+    if app_settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    # Pooled HTTP client shared by every outgoing call to Google
+    http_client = httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=10.0))
+    # Keys Google ID tokens are verified against at login
+    google_keys = GoogleKeySet(http_client, app_settings.GOOGLE_CERTS_URL)
+    app.state.google_keys = google_keys
+    google_keys.start()
+    # Server-side Google Drive imports
+    drive_importer = DriveImporter(engine, get_storage(), http_client)
+    app.state.drive_importer = drive_importer
+    drive_importer.start()
     yield
     print("Shutting down...")
+    await drive_importer.stop()
+    await google_keys.stop()
+    await http_client.aclose()
+    if (response_cache := get_response_cache()) is not None:
+        await response_cache.close()
+    await scheduler.stop()
+    shutdown_process_pool()
 
 
 app = FastAPI(title="Data Room", version="1.0.0", lifespan=lifespan_event)
@@ -41,7 +61,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Added last so it wraps everything else, CORS included
+if app_settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics_router)
+
 app.include_router(workspace_router, prefix="/api")
 app.include_router(auth_router, prefix="/api")
+app.include_router(downloads_router, prefix="/api")
+app.include_router(search_router, prefix="/api")
@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -14,10 +15,18 @@ class DatabaseSettings(BaseSettings):
     HOST: str
     DATABASE: str
     PORT: int
+    POOL_SIZE: int = 20
+    MAX_OVERFLOW: int = 40
+    POOL_TIMEOUT_SECONDS: float = 30
+    POOL_RECYCLE_SECONDS: int = 1800
+    STATEMENT_TIMEOUT_MS: int = 30_000
+    REPLICA_URLS: list[str] = []
+    REPLICA_STICKY_SECONDS: float = 5
+    REPLICA_COOLDOWN_SECONDS: float = 30
 
     @property
     def db_url(self) -> str:
-        return f"postgresql+psycopg2://{self.USER}:{self.PASSWORD.get_secret_value()}@{self.HOST}:{self.PORT}/{self.DATABASE}"
+        return f"postgresql+asyncpg://{self.USER}:{self.PASSWORD.get_secret_value()}@{self.HOST}:{self.PORT}/{self.DATABASE}"
 
 
 class AppSettings(BaseSettings):
@@ -25,9 +34,62 @@ class AppSettings(BaseSettings):
     SECRET_KEY: SecretStr
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    TOKEN_CACHE_MAX_SIZE: int = 10_000
+    TOKEN_CACHE_TTL_SECONDS: int = 60
+    TOKEN_REVOCATION_REFRESH_SECONDS: int = 5
+    MEMBERSHIP_CACHE_MAX_SIZE: int = 10_000
+    MEMBERSHIP_CACHE_TTL_SECONDS: int = 30
     GOOGLE_CLIENT_ID: str = ""
+    GOOGLE_CERTS_URL: str = "https://www.googleapis.com/oauth2/v3/certs"
+    GOOGLE_DRIVE_API_URL: str = "https://www.googleapis.com/drive/v3"
+    DRIVE_IMPORT_MAX_FILES: int = 500
+    DRIVE_IMPORT_WORKERS: int = 8
+    DRIVE_IMPORT_PER_USER: int = 2
+    DRIVE_IMPORT_MAX_ATTEMPTS: int = 5
+    DRIVE_IMPORT_BACKOFF_SECONDS: float = 1.0
+    DRIVE_IMPORT_STALE_SECONDS: int = 7200
     ALLOWED_ORIGINS: list[str] = ["*"]
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 500
+    WORKSPACE_STORAGE_QUOTA_BYTES: int | None = None
+    STORAGE_BACKEND: Literal["local", "s3"] = "local"
     STORAGE_BASE_PATH: Path = Path(__file__).parent.parent / "storage"
+    S3_BUCKET: str = ""
+    S3_PREFIX: str = ""
+    S3_ENDPOINT_URL: str | None = None
+    S3_REGION: str | None = None
+    S3_ACCESS_KEY_ID: str | None = None
+    S3_SECRET_ACCESS_KEY: SecretStr | None = None
+    S3_MAX_POOL_CONNECTIONS: int = 50
+    S3_PRESIGNED_URL_EXPIRE_SECONDS: int = 300
+    DOWNLOAD_URL_EXPIRE_SECONDS: int = 300
+    UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024
+    UPLOAD_SESSION_TTL_HOURS: int = 24
+    BATCH_UPLOAD_MAX_FILES: int = 500
+    BATCH_UPLOAD_CONCURRENCY: int = 8
+    PROCESS_POOL_WORKERS: int = 2
+    PREVIEW_SIZES: list[int] = [160, 480, 1024]
+    PREVIEW_THUMBNAIL_SIZE: int = 480
+    PREVIEW_MAX_SOURCE_BYTES: int = 50 * 1024 * 1024
+    PREVIEW_URL_EXPIRE_SECONDS: int = 3600
+    SEARCH_MAX_SOURCE_BYTES: int = 50 * 1024 * 1024
+    SEARCH_MAX_TEXT_CHARS: int = 200_000
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: SecretStr | None = None
+    RESPONSE_CACHE_BACKEND: Literal["none", "memory", "redis"] = "none"
+    RESPONSE_CACHE_TTL_SECONDS: int = 300
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10_000
+    RESPONSE_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    SCHEDULER_ENABLED: bool = True
+    MAINTENANCE_BATCH_SIZE: int = 500
+    MAINTENANCE_BATCH_PAUSE_SECONDS: float = 0.1
+    TOKEN_PURGE_INTERVAL_SECONDS: int = 3600
+    BLOB_GC_INTERVAL_SECONDS: int = 3600
+    BLOB_GC_GRACE_SECONDS: int = 3600
+    UPLOAD_CLEANUP_INTERVAL_SECONDS: int = 900
+    SEARCH_INDEX_INTERVAL_SECONDS: int = 300
+    USAGE_RECONCILE_INTERVAL_SECONDS: int = 3600
+    WORKSPACE_PURGE_INTERVAL_SECONDS: int = 300
 
 
 database_settings = DatabaseSettings()
@@ -0,0 +1,48 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from backend.src.services.metrics import record_pool_wait, record_query
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Connection pool recording how long each checkout waits for a connection
+
+    The wait includes opening a new connection when the pool grows into its overflow. Metrics
+    are labelled with the pool's `pool_logging_name`.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            record_pool_wait(self.logging_name or "default", time.perf_counter() - started)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Record the number and duration of the queries an engine runs
+
+    Args:
+        engine: Engine to instrument
+        name: Label of the engine in the metrics, e.g. "primary"
+    """
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        record_query(name, time.perf_counter() - started)
+
+    def handle_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started"):
+            started = connection.info["query_started"].pop()
+            record_query(name, time.perf_counter() - started)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", handle_error)
@@ -0,0 +1,105 @@
+import itertools
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import ORMExecuteState
+from sqlalchemy.sql.dml import UpdateBase
+from sqlmodel import Session
+
+from backend.src.config.settings import database_settings
+from backend.src.services.ttl_cache import TTLCache
+
+
+class ReplicaSet:
+    """Read replicas with passive health tracking
+
+    A replica whose connection fails is taken out of rotation for a cooldown period, during
+    which reads fall back to the other replicas or to the primary.
+
+    Args:
+        engines: Engines of the read replicas
+        cooldown: Seconds a failed replica stays out of rotation
+    """
+
+    def __init__(self, engines: list[AsyncEngine], cooldown: float):
+        self.engines = engines
+        self.cooldown = cooldown
+        self._down_until: dict[AsyncEngine, float] = {}
+        self._turn = itertools.count()
+        for engine in engines:
+            event.listen(engine.sync_engine, "handle_error", self._on_error(engine))
+
+    def _on_error(self, engine: AsyncEngine):
+        def handle_error(context: ExceptionContext) -> None:
+            # Failing to connect, or losing the connection, means the replica is unhealthy
+            if context.connection is None or context.is_disconnect:
+                self.mark_down(engine)
+
+        return handle_error
+
+    def mark_down(self, engine: AsyncEngine) -> None:
+        """Take a replica out of rotation for the cooldown period"""
+        self._down_until[engine] = time.monotonic() + self.cooldown
+        print(f"Warning: read replica {engine.url.render_as_string()} is unavailable")
+
+    def choose(self) -> AsyncEngine | None:
+        """Pick a healthy replica in round-robin order
+
+        Returns:
+            AsyncEngine | None: A healthy replica, or None if there is none
+        """
+        now = time.monotonic()
+        healthy = [engine for engine in self.engines if self._down_until.get(engine, 0) <= now]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+
+# Users who wrote recently, so their reads see their own writes despite replication lag
+recent_writers = TTLCache(max_size=100_000, ttl=database_settings.REPLICA_STICKY_SECONDS)
+
+
+class RoutingSession(Session):
+    """Session sending reads to a replica and writes to the primary
+
+    A session opened for writing always uses the primary. A read session picks one replica on
+    its first query and sticks to it, unless its user wrote within the last few seconds or the
+    session itself writes, by flushing objects or executing DML statements; then it uses the
+    primary. The routing inputs are stored in
+    `Session.info` by `open_session`.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary: AsyncEngine = self.info["primary"]
+        if self.info.get("use_primary") or self._flushing or isinstance(clause, UpdateBase):
+            return primary.sync_engine
+
+        if "reader" not in self.info:
+            user_id = getattr(self.info.get("state"), "user_id", None)
+            sticky = user_id is not None and recent_writers.get(user_id, False)
+            replicas: ReplicaSet | None = self.info.get("replicas")
+            self.info["reader"] = None if sticky or replicas is None else replicas.choose()
+
+        reader: AsyncEngine | None = self.info["reader"]
+        return (reader or primary).sync_engine
+
+
+def _remember_writer(session: Session) -> None:
+    session.info["use_primary"] = True
+    user_id = getattr(session.info.get("state"), "user_id", None)
+    if user_id is not None:
+        recent_writers.set(user_id, True)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _remember_flush(session: Session, flush_context) -> None:
+    _remember_writer(session)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _remember_statement(orm_execute_state: ORMExecuteState) -> None:
+    # Core INSERT, UPDATE and DELETE statements write without flushing
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _remember_writer(orm_execute_state.session)
@@ -1,31 +1,139 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 
-from sqlmodel import Session, SQLModel, create_engine
+from fastapi import Request
+from sqlalchemy import Connection, DateTime, text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from backend.src.config.settings import app_settings, database_settings
+from backend.src.database.instrumentation import TimedQueuePool, instrument_engine
+from backend.src.database.routing import ReplicaSet, RoutingSession
 
-engine = create_engine(
-    database_settings.db_url,
-    echo=app_settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10,
+
+def _create_engine(url: str, name: str) -> AsyncEngine:
+    engine = create_async_engine(
+        url,
+        echo=app_settings.DEBUG,
+        poolclass=TimedQueuePool,
+        pool_logging_name=name,
+        pool_pre_ping=True,
+        pool_size=database_settings.POOL_SIZE,
+        max_overflow=database_settings.MAX_OVERFLOW,
+        pool_timeout=database_settings.POOL_TIMEOUT_SECONDS,
+        pool_recycle=database_settings.POOL_RECYCLE_SECONDS,
+        connect_args={
+            "server_settings": {"statement_timeout": str(database_settings.STATEMENT_TIMEOUT_MS)}
+        },
+    )
+    instrument_engine(engine, name)
+    return engine
+
+
+engine = _create_engine(database_settings.db_url, "primary")
+replicas = ReplicaSet(
+    [
+        _create_engine(url, f"replica-{index}")
+        for index, url in enumerate(database_settings.REPLICA_URLS)
+    ],
+    cooldown=database_settings.REPLICA_COOLDOWN_SECONDS,
 )
 
 
-def create_db_and_tables() -> None:
+def upgrade_timestamp_columns(connection: Connection) -> list[str]:
+    """Convert timestamp columns created without a time zone on PostgreSQL
+
+    Tables created before the timestamp columns declared a time zone hold naive UTC values,
+    which asyncpg refuses to compare with or replace by the aware values of `utc_now`.
+
+    Args:
+        connection: Connection to the database
+
+    Returns:
+        list[str]: Converted columns, as `table.column`
+    """
+    if connection.dialect.name != "postgresql":
+        return []
+    naive = set(
+        connection.execute(
+            text(
+                "SELECT table_name, column_name FROM information_schema.columns"
+                " WHERE table_schema = current_schema()"
+                " AND data_type = 'timestamp without time zone'"
+            )
+        ).all()
+    )
+    converted = []
+    for table in SQLModel.metadata.sorted_tables:
+        for column in table.columns:
+            if not isinstance(column.type, DateTime) or not column.type.timezone:
+                continue
+            if (table.name, column.name) not in naive:
+                continue
+            connection.execute(
+                text(
+                    f'ALTER TABLE "{table.name}" ALTER COLUMN "{column.name}"'
+                    f" TYPE TIMESTAMP WITH TIME ZONE USING \"{column.name}\" AT TIME ZONE 'UTC'"
+                )
+            )
+            converted.append(f"{table.name}.{column.name}")
+    return converted
+
+
+async def create_db_and_tables() -> None:
     """Create database and tables
     Returns:
         None: Create database and tables
     """
-    SQLModel.metadata.create_all(engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.create_all)
+        if converted := await connection.run_sync(upgrade_timestamp_columns):
+            print(f"Converted timestamp columns to UTC: {', '.join(converted)}")
+
+
+def open_session(
+    primary: AsyncEngine, replicas: ReplicaSet | None, state=None, read_only: bool = False
+) -> AsyncSession:
+    """Open a session routed between the primary and the read replicas
+
+    Args:
+        primary: Engine of the primary database
+        replicas: Read replicas, if any
+        state: Request state carrying the authenticated `user_id`, used for stickiness
+        read_only: Whether reads may go to a replica
+
+    Returns:
+        AsyncSession: New session; objects stay usable after a commit, since reloading
+        expired attributes would need an implicit query
+    """
+    return AsyncSession(
+        primary,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        info={
+            "primary": primary,
+            "replicas": replicas,
+            "state": state,
+            "use_primary": not read_only,
+        },
+    )
+
+
+async def get_session(request: Request) -> AsyncGenerator[AsyncSession]:
+    """Create a new database session on the primary
+    Yields:
+        AsyncGenerator[AsyncSession, None]: SQLModel AsyncSession object
+    """
+    async with open_session(engine, replicas, request.state) as session:
+        yield session
 
 
-def get_session() -> Generator[Session]:
-    """Create a new database session
-    Context manager that yields a SQLModel Session object.
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession]:
+    """Create a new database session for read-only routes
+    Reads go to a healthy replica, or to the primary if there is none or if the user wrote
+    within the last REPLICA_STICKY_SECONDS.
     Yields:
-        Generator[Session, None, None]: SQLModel Session object
+        AsyncGenerator[AsyncSession, None]: SQLModel AsyncSession object
     """
-    with Session(engine) as session:
+    async with open_session(engine, replicas, request.state, read_only=True) as session:
         yield session
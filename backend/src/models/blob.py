@@ -0,0 +1,17 @@
+import datetime as dt
+
+from sqlmodel import Field, SQLModel
+
+from backend.src.types.date import UTCDateTime, utc_now
+
+
+class Blob(SQLModel, table=True):
+    """Content-addressed blob shared by every file with the same content"""
+
+    __tablename__ = "blobs"
+
+    digest: str = Field(primary_key=True, max_length=64)
+    size: int = Field(default=0)
+    ref_count: int = Field(default=0, index=True)
+    created_at: dt.datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
+    updated_at: dt.datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
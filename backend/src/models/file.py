@@ -1,9 +1,9 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlmodel import Field, Relationship, SQLModel
+from sqlmodel import Field, Index, Relationship, SQLModel
 
-from backend.src.types.date import utc_now
+from backend.src.types.date import UTCDateTime, utc_now
 
 if TYPE_CHECKING:
     from backend.src.models.workspace import Workspace
@@ -26,12 +26,14 @@ class File(FileBase, table=True):
     """File database model"""
 
     __tablename__ = "files"
+    __table_args__ = (Index("ix_files_workspace_created", "workspace_id", "created_at", "id"),)
 
     id: int | None = Field(default=None, primary_key=True)
-    workspace_id: int = Field(foreign_key="workspaces.id")
+    workspace_id: int = Field(foreign_key="workspaces.id", ondelete="CASCADE")
     uploaded_by: int = Field(foreign_key="users.id")
-    created_at: datetime = Field(default_factory=utc_now)
-    updated_at: datetime = Field(default_factory=utc_now)
+    blob_digest: str | None = Field(default=None, foreign_key="blobs.digest", index=True)
+    created_at: datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
+    updated_at: datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
 
     # Relationships
     workspace: "Workspace" = Relationship(back_populates="files")
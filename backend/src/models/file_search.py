@@ -0,0 +1,76 @@
+from datetime import datetime
+
+from sqlalchemy import DDL, Text, event
+from sqlmodel import Field, SQLModel
+
+from backend.src.types.date import UTCDateTime, utc_now
+
+
+class FileSearch(SQLModel, table=True):
+    """Name and extracted text of a file, indexed for full-text search
+
+    The index itself depends on the database: Postgres keeps a generated `document` tsvector
+    column with a GIN index, SQLite an external-content FTS5 table kept in sync by triggers.
+    Both are created along with the table.
+    """
+
+    __tablename__ = "file_search"
+
+    file_id: int = Field(foreign_key="files.id", primary_key=True, ondelete="CASCADE")
+    workspace_id: int = Field(foreign_key="workspaces.id", index=True, ondelete="CASCADE")
+    name: str = Field(max_length=255)
+    body: str = Field(default="", sa_type=Text)
+    indexed_at: datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
+
+
+# File names are split on dots, dashes and underscores so "q3-report.pdf" matches "report"
+POSTGRES_DDL = [
+    """
+    ALTER TABLE file_search ADD COLUMN document tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', translate(name, '._-', '   ')), 'A')
+        || setweight(to_tsvector('english', body), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX ix_file_search_document ON file_search USING gin (document)",
+]
+SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE file_search_fts USING fts5(
+        name, body, content='file_search', content_rowid='file_id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER file_search_ai AFTER INSERT ON file_search BEGIN
+        INSERT INTO file_search_fts (rowid, name, body)
+        VALUES (new.file_id, new.name, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER file_search_ad AFTER DELETE ON file_search BEGIN
+        INSERT INTO file_search_fts (file_search_fts, rowid, name, body)
+        VALUES ('delete', old.file_id, old.name, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER file_search_au AFTER UPDATE ON file_search BEGIN
+        INSERT INTO file_search_fts (file_search_fts, rowid, name, body)
+        VALUES ('delete', old.file_id, old.name, old.body);
+        INSERT INTO file_search_fts (rowid, name, body)
+        VALUES (new.file_id, new.name, new.body);
+    END
+    """,
+]
+
+for statement in POSTGRES_DDL:
+    event.listen(
+        FileSearch.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql")
+    )
+for statement in SQLITE_DDL:
+    event.listen(FileSearch.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+# The triggers go with the table, the FTS5 table does not
+event.listen(
+    FileSearch.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS file_search_fts").execute_if(dialect="sqlite"),
+)
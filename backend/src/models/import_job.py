@@ -0,0 +1,34 @@
+import datetime as dt
+from uuid import uuid4
+
+from sqlmodel import Field, SQLModel
+
+from backend.src.types.date import UTCDateTime, utc_now
+from backend.src.types.imports import ImportStatusEnum
+
+
+class ImportJob(SQLModel, table=True):
+    """Batch of Google Drive files imported into a workspace on the server"""
+
+    __tablename__ = "import_jobs"
+
+    id: str = Field(default_factory=lambda: uuid4().hex, primary_key=True, max_length=32)
+    workspace_id: int = Field(foreign_key="workspaces.id", index=True, ondelete="CASCADE")
+    created_by: int = Field(foreign_key="users.id", index=True)
+    created_at: dt.datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
+
+
+class ImportItem(SQLModel, table=True):
+    """One Google Drive file of an import job"""
+
+    __tablename__ = "import_items"
+
+    id: int | None = Field(default=None, primary_key=True)
+    job_id: str = Field(foreign_key="import_jobs.id", index=True, ondelete="CASCADE")
+    google_drive_id: str = Field(max_length=255)
+    status: ImportStatusEnum = Field(default=ImportStatusEnum.PENDING, index=True)
+    attempts: int = Field(default=0)
+    error: str | None = Field(default=None, max_length=1000)
+    file_id: int | None = Field(default=None, foreign_key="files.id", ondelete="SET NULL")
+    created_at: dt.datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
+    updated_at: dt.datetime = Field(default_factory=utc_now, index=True, sa_type=UTCDateTime)
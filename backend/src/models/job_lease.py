@@ -0,0 +1,16 @@
+import datetime as dt
+
+from sqlmodel import Field, SQLModel
+
+from backend.src.types.date import UTCDateTime, utc_now
+
+
+class JobLease(SQLModel, table=True):
+    """Lease electing the single replica allowed to run a scheduled job"""
+
+    __tablename__ = "job_leases"
+
+    name: str = Field(primary_key=True, max_length=100)
+    owner: str = Field(max_length=255)
+    expires_at: dt.datetime = Field(sa_type=UTCDateTime)
+    updated_at: dt.datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
@@ -2,16 +2,20 @@ import datetime as dt
 
 from sqlmodel import Field, SQLModel
 
-from backend.src.types.date import utc_now
+from backend.src.types.date import UTCDateTime, utc_now
 
 
 class TokenBlacklist(SQLModel, table=True):
-    """Token blacklist model for invalidated JWT tokens"""
+    """Token blacklist model for invalidated JWT tokens
+
+    Tokens are identified by the SHA-256 digest of their `jti` claim and bucketed by expiry
+    day, so expired entries are purged a whole bucket at a time.
+    """
 
     __tablename__ = "token_blacklist"
 
-    id: int | None = Field(default=None, primary_key=True)
-    token: str = Field(unique=True, index=True, max_length=1024)
+    jti_hash: str = Field(primary_key=True, max_length=64)
     user_id: int = Field(foreign_key="users.id", index=True)
-    blacklisted_at: dt.datetime = Field(default_factory=utc_now)
-    expires_at: dt.datetime = Field(index=True)
+    blacklisted_at: dt.datetime = Field(default_factory=utc_now, index=True, sa_type=UTCDateTime)
+    expires_at: dt.datetime = Field(sa_type=UTCDateTime)
+    expires_bucket: dt.date = Field(index=True)
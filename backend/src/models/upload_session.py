@@ -0,0 +1,26 @@
+import datetime as dt
+from uuid import uuid4
+
+from sqlmodel import JSON, Column, Field, SQLModel
+
+from backend.src.types.date import UTCDateTime, utc_now
+
+
+class UploadSession(SQLModel, table=True):
+    """Resumable upload session holding the state of a partially received file"""
+
+    __tablename__ = "upload_sessions"
+
+    id: str = Field(default_factory=lambda: uuid4().hex, primary_key=True, max_length=32)
+    workspace_id: int = Field(foreign_key="workspaces.id", index=True, ondelete="CASCADE")
+    uploaded_by: int = Field(foreign_key="users.id", index=True)
+    filename: str = Field(max_length=255)
+    mime_type: str | None = Field(default=None, max_length=100)
+    google_drive_id: str | None = Field(default=None, max_length=255)
+    total_size: int
+    received_size: int = Field(default=0)
+    storage_key: str = Field(max_length=500)
+    storage_upload_id: str = Field(max_length=1024)
+    parts: list[dict] = Field(default_factory=list, sa_column=Column(JSON, nullable=False))
+    created_at: dt.datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
+    updated_at: dt.datetime = Field(default_factory=utc_now, index=True, sa_type=UTCDateTime)
@@ -3,7 +3,7 @@ from typing import TYPE_CHECKING
 
 from sqlmodel import Field, Relationship, SQLModel
 
-from backend.src.types.date import utc_now
+from backend.src.types.date import UTCDateTime, utc_now
 
 if TYPE_CHECKING:
     from backend.src.models.workspace import WorkspaceMember
@@ -22,8 +22,8 @@ class User(UserBase, table=True):
     __tablename__ = "users"
 
     id: int | None = Field(default=None, primary_key=True)
-    created_at: dt.datetime = Field(default_factory=utc_now)
-    updated_at: dt.datetime = Field(default_factory=utc_now)
+    created_at: dt.datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
+    updated_at: dt.datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
     google_user_id: str = Field(unique=True, index=True, max_length=255)
     google_picture: str | None = Field(default=None, max_length=1024)
 
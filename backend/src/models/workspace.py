@@ -1,9 +1,9 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlmodel import Field, Relationship, SQLModel
+from sqlmodel import Field, Index, Relationship, SQLModel
 
-from backend.src.types.date import utc_now
+from backend.src.types.date import UTCDateTime, utc_now
 from backend.src.types.roles import RoleEnum
 
 if TYPE_CHECKING:
@@ -24,16 +24,25 @@ class Workspace(WorkspaceBase, table=True):
     __tablename__ = "workspaces"
 
     id: int | None = Field(default=None, primary_key=True)
-    created_at: datetime = Field(default_factory=utc_now)
-    updated_at: datetime = Field(default_factory=utc_now)
+    created_at: datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
+    updated_at: datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
     created_by: int = Field(foreign_key="users.id")
+    # Usage counters, kept up to date in the transactions adding and removing files
+    file_count: int = Field(default=0)
+    total_bytes: int = Field(default=0)
+    # Overrides WORKSPACE_STORAGE_QUOTA_BYTES for this workspace
+    storage_quota_bytes: int | None = Field(default=None)
+    # Set when the workspace is deleted; its files are removed in the background afterwards
+    deleted_at: datetime | None = Field(default=None, sa_type=UTCDateTime)
 
     # Relationships
     members: list["WorkspaceMember"] = Relationship(
-        back_populates="workspace", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+        back_populates="workspace",
+        sa_relationship_kwargs={"cascade": "all, delete-orphan", "passive_deletes": True},
     )
     files: list["File"] = Relationship(
-        back_populates="workspace", sa_relationship_kwargs={"cascade": "all, delete-orphan"}
+        back_populates="workspace",
+        sa_relationship_kwargs={"cascade": "all, delete-orphan", "passive_deletes": True},
     )
 
 
@@ -47,11 +56,12 @@ class WorkspaceMember(WorkspaceMemberBase, table=True):
     """Workspace member database model (junction table)"""
 
     __tablename__ = "workspace_members"
+    __table_args__ = (Index("ix_workspace_members_user_workspace", "user_id", "workspace_id"),)
 
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id")
-    workspace_id: int = Field(foreign_key="workspaces.id")
-    created_at: datetime = Field(default_factory=utc_now)
+    workspace_id: int = Field(foreign_key="workspaces.id", ondelete="CASCADE")
+    created_at: datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
 
     # Relationships
     user: "User" = Relationship(back_populates="workspaces")
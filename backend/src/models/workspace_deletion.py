@@ -0,0 +1,22 @@
+import datetime as dt
+from uuid import uuid4
+
+from sqlmodel import Field, SQLModel
+
+from backend.src.types.date import UTCDateTime, utc_now
+
+
+class WorkspaceDeletion(SQLModel, table=True):
+    """Removal of the files and storage of a deleted workspace, carried out in the background"""
+
+    __tablename__ = "workspace_deletions"
+
+    id: str = Field(default_factory=lambda: uuid4().hex, primary_key=True, max_length=32)
+    # No foreign key, since the deletion outlives the workspace row
+    workspace_id: int = Field(index=True)
+    requested_by: int = Field(foreign_key="users.id", index=True)
+    total_files: int = Field(default=0)
+    deleted_files: int = Field(default=0)
+    created_at: dt.datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
+    updated_at: dt.datetime = Field(default_factory=utc_now, sa_type=UTCDateTime)
+    finished_at: dt.datetime | None = Field(default=None, index=True, sa_type=UTCDateTime)
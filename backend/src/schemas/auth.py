@@ -22,7 +22,7 @@ class GoogleLoginResponse(BaseModel):
     audience: str = pydantic.Field(alias="aud")
     email_verified: bool
     name: str
-    picture: str | None
+    picture: str | None = None
 
 
 class TokenResponse(BaseModel):
@@ -0,0 +1,43 @@
+from datetime import datetime
+from typing import Annotated, Literal
+
+from pydantic import Field, StringConstraints
+
+from backend.src.config.settings import app_settings
+from backend.src.schemas.base import BaseSchema
+from backend.src.types.imports import ImportStatusEnum
+
+# Drive file ids are URL-safe; anything else could rewrite the path or query of API requests
+DriveFileId = Annotated[str, StringConstraints(pattern=r"^[A-Za-z0-9_-]+$", max_length=255)]
+
+
+class DriveImportCreate(BaseSchema):
+    """Schema for importing Google Drive files on the server"""
+
+    google_drive_ids: list[DriveFileId] = Field(
+        min_length=1, max_length=app_settings.DRIVE_IMPORT_MAX_FILES
+    )
+    access_token: str = Field(min_length=1)
+
+
+class DriveImportItemResponse(BaseSchema):
+    """State of one file of an import job"""
+
+    id: int
+    google_drive_id: str
+    status: ImportStatusEnum
+    attempts: int
+    error: str | None = None
+    file_id: int | None = None
+
+
+class DriveImportJobResponse(BaseSchema):
+    """State of an import job, polled until it is completed"""
+
+    id: str
+    workspace_id: int
+    status: Literal["running", "completed"]
+    succeeded: int
+    failed: int
+    created_at: datetime
+    items: list[DriveImportItemResponse]
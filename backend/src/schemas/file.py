@@ -20,3 +20,25 @@ class FileResponse(BaseSchema):
     uploaded_by: int = Field(alias="uploadedBy")
     created_at: datetime = Field(alias="createdAt")
     updated_at: datetime = Field(alias="modifiedAt")
+
+
+class BatchUploadResult(BaseSchema):
+    """Outcome of one file of a batch upload"""
+
+    filename: str
+    file: FileResponse | None = None
+    error: str | None = None
+
+
+class DownloadUrlsRequest(BaseSchema):
+    """Schema for requesting signed download URLs"""
+
+    file_ids: list[int] = Field(alias="fileIds", max_length=1000)
+
+
+class DownloadUrlResponse(BaseSchema):
+    """Signed download URL for a file"""
+
+    file_id: int = Field(alias="fileId")
+    url: str
+    expires_at: datetime = Field(alias="expiresAt")
@@ -0,0 +1,10 @@
+from backend.src.schemas.base import BaseSchema
+from backend.src.schemas.file import FileResponse
+
+
+class SearchResult(BaseSchema):
+    """A file matching a search, with its relevance and a highlighted excerpt of its text"""
+
+    file: FileResponse
+    rank: float
+    snippet: str | None = None
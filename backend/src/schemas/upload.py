@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from pydantic import Field
+
+from backend.src.schemas.base import BaseSchema
+
+
+class UploadSessionCreate(BaseSchema):
+    """Schema for starting a chunked upload"""
+
+    filename: str = Field(max_length=255)
+    size: int = Field(ge=0)
+    mime_type: str | None = None
+    google_drive_id: str | None = None
+
+
+class UploadSessionResponse(BaseSchema):
+    """Schema for the state of a chunked upload"""
+
+    id: str
+    filename: str
+    size: int
+    offset: int
+    chunk_size: int
+    created_at: datetime
+    updated_at: datetime
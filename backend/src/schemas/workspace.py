@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel
 
@@ -25,9 +26,24 @@ class WorkspaceResponse(BaseSchema):
     created_at: datetime
     updated_at: datetime
     created_by: int
+    file_count: int = 0
+    total_bytes: int = 0
+    storage_quota_bytes: int | None = None
     members: list[WorkspaceMemberResponse] = []
 
 
+class WorkspaceDeletionResponse(BaseSchema):
+    """Progress of the removal of a deleted workspace's files, polled until it is completed"""
+
+    id: str
+    workspace_id: int
+    status: Literal["running", "completed"]
+    total_files: int
+    deleted_files: int
+    created_at: datetime
+    finished_at: datetime | None = None
+
+
 class WorkspaceCreate(BaseModel):
     """Schema for creating a new workspace"""
 
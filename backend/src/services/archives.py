@@ -0,0 +1,149 @@
+import zipfile
+from collections.abc import AsyncIterator, Iterable
+from pathlib import PurePosixPath
+
+import anyio
+
+from backend.src.models.file import File
+from backend.src.services.storage import StorageBackend
+from backend.src.types.date import as_utc
+
+# Content that deflate cannot shrink any further; storing it saves CPU for no loss in size
+COMPRESSED_MEDIA_TYPE_PREFIXES = ("image/", "video/", "audio/")
+UNCOMPRESSED_MEDIA_TYPES = {"image/bmp", "image/svg+xml", "image/tiff", "audio/wav", "audio/x-wav"}
+COMPRESSED_MEDIA_TYPES = {
+    "application/gzip",
+    "application/pdf",
+    "application/vnd.rar",
+    "application/x-7z-compressed",
+    "application/x-bzip2",
+    "application/x-gzip",
+    "application/x-rar-compressed",
+    "application/x-xz",
+    "application/zip",
+    "application/zstd",
+}
+# Office Open XML and OpenDocument files are zip archives themselves
+COMPRESSED_MEDIA_TYPE_FAMILIES = (
+    "application/vnd.openxmlformats-officedocument.",
+    "application/vnd.oasis.opendocument.",
+)
+
+# Oldest timestamp the zip format can hold
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def is_compressed(media_type: str | None) -> bool:
+    """Check whether content of a media type is already compressed
+
+    Args:
+        media_type: Content type of the file, if known
+
+    Returns:
+        bool: True if the content should be stored in an archive without compression
+    """
+    if not media_type:
+        return False
+    media_type = media_type.split(";")[0].strip().lower()
+    if media_type in UNCOMPRESSED_MEDIA_TYPES:
+        return False
+    return (
+        media_type in COMPRESSED_MEDIA_TYPES
+        or media_type.startswith(COMPRESSED_MEDIA_TYPE_PREFIXES)
+        or media_type.startswith(COMPRESSED_MEDIA_TYPE_FAMILIES)
+    )
+
+
+def archive_names(files: Iterable[File]) -> list[str]:
+    """Pick a unique, flat entry name for each file of an archive
+
+    Path separators are replaced so names cannot escape the extraction directory, and repeated
+    names get a numbered suffix the way desktop file managers do.
+
+    Args:
+        files: Files to archive
+
+    Returns:
+        list[str]: Entry name of each file, in order
+    """
+    names: list[str] = []
+    taken: set[str] = set()
+    for db_file in files:
+        name = db_file.name.replace("/", "_").replace("\\", "_").strip() or "unnamed"
+        if name in {".", ".."}:
+            name = "unnamed"
+        stem, suffix = PurePosixPath(name).stem, PurePosixPath(name).suffix
+        candidate, counter = name, 1
+        while candidate in taken:
+            candidate = f"{stem} ({counter}){suffix}"
+            counter += 1
+        taken.add(candidate)
+        names.append(candidate)
+    return names
+
+
+class _ZipSink:
+    """Write-only file object collecting the bytes `ZipFile` produces so they can be streamed
+
+    It has no `seek` or `tell`, which makes `ZipFile` write sizes in data descriptors after each
+    entry instead of going back to patch the local headers.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+def _entry_info(db_file: File, name: str) -> zipfile.ZipInfo:
+    modified = as_utc(db_file.updated_at).timetuple()[:6]
+    entry = zipfile.ZipInfo(name, date_time=max(modified, ZIP_EPOCH))
+    entry.compress_type = (
+        zipfile.ZIP_STORED if is_compressed(db_file.mime_type) else zipfile.ZIP_DEFLATED
+    )
+    entry.external_attr = 0o644 << 16
+    return entry
+
+
+async def stream_zip(storage: StorageBackend, files: list[File]) -> AsyncIterator[bytes]:
+    """Generate a ZIP archive of files on the fly
+
+    Entries are read from storage chunk by chunk and every chunk is sent as soon as it is
+    written, so memory stays constant whatever the size of the archive. ZIP64 extensions are
+    always written, so entries and archives may exceed 4 GiB. Already compressed content is
+    stored as is; deflating runs in a worker thread to keep the event loop responsive.
+
+    Args:
+        storage: Storage backend holding the content
+        files: Files to archive
+
+    Yields:
+        bytes: Next piece of the archive
+    """
+    sink = _ZipSink()
+    archive = zipfile.ZipFile(sink, mode="w", allowZip64=True)
+
+    for db_file, name in zip(files, archive_names(files), strict=True):
+        entry = _entry_info(db_file, name)
+        with archive.open(entry, mode="w", force_zip64=True) as destination:
+            async for chunk in storage.read(db_file.file_path):
+                if entry.compress_type == zipfile.ZIP_STORED:
+                    destination.write(chunk)
+                else:
+                    await anyio.to_thread.run_sync(destination.write, chunk)
+                if data := sink.drain():
+                    yield data
+        yield sink.drain()
+
+    archive.close()
+    yield sink.drain()
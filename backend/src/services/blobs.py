@@ -0,0 +1,176 @@
+import hashlib
+from collections.abc import AsyncIterator
+from uuid import uuid4
+
+import anyio
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.models.blob import Blob
+from backend.src.services.storage import StorageBackend
+from backend.src.types.date import utc_now
+
+
+def blob_key(digest: str) -> str:
+    """Build the storage key of a blob
+
+    Args:
+        digest: SHA-256 hex digest of the blob content
+
+    Returns:
+        str: Storage key, fanned out over two directory levels
+    """
+    return f"blobs/{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+async def _hash_chunks(chunks: AsyncIterator[bytes], hasher) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        hasher.update(chunk)
+        yield chunk
+
+
+async def _commit_temp(
+    engine: AsyncEngine, storage: StorageBackend, temp_key: str, digest: str, size: int
+) -> None:
+    """Move fully written content to its content-addressed key, unless it is already stored
+
+    The blob is registered, or its registration refreshed, before looking for stored content.
+    Garbage collection then leaves it alone for its grace period, which gives the caller time to
+    reference it. A collection already removing the blob keeps its row locked until the content
+    is deleted, so the registration waits for it and the content is stored again.
+    """
+    async with AsyncSession(engine) as session:
+        await ensure_blob_row(session, digest, size)
+        await session.commit()
+
+    key = blob_key(digest)
+    if await storage.exists(key):
+        await storage.delete(temp_key)
+    else:
+        await storage.move(temp_key, key)
+
+
+def temp_key() -> str:
+    """Build a unique storage key for content that is still being written"""
+    return f"tmp/{uuid4().hex}"
+
+
+async def store_stream(
+    engine: AsyncEngine, storage: StorageBackend, chunks: AsyncIterator[bytes]
+) -> tuple[str, int]:
+    """Store a stream of bytes as a blob, hashing it while it is written
+
+    The blob is registered without references; the caller must reference it with
+    `acquire_blob` within BLOB_GC_GRACE_SECONDS.
+
+    Args:
+        engine: Database engine the blob is registered on
+        storage: Storage backend
+        chunks: Async iterator of byte chunks
+
+    Returns:
+        tuple[str, int]: Digest and size of the stored blob
+    """
+    key = temp_key()
+    hasher = hashlib.sha256()
+    try:
+        size = await storage.write(key, _hash_chunks(chunks, hasher))
+    except BaseException:
+        with anyio.CancelScope(shield=True):
+            await storage.delete(key)
+        raise
+
+    digest = hasher.hexdigest()
+    await _commit_temp(engine, storage, key, digest, size)
+    return digest, size
+
+
+async def store_key(engine: AsyncEngine, storage: StorageBackend, key: str) -> tuple[str, int]:
+    """Store content already written under a temporary key as a blob
+
+    Like `store_stream`, the blob is registered without references.
+
+    Args:
+        engine: Database engine the blob is registered on
+        storage: Storage backend
+        key: Temporary key holding the content
+
+    Returns:
+        tuple[str, int]: Digest and size of the stored blob
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    async for chunk in storage.read(key):
+        hasher.update(chunk)
+        size += len(chunk)
+
+    digest = hasher.hexdigest()
+    await _commit_temp(engine, storage, key, digest, size)
+    return digest, size
+
+
+async def acquire_blob(session: AsyncSession, digest: str, size: int, count: int = 1) -> None:
+    """Add references to a blob, registering it on first use
+
+    The change is flushed but not committed, so it lands in the same transaction as the
+    `File` rows that hold the references.
+
+    Args:
+        session: Database session
+        digest: SHA-256 hex digest of the blob content
+        size: Size of the blob in bytes
+        count: Number of references to add
+    """
+    statement = (
+        update(Blob)
+        .where(Blob.digest == digest)
+        .values(ref_count=Blob.ref_count + count, updated_at=utc_now())
+    )
+    if (await session.exec(statement)).rowcount:
+        return
+
+    try:
+        async with session.begin_nested():
+            session.add(Blob(digest=digest, size=size, ref_count=count))
+    except IntegrityError:
+        # Another request registered the same content first
+        await session.exec(statement)
+
+
+async def release_blob(session: AsyncSession, digest: str, count: int = 1) -> None:
+    """Drop references to a blob
+
+    The bytes stay in storage; blobs without references are removed by garbage collection.
+
+    Args:
+        session: Database session
+        digest: SHA-256 hex digest of the blob content
+        count: Number of references to drop
+    """
+    await session.exec(
+        update(Blob)
+        .where(Blob.digest == digest)
+        .values(ref_count=Blob.ref_count - count, updated_at=utc_now())
+    )
+
+
+async def ensure_blob_row(session: AsyncSession, digest: str, size: int) -> None:
+    """Make sure stored content has a blob row, without adding references to it
+
+    Nothing is deleted. The row is inserted with no references if it is missing, otherwise its
+    reference count is left as it is and only its `updated_at` is bumped. A row left without
+    references is removed, with its content, by orphan garbage collection once it has not been
+    updated for BLOB_GC_GRACE_SECONDS.
+
+    Content gets its row when it is stored, before the `File` rows referencing it are added.
+    When those rows are rolled back, calling this again in the new transaction keeps the row
+    and restarts its grace period, so the unreferenced content is still collected.
+
+    Args:
+        session: Database session
+        digest: SHA-256 hex digest of the blob content
+        size: Size of the blob in bytes
+    """
+    await acquire_blob(session, digest, size, count=0)
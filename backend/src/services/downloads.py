@@ -0,0 +1,275 @@
+import datetime as dt
+from collections.abc import AsyncIterator, Mapping
+from email.utils import format_datetime, parsedate_to_datetime
+from urllib.parse import quote
+from uuid import uuid4
+
+from starlette.responses import Response, StreamingResponse
+
+from backend.src.models.file import File
+from backend.src.services.storage import StorageBackend
+from backend.src.types.date import as_utc
+
+# Authenticated content: let clients keep a copy, but revalidate it on every use
+DOWNLOAD_CACHE_CONTROL = "private, no-cache"
+
+
+def content_disposition(filename: str, disposition: str = "attachment") -> str:
+    """Build a Content-Disposition header value that survives non-ASCII file names
+
+    Args:
+        filename: File name suggested to the client
+        disposition: Either "attachment" or "inline"
+
+    Returns:
+        str: Header value
+    """
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{filename}"'
+
+
+def file_etag(db_file: File) -> str:
+    """Build the entity tag of a file
+
+    Files in the blob store get a strong tag derived from their content hash; older files fall
+    back to a weak tag built from their metadata.
+
+    Args:
+        db_file: File to tag
+
+    Returns:
+        str: Quoted entity tag
+    """
+    if db_file.blob_digest:
+        return f'"{db_file.blob_digest}"'
+    modified = int(as_utc(db_file.updated_at).timestamp())
+    return f'W/"{db_file.id}-{db_file.file_size}-{modified}"'
+
+
+def _parse_http_date(value: str | None) -> dt.datetime | None:
+    if not value:
+        return None
+    try:
+        return as_utc(parsedate_to_datetime(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _etag_list(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def weak_etag_match(header: str, etag: str) -> bool:
+    """Check whether an If-None-Match header lists an entity tag, by weak comparison"""
+    opaque = etag.removeprefix("W/")
+    return any(tag == "*" or tag.removeprefix("W/") == opaque for tag in _etag_list(header))
+
+
+def is_not_modified(
+    headers: Mapping[str, str], etag: str | None, last_modified: dt.datetime
+) -> bool:
+    """Evaluate If-None-Match and If-Modified-Since preconditions
+
+    If-Modified-Since is only consulted when the request carries no If-None-Match.
+
+    Args:
+        headers: Request headers
+        etag: Current entity tag of the resource
+        last_modified: Last modification time of the resource
+
+    Returns:
+        bool: True if the client's copy is still fresh and a 304 should be sent
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and weak_etag_match(if_none_match, etag)
+
+    if_modified_since = _parse_http_date(headers.get("if-modified-since"))
+    if if_modified_since is None:
+        return False
+    return int(as_utc(last_modified).timestamp()) <= int(if_modified_since.timestamp())
+
+
+def _if_range_matches(value: str, etag: str | None, last_modified: dt.datetime) -> bool:
+    # If-Range needs a strong validator: a strong ETag or an exact date
+    if value.startswith('"'):
+        return etag is not None and not etag.startswith("W/") and value == etag
+    date = _parse_http_date(value)
+    return date is not None and int(as_utc(last_modified).timestamp()) == int(date.timestamp())
+
+
+def parse_range_header(header: str, size: int) -> list[tuple[int, int]] | None:
+    """Parse a bytes Range header into sorted, merged, inclusive ranges
+
+    Args:
+        header: Value of the Range header
+        size: Size of the resource in bytes
+
+    Returns:
+        list[tuple[int, int]] | None: Satisfiable ranges, an empty list if none are
+        satisfiable, or None if the header is malformed and must be ignored
+    """
+    unit, _, specs = header.partition("=")
+    if unit.strip().lower() != "bytes" or not specs.strip():
+        return None
+
+    ranges: list[tuple[int, int]] = []
+    for spec in specs.split(","):
+        first, dash, last = spec.strip().partition("-")
+        if not dash:
+            return None
+        try:
+            if not first:
+                # Suffix range: the last N bytes
+                length = int(last)
+                if length <= 0:
+                    continue
+                start, end = max(size - length, 0), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else size - 1
+                if last and start > end:
+                    return None
+                end = min(end, size - 1)
+        except ValueError:
+            return None
+        if start < size:
+            ranges.append((start, end))
+
+    ranges.sort()
+    merged: list[tuple[int, int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+async def _multipart_body(
+    storage: StorageBackend,
+    key: str,
+    ranges: list[tuple[int, int]],
+    part_headers: list[bytes],
+    closing: bytes,
+) -> AsyncIterator[bytes]:
+    for (start, end), head in zip(ranges, part_headers, strict=True):
+        yield head
+        async for chunk in storage.read_range(key, start, end - start + 1):
+            yield chunk
+        yield b"\r\n"
+    yield closing
+
+
+def file_response(
+    request_headers: Mapping[str, str],
+    storage: StorageBackend,
+    key: str,
+    filename: str,
+    media_type: str,
+    size: int,
+    etag: str | None,
+    last_modified: dt.datetime,
+    cache_control: str = DOWNLOAD_CACHE_CONTROL,
+) -> Response:
+    """Build a download response honouring Range and If-Range headers
+
+    Conditional GETs are expected to be handled with `is_not_modified` before calling this.
+
+    Args:
+        request_headers: Request headers
+        storage: Storage backend holding the content
+        key: Storage key
+        filename: File name suggested to the client
+        media_type: Content type of the download
+        size: Size of the content in bytes
+        etag: Entity tag of the content
+        last_modified: Last modification time of the content
+        cache_control: Cache-Control header value
+
+    Returns:
+        Response: 200 with the whole content, 206 with one or more ranges, or 416
+    """
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": cache_control,
+        "Content-Disposition": content_disposition(filename),
+        "Last-Modified": format_datetime(as_utc(last_modified), usegmt=True),
+    }
+    if etag:
+        headers["ETag"] = etag
+
+    range_header = request_headers.get("range")
+    if_range = request_headers.get("if-range")
+    if range_header and (if_range is None or _if_range_matches(if_range, etag, last_modified)):
+        ranges = parse_range_header(range_header, size)
+
+        if ranges == []:
+            return Response(
+                status_code=416,
+                headers={**headers, "Content-Range": f"bytes */{size}"},
+            )
+
+        if ranges and len(ranges) == 1:
+            start, end = ranges[0]
+            return StreamingResponse(
+                storage.read_range(key, start, end - start + 1),
+                status_code=206,
+                media_type=media_type,
+                headers={
+                    **headers,
+                    "Content-Range": f"bytes {start}-{end}/{size}",
+                    "Content-Length": str(end - start + 1),
+                },
+            )
+
+        if ranges:
+            boundary = uuid4().hex
+            part_headers = [
+                (
+                    f"--{boundary}\r\nContent-Type: {media_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+                ).encode()
+                for start, end in ranges
+            ]
+            closing = f"--{boundary}--\r\n".encode()
+            length = sum(
+                len(head) + end - start + 1 + 2
+                for head, (start, end) in zip(part_headers, ranges, strict=True)
+            ) + len(closing)
+            return StreamingResponse(
+                _multipart_body(storage, key, ranges, part_headers, closing),
+                status_code=206,
+                media_type=f"multipart/byteranges; boundary={boundary}",
+                headers={**headers, "Content-Length": str(length)},
+            )
+
+    return StreamingResponse(
+        storage.read(key),
+        media_type=media_type,
+        headers={**headers, "Content-Length": str(size)},
+    )
+
+
+def not_modified_response(
+    etag: str | None, last_modified: dt.datetime, cache_control: str = DOWNLOAD_CACHE_CONTROL
+) -> Response:
+    """Build a 304 response carrying the current validators
+
+    Args:
+        etag: Entity tag of the content
+        last_modified: Last modification time of the content
+        cache_control: Cache-Control header value
+
+    Returns:
+        Response: Empty 304 response
+    """
+    headers = {
+        "Cache-Control": cache_control,
+        "Last-Modified": format_datetime(as_utc(last_modified), usegmt=True),
+    }
+    if etag:
+        headers["ETag"] = etag
+    return Response(status_code=304, headers=headers)
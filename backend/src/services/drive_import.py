@@ -0,0 +1,325 @@
+import asyncio
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.config.settings import app_settings
+from backend.src.models.file import File
+from backend.src.models.import_job import ImportItem
+from backend.src.services.blobs import acquire_blob, blob_key, ensure_blob_row, store_stream
+from backend.src.services.previews import can_preview, generate_previews
+from backend.src.services.response_cache import invalidate_workspace
+from backend.src.services.search import index_file
+from backend.src.services.storage import StorageBackend
+from backend.src.services.workspaces import QuotaExceededError, record_usage
+from backend.src.types.date import utc_now
+from backend.src.types.imports import ImportStatusEnum
+
+# Google Docs editors files have no binary content; they are exported to Office formats
+GOOGLE_EXPORT_FORMATS = {
+    "application/vnd.google-apps.document": (
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        ".docx",
+    ),
+    "application/vnd.google-apps.spreadsheet": (
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        ".xlsx",
+    ),
+    "application/vnd.google-apps.presentation": (
+        "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+        ".pptx",
+    ),
+}
+GOOGLE_EXPORT_FALLBACK = ("application/pdf", ".pdf")
+GOOGLE_APPS_PREFIX = "application/vnd.google-apps."
+
+METADATA_FIELDS = "id,name,mimeType,webViewLink,thumbnailLink"
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class DriveImportError(Exception):
+    """A Drive file could not be imported
+
+    Args:
+        message: Reason shown to the user
+        retryable: Whether trying again later may succeed
+    """
+
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+@dataclass
+class DriveFile:
+    """Metadata of a Google Drive file"""
+
+    id: str
+    name: str
+    mime_type: str
+    web_view_link: str | None = None
+    thumbnail_link: str | None = None
+
+    @property
+    def export_format(self) -> tuple[str, str] | None:
+        """Media type and extension the file must be exported to, if it has no binary content"""
+        if not self.mime_type.startswith(GOOGLE_APPS_PREFIX):
+            return None
+        return GOOGLE_EXPORT_FORMATS.get(self.mime_type, GOOGLE_EXPORT_FALLBACK)
+
+
+@dataclass
+class ImportTask:
+    """An import item waiting for, or held by, a worker"""
+
+    item_id: int
+    job_id: str
+    workspace_id: int
+    user_id: int
+    google_drive_id: str
+    attempts: int = 0
+
+
+def _check_response(response: httpx.Response, google_drive_id: str) -> None:
+    if response.status_code == 200:
+        return
+    if response.status_code in (401, 403, 404):
+        raise DriveImportError(
+            f"Drive file {google_drive_id} is not accessible (HTTP {response.status_code})"
+        )
+    raise DriveImportError(
+        f"Drive returned HTTP {response.status_code}",
+        retryable=response.status_code in RETRYABLE_STATUS_CODES,
+    )
+
+
+class DriveImporter:
+    """Pool of workers streaming Google Drive files straight into storage
+
+    Submitted items go through a bounded pool of workers. Each user has at most `per_user`
+    items queued or running at once, so a large import cannot starve everybody else. Transient
+    Drive and network errors are retried with exponential backoff.
+
+    Access tokens are only kept in memory, for as long as their job has items left. Items of a
+    process that stopped are failed by the `fail_stale_imports` maintenance job.
+
+    Args:
+        engine: Database engine
+        storage: Storage backend the files are written to
+        http: HTTP client used to call the Drive API
+        workers: Number of files imported at the same time
+        per_user: Number of files of a single user imported at the same time
+        max_attempts: Attempts per file before giving up
+        backoff: Delay before the first retry in seconds, doubled for each further retry
+        api_url: Base URL of the Drive v3 API
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        storage: StorageBackend,
+        http: httpx.AsyncClient,
+        workers: int = app_settings.DRIVE_IMPORT_WORKERS,
+        per_user: int = app_settings.DRIVE_IMPORT_PER_USER,
+        max_attempts: int = app_settings.DRIVE_IMPORT_MAX_ATTEMPTS,
+        backoff: float = app_settings.DRIVE_IMPORT_BACKOFF_SECONDS,
+        api_url: str = app_settings.GOOGLE_DRIVE_API_URL,
+    ):
+        self.engine = engine
+        self.storage = storage
+        self.http = http
+        self.workers = workers
+        self.per_user = per_user
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.api_url = api_url.rstrip("/")
+        self._queue: asyncio.Queue[ImportTask] = asyncio.Queue()
+        self._slots: Counter[int] = Counter()
+        self._waiting: defaultdict[int, deque[ImportTask]] = defaultdict(deque)
+        self._tokens: dict[str, str] = {}
+        self._remaining: Counter[str] = Counter()
+        self._tasks: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start the workers on the running event loop"""
+        for _ in range(self.workers):
+            self._spawn(self._work())
+
+    async def stop(self) -> None:
+        """Cancel the workers and pending retries, and wait for them to finish"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def submit(self, tasks: list[ImportTask], access_token: str) -> None:
+        """Queue the items of a job
+
+        Args:
+            tasks: Items of the job, already stored as pending
+            access_token: Google OAuth access token of the user, with Drive read access
+        """
+        for task in tasks:
+            self._tokens[task.job_id] = access_token
+            self._remaining[task.job_id] += 1
+            self._schedule(task)
+
+    def _spawn(self, coroutine) -> None:
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _schedule(self, task: ImportTask) -> None:
+        if self._slots[task.user_id] < self.per_user:
+            self._slots[task.user_id] += 1
+            self._queue.put_nowait(task)
+        else:
+            self._waiting[task.user_id].append(task)
+
+    def _release(self, user_id: int) -> None:
+        self._slots[user_id] -= 1
+        waiting = self._waiting.get(user_id)
+        if waiting:
+            self._schedule(waiting.popleft())
+        if not waiting:
+            self._waiting.pop(user_id, None)
+        if not self._slots[user_id]:
+            del self._slots[user_id]
+
+    async def _retry_later(self, task: ImportTask, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._schedule(task)
+
+    async def _work(self) -> None:
+        while True:
+            task = await self._queue.get()
+            try:
+                await self._run(task)
+            except Exception as e:
+                # Keep the worker alive whatever happens to a single item
+                print(f"Warning: Drive import of item {task.item_id} crashed: {str(e)}")
+            finally:
+                self._release(task.user_id)
+
+    async def _run(self, task: ImportTask) -> None:
+        task.attempts += 1
+        retrying = False
+        try:
+            await self._update_item(
+                task.item_id, status=ImportStatusEnum.RUNNING, attempts=task.attempts
+            )
+            await self._import(task)
+        except DriveImportError as e:
+            if e.retryable and task.attempts < self.max_attempts:
+                retrying = True
+                await self._update_item(task.item_id, status=ImportStatusEnum.PENDING, error=str(e))
+                self._spawn(self._retry_later(task, self.backoff * 2 ** (task.attempts - 1)))
+            else:
+                await self._update_item(task.item_id, status=ImportStatusEnum.FAILED, error=str(e))
+        except Exception as e:
+            await self._update_item(
+                task.item_id, status=ImportStatusEnum.FAILED, error=f"Import failed: {str(e)}"
+            )
+        finally:
+            if not retrying:
+                self._forget(task)
+
+    def _forget(self, task: ImportTask) -> None:
+        """Drop the job's access token once its last item is done"""
+        self._remaining[task.job_id] -= 1
+        if self._remaining[task.job_id] <= 0:
+            del self._remaining[task.job_id]
+            self._tokens.pop(task.job_id, None)
+
+    async def _update_item(self, item_id: int, **values) -> None:
+        async with AsyncSession(self.engine) as session:
+            item = await session.get(ImportItem, item_id)
+            if item is None:
+                return
+            for name, value in values.items():
+                setattr(item, name, value)
+            item.updated_at = utc_now()
+            session.add(item)
+            await session.commit()
+
+    async def _fetch_metadata(self, task: ImportTask, headers: dict[str, str]) -> DriveFile:
+        response = await self.http.get(
+            f"{self.api_url}/files/{task.google_drive_id}",
+            params={"fields": METADATA_FIELDS, "supportsAllDrives": "true"},
+            headers=headers,
+        )
+        _check_response(response, task.google_drive_id)
+        metadata = response.json()
+        return DriveFile(
+            id=metadata["id"],
+            name=metadata.get("name") or task.google_drive_id,
+            mime_type=metadata.get("mimeType") or "application/octet-stream",
+            web_view_link=metadata.get("webViewLink"),
+            thumbnail_link=metadata.get("thumbnailLink"),
+        )
+
+    async def _import(self, task: ImportTask) -> None:
+        token = self._tokens.get(task.job_id)
+        if token is None:
+            raise DriveImportError("The Drive access token is no longer available")
+        headers = {"Authorization": f"Bearer {token}"}
+
+        try:
+            drive_file = await self._fetch_metadata(task, headers)
+
+            name, media_type = drive_file.name, drive_file.mime_type
+            url = f"{self.api_url}/files/{drive_file.id}"
+            params = {"alt": "media", "supportsAllDrives": "true"}
+            if export_format := drive_file.export_format:
+                media_type, extension = export_format
+                name = PurePosixPath(name).stem + extension
+                url, params = f"{url}/export", {"mimeType": media_type}
+
+            async with self.http.stream("GET", url, params=params, headers=headers) as response:
+                _check_response(response, task.google_drive_id)
+                digest, file_size = await store_stream(
+                    self.engine, self.storage, response.aiter_bytes()
+                )
+        except httpx.TransportError as e:
+            raise DriveImportError(f"Drive connection failed: {str(e)}", retryable=True)
+
+        async with AsyncSession(self.engine) as session:
+            db_file = File(
+                name=name[:255],
+                file_path=blob_key(digest),
+                file_size=file_size,
+                mime_type=media_type,
+                workspace_id=task.workspace_id,
+                uploaded_by=task.user_id,
+                google_drive_id=drive_file.id,
+                web_view_link=drive_file.web_view_link,
+                thumbnail_url=drive_file.thumbnail_link,
+                blob_digest=digest,
+            )
+            await acquire_blob(session, digest, file_size)
+            session.add(db_file)
+            try:
+                await record_usage(session, task.workspace_id, 1, file_size)
+            except QuotaExceededError as e:
+                await session.rollback()
+                await ensure_blob_row(session, digest, file_size)
+                await session.commit()
+                raise DriveImportError(str(e))
+            await session.flush()
+
+            item = await session.get(ImportItem, task.item_id)
+            item.status = ImportStatusEnum.SUCCEEDED
+            item.file_id = file_id = db_file.id
+            item.error = None
+            item.updated_at = utc_now()
+            session.add(item)
+            await session.commit()
+            await invalidate_workspace(session, task.workspace_id)
+
+        self._spawn(index_file(self.engine, self.storage, file_id))
+        if can_preview(media_type):
+            self._spawn(generate_previews(self.engine, self.storage, digest, media_type))
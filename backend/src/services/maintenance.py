@@ -0,0 +1,417 @@
+import datetime as dt
+
+import anyio
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import delete, func, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.config.settings import app_settings
+from backend.src.models.blob import Blob
+from backend.src.models.file import File
+from backend.src.models.file_search import FileSearch
+from backend.src.models.import_job import ImportItem
+from backend.src.models.token_blacklist import TokenBlacklist
+from backend.src.models.upload_session import UploadSession
+from backend.src.models.workspace import Workspace
+from backend.src.models.workspace_deletion import WorkspaceDeletion
+from backend.src.services.blobs import blob_key
+from backend.src.services.previews import preview_prefix
+from backend.src.services.response_cache import invalidate_workspace
+from backend.src.services.scheduler import Scheduler
+from backend.src.services.search import index_file
+from backend.src.services.storage import StorageBackend
+from backend.src.services.workspace_deletion import purge_workspace
+from backend.src.types.date import as_utc, utc_now
+from backend.src.types.imports import ImportStatusEnum
+
+
+async def _purge_token_batch(engine: AsyncEngine, batch_size: int) -> int:
+    async with AsyncSession(engine) as session:
+        keys = (
+            await session.exec(
+                select(TokenBlacklist.jti_hash)
+                .where(TokenBlacklist.expires_bucket < utc_now().date())
+                .limit(batch_size)
+            )
+        ).all()
+        if keys:
+            await session.exec(delete(TokenBlacklist).where(TokenBlacklist.jti_hash.in_(keys)))
+            await session.commit()
+        return len(keys)
+
+
+async def purge_expired_tokens(engine: AsyncEngine, batch_size: int, pause: float) -> int:
+    """Delete blacklist buckets whose tokens have all expired
+
+    Rows are deleted in batches with a pause in between, so a large backlog does not hold long
+    locks on the table.
+
+    Args:
+        engine: Database engine
+        batch_size: Maximum number of rows deleted per transaction
+        pause: Seconds to wait between two batches
+
+    Returns:
+        int: Number of deleted rows
+    """
+    total = 0
+    while True:
+        deleted = await _purge_token_batch(engine, batch_size)
+        total += deleted
+        if deleted < batch_size:
+            return total
+        await anyio.sleep(pause)
+
+
+async def _orphan_blob_batch(
+    engine: AsyncEngine, storage: StorageBackend, cutoff: dt.datetime, batch_size: int
+) -> int:
+    async with AsyncSession(engine) as session:
+        digests = (
+            await session.exec(
+                select(Blob.digest)
+                .where(Blob.ref_count <= 0, Blob.updated_at < cutoff)
+                .limit(batch_size)
+            )
+        ).all()
+        if not digests:
+            return 0
+        # Re-check, so blobs acquired or stored again in the meantime survive
+        deleted = (
+            (
+                await session.exec(
+                    delete(Blob)
+                    .where(Blob.digest.in_(digests), Blob.ref_count <= 0, Blob.updated_at < cutoff)
+                    .returning(Blob.digest)
+                )
+            )
+            .scalars()
+            .all()
+        )
+        # Content is deleted before the rows, whose locks make uploads of the same content
+        # wait and store it again
+        for digest in deleted:
+            await storage.delete(blob_key(digest))
+            await storage.delete_prefix(preview_prefix(digest))
+        await session.commit()
+        return len(deleted)
+
+
+async def collect_orphan_blobs(
+    engine: AsyncEngine, storage: StorageBackend, grace: float, batch_size: int, pause: float
+) -> int:
+    """Delete blobs that no file references any more, together with their content and previews
+
+    Blobs are only collected once they have been unreferenced for the grace period. Storing
+    content registers its blob again, so content that is being uploaded again right now is not
+    pulled from under the upload. An upload storing the content while its blob is being
+    collected waits for the collection to commit, then stores the content anew.
+
+    Args:
+        engine: Database engine
+        storage: Storage backend holding the content
+        grace: Seconds a blob must have been unreferenced for
+        batch_size: Maximum number of blobs deleted per transaction
+        pause: Seconds to wait between two batches
+
+    Returns:
+        int: Number of deleted blobs
+    """
+    cutoff = utc_now() - dt.timedelta(seconds=grace)
+    total = 0
+    while True:
+        deleted = await _orphan_blob_batch(engine, storage, cutoff, batch_size)
+        total += deleted
+        if deleted < batch_size:
+            return total
+        await anyio.sleep(pause)
+
+
+async def _stale_upload_batch(
+    engine: AsyncEngine, cutoff: dt.datetime, batch_size: int
+) -> list[UploadSession]:
+    async with AsyncSession(engine) as session:
+        return list(
+            (
+                await session.exec(
+                    select(UploadSession).where(UploadSession.updated_at < cutoff).limit(batch_size)
+                )
+            ).all()
+        )
+
+
+async def _delete_uploads(engine: AsyncEngine, ids: list[str], cutoff: dt.datetime) -> None:
+    async with AsyncSession(engine) as session:
+        # Uploads resumed since they were selected are kept
+        await session.exec(
+            delete(UploadSession).where(
+                UploadSession.id.in_(ids), UploadSession.updated_at < cutoff
+            )
+        )
+        await session.commit()
+
+
+async def _upload_keys(engine: AsyncEngine) -> set[str]:
+    async with AsyncSession(engine) as session:
+        return set((await session.exec(select(UploadSession.storage_key))).all())
+
+
+async def cleanup_abandoned_uploads(
+    engine: AsyncEngine, storage: StorageBackend, ttl: float, batch_size: int, pause: float
+) -> int:
+    """Abort upload sessions idle for longer than their time-to-live and drop stray temp files
+
+    Temporary keys are left behind when a process dies in the middle of storing a file; they
+    are removed once they are older than the time-to-live and no upload session owns them.
+
+    Args:
+        engine: Database engine
+        storage: Storage backend holding the partial uploads
+        ttl: Seconds after which an idle upload is considered abandoned
+        batch_size: Maximum number of uploads or keys handled per batch
+        pause: Seconds to wait between two batches
+
+    Returns:
+        int: Number of aborted uploads and deleted temp files
+    """
+    cutoff = utc_now() - dt.timedelta(seconds=ttl)
+    total = 0
+    while True:
+        uploads = await _stale_upload_batch(engine, cutoff, batch_size)
+        for upload in uploads:
+            await storage.abort_multipart(upload.storage_key, upload.storage_upload_id)
+        if uploads:
+            await _delete_uploads(engine, [upload.id for upload in uploads], cutoff)
+        total += len(uploads)
+        if len(uploads) < batch_size:
+            break
+        await anyio.sleep(pause)
+
+    live_keys = await _upload_keys(engine)
+    deleted = 0
+    async for item in storage.list_keys("tmp/"):
+        if item.key in live_keys or as_utc(item.modified_at) >= cutoff:
+            continue
+        await storage.delete(item.key)
+        deleted += 1
+        if deleted % batch_size == 0:
+            await anyio.sleep(pause)
+    return total + deleted
+
+
+async def fail_stale_imports(engine: AsyncEngine, ttl: float) -> int:
+    """Fail Drive import items that made no progress for longer than their time-to-live
+
+    Items are left pending or running when the process importing them stops, since only that
+    process held the user's access token.
+
+    Args:
+        engine: Database engine
+        ttl: Seconds after which an unfinished item is considered abandoned
+
+    Returns:
+        int: Number of failed items
+    """
+    cutoff = utc_now() - dt.timedelta(seconds=ttl)
+    async with AsyncSession(engine) as session:
+        result = await session.exec(
+            update(ImportItem)
+            .where(
+                ImportItem.status.in_([ImportStatusEnum.PENDING, ImportStatusEnum.RUNNING]),
+                ImportItem.updated_at < cutoff,
+            )
+            .values(
+                status=ImportStatusEnum.FAILED,
+                error="Import interrupted, please import the file again",
+                updated_at=utc_now(),
+            )
+        )
+        await session.commit()
+        return result.rowcount
+
+
+async def index_missing_files(
+    engine: AsyncEngine, storage: StorageBackend, batch_size: int, pause: float
+) -> int:
+    """Add the files missing from the search index to it
+
+    Catches up on files stored before the index existed, or whose indexing was lost when the
+    process handling their upload stopped.
+
+    Args:
+        engine: Database engine
+        storage: Storage backend holding the content
+        batch_size: Maximum number of files looked up per query
+        pause: Seconds to wait between two batches
+
+    Returns:
+        int: Number of indexed files
+    """
+    total = 0
+    last_id = 0
+    while True:
+        async with AsyncSession(engine) as session:
+            file_ids = (
+                await session.exec(
+                    select(File.id)
+                    .outerjoin(FileSearch, FileSearch.file_id == File.id)
+                    .where(FileSearch.file_id.is_(None), File.id > last_id)
+                    .order_by(File.id)
+                    .limit(batch_size)
+                )
+            ).all()
+        for file_id in file_ids:
+            total += await index_file(engine, storage, file_id)
+        if len(file_ids) < batch_size:
+            return total
+        last_id = file_ids[-1]
+        await anyio.sleep(pause)
+
+
+async def _reconcile_usage_batch(
+    engine: AsyncEngine, after_id: int, batch_size: int
+) -> tuple[int, int]:
+    async with AsyncSession(engine) as session:
+        # Lock the workspaces first: uploads update their counters under the same row lock, so
+        # every file committed before the lock is counted and every later one charges the
+        # counters after this transaction
+        workspaces = (
+            await session.exec(
+                select(Workspace)
+                .where(Workspace.id > after_id)
+                .order_by(Workspace.id)
+                .limit(batch_size)
+                .with_for_update()
+            )
+        ).all()
+        if not workspaces:
+            return 0, 0
+
+        usage = {
+            workspace_id: (count, size)
+            for workspace_id, count, size in (
+                await session.exec(
+                    select(
+                        File.workspace_id, func.count(), func.coalesce(func.sum(File.file_size), 0)
+                    )
+                    .where(File.workspace_id.in_([workspace.id for workspace in workspaces]))
+                    .group_by(File.workspace_id)
+                )
+            ).all()
+        }
+        repaired, last_id = [], workspaces[-1].id
+        for workspace in workspaces:
+            count, size = usage.get(workspace.id, (0, 0))
+            if (workspace.file_count, workspace.total_bytes) != (count, size):
+                workspace.file_count, workspace.total_bytes = count, size
+                session.add(workspace)
+                repaired.append(workspace.id)
+        await session.commit()
+        for workspace_id in repaired:
+            await invalidate_workspace(session, workspace_id)
+        return len(repaired), last_id
+
+
+async def reconcile_workspace_usage(engine: AsyncEngine, batch_size: int, pause: float) -> int:
+    """Repair workspace usage counters that drifted from the files they count
+
+    Args:
+        engine: Database engine
+        batch_size: Maximum number of workspaces checked per transaction
+        pause: Seconds to wait between two batches
+
+    Returns:
+        int: Number of repaired workspaces
+    """
+    total = 0
+    after_id = 0
+    while True:
+        repaired, after_id = await _reconcile_usage_batch(engine, after_id, batch_size)
+        total += repaired
+        if not after_id:
+            return total
+        await anyio.sleep(pause)
+
+
+async def purge_deleted_workspaces(
+    engine: AsyncEngine, storage: StorageBackend, batch_size: int, pause: float
+) -> int:
+    """Finish purging deleted workspaces whose purge stopped, or never started
+
+    Args:
+        engine: Database engine
+        storage: Storage backend holding the content
+        batch_size: Maximum number of files deleted per transaction
+        pause: Seconds to wait between two batches
+
+    Returns:
+        int: Number of purged workspaces
+    """
+    async with AsyncSession(engine) as session:
+        deletion_ids = (
+            await session.exec(
+                select(WorkspaceDeletion.id)
+                .where(WorkspaceDeletion.finished_at.is_(None))
+                .order_by(WorkspaceDeletion.created_at)
+            )
+        ).all()
+
+    total = 0
+    for deletion_id in deletion_ids:
+        total += await purge_workspace(engine, storage, deletion_id, batch_size, pause)
+    return total
+
+
+def build_scheduler(engine: AsyncEngine, storage: StorageBackend) -> Scheduler:
+    """Create the scheduler running the periodic maintenance jobs
+
+    Args:
+        engine: Database engine
+        storage: Storage backend
+
+    Returns:
+        Scheduler: Scheduler with every maintenance job registered, not started yet
+    """
+    batch_size = app_settings.MAINTENANCE_BATCH_SIZE
+    pause = app_settings.MAINTENANCE_BATCH_PAUSE_SECONDS
+    scheduler = Scheduler(engine)
+    scheduler.add_job(
+        "purge_expired_tokens",
+        lambda: purge_expired_tokens(engine, batch_size, pause),
+        interval=app_settings.TOKEN_PURGE_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "collect_orphan_blobs",
+        lambda: collect_orphan_blobs(
+            engine, storage, app_settings.BLOB_GC_GRACE_SECONDS, batch_size, pause
+        ),
+        interval=app_settings.BLOB_GC_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "cleanup_abandoned_uploads",
+        lambda: cleanup_abandoned_uploads(
+            engine, storage, app_settings.UPLOAD_SESSION_TTL_HOURS * 3600, batch_size, pause
+        ),
+        interval=app_settings.UPLOAD_CLEANUP_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "fail_stale_imports",
+        lambda: fail_stale_imports(engine, app_settings.DRIVE_IMPORT_STALE_SECONDS),
+        interval=app_settings.UPLOAD_CLEANUP_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "index_missing_files",
+        lambda: index_missing_files(engine, storage, batch_size, pause),
+        interval=app_settings.SEARCH_INDEX_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "reconcile_workspace_usage",
+        lambda: reconcile_workspace_usage(engine, batch_size, pause),
+        interval=app_settings.USAGE_RECONCILE_INTERVAL_SECONDS,
+    )
+    scheduler.add_job(
+        "purge_deleted_workspaces",
+        lambda: purge_deleted_workspaces(engine, storage, batch_size, pause),
+        interval=app_settings.WORKSPACE_PURGE_INTERVAL_SECONDS,
+    )
+    return scheduler
@@ -0,0 +1,258 @@
+import bisect
+import threading
+from collections.abc import Sequence
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter, split by label values
+
+    Args:
+        name: Metric name
+        documentation: Help text
+        labelnames: Names of the labels every sample carries
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Add to the counter of the given label values"""
+        key = tuple(labels[name] for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [
+            f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, split by label values
+
+    Args:
+        name: Metric name
+        documentation: Help text
+        labelnames: Names of the labels every sample carries
+        buckets: Upper bounds of the buckets, in increasing order
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label values: count of each bucket (non-cumulative, plus +Inf), sum
+        self._values: dict[tuple[str, ...], tuple[list[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record a value under the given label values"""
+        key = tuple(labels[name] for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        lines = []
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts, strict=True):
+                cumulative += count
+                le = 'le="+Inf"' if bound == "+Inf" else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics of this process, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: list[Counter | Histogram] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Create and register a counter"""
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram"""
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render every registered metric
+
+        Returns:
+            str: Metrics in the Prometheus text exposition format, version 0.0.4
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last byte of its response",
+    ["method", "route", "status"],
+)
+REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries",
+    "Database queries run by a request",
+    ["method", "route"],
+    buckets=COUNT_BUCKETS,
+)
+REQUEST_DB_DURATION = registry.histogram(
+    "http_request_db_duration_seconds",
+    "Time a request spent running database queries",
+    ["method", "route"],
+)
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds", "Time to run a database query", ["engine"]
+)
+DB_POOL_WAIT = registry.histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a database connection", ["engine"]
+)
+STORAGE_BYTES = registry.counter(
+    "storage_bytes_total",
+    "Bytes read from or written to file storage, by the route that moved them",
+    ["operation", "route"],
+)
+
+
+@dataclass
+class RequestMetrics:
+    """Work done on behalf of one request, reported in its Server-Timing header"""
+
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    # ASGI scope of the request, where routing records the matched route
+    scope: dict = field(default_factory=dict, repr=False)
+
+    @property
+    def route(self) -> str:
+        """Path template of the matched route, so metrics are not split by ids"""
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+    def server_timing(self, total_seconds: float) -> str:
+        """Build the Server-Timing header
+
+        Storage bytes only include what was moved before the response started; the bytes of a
+        streamed download are counted in the metrics, after the headers are sent.
+
+        Args:
+            total_seconds: Time spent on the request so far
+
+        Returns:
+            str: Header value
+        """
+        entries = [
+            f"app;dur={total_seconds * 1000:.1f}",
+            f'db;desc="{self.db_queries} queries";dur={self.db_seconds * 1000:.1f}',
+            f"pool;dur={self.pool_wait_seconds * 1000:.1f}",
+        ]
+        if self.bytes_read:
+            entries.append(f'storage-read;desc="{self.bytes_read} bytes"')
+        if self.bytes_written:
+            entries.append(f'storage-write;desc="{self.bytes_written} bytes"')
+        return ", ".join(entries)
+
+
+# Metrics of the request being served, None outside of requests (e.g. in maintenance jobs)
+current_request: ContextVar[RequestMetrics | None] = ContextVar(
+    "current_request_metrics", default=None
+)
+
+
+def record_query(engine: str, seconds: float) -> None:
+    """Record a database query, on the current request too if there is one"""
+    DB_QUERY_DURATION.observe(seconds, engine=engine)
+    request = current_request.get()
+    if request is not None:
+        request.db_queries += 1
+        request.db_seconds += seconds
+
+
+def record_pool_wait(engine: str, seconds: float) -> None:
+    """Record the wait for a pooled database connection"""
+    DB_POOL_WAIT.observe(seconds, engine=engine)
+    request = current_request.get()
+    if request is not None:
+        request.pool_wait_seconds += seconds
+
+
+def record_storage_bytes(operation: str, size: int) -> None:
+    """Record bytes read from or written to storage
+
+    Args:
+        operation: "read" or "write"
+        size: Number of bytes
+    """
+    request = current_request.get()
+    route = request.route if request is not None else "background"
+    STORAGE_BYTES.inc(size, operation=operation, route=route)
+    if request is not None:
+        if operation == "read":
+            request.bytes_read += size
+        else:
+            request.bytes_written += size
@@ -0,0 +1,100 @@
+import base64
+import datetime as dt
+import json
+from typing import Literal
+
+from sqlalchemy import tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+SortOrder = Literal["asc", "desc"]
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: dt.datetime, row_id: int, order: SortOrder) -> str:
+    """Build an opaque cursor pointing just past a row
+
+    Args:
+        created_at: Creation time of the last row of the page
+        row_id: Id of the last row of the page
+        order: Sort order the cursor was issued for
+
+    Returns:
+        str: URL-safe cursor
+    """
+    data = json.dumps({"c": created_at.isoformat(), "i": row_id, "o": order}).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order: SortOrder) -> tuple[dt.datetime, int]:
+    """Read the position stored in a cursor
+
+    Args:
+        cursor: Cursor returned with a previous page
+        order: Sort order of the current request
+
+    Returns:
+        tuple[dt.datetime, int]: Creation time and id of the last row of the previous page
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort order
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        created_at, row_id, cursor_order = (
+            dt.datetime.fromisoformat(data["c"]),
+            data["i"],
+            data["o"],
+        )
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid cursor") from e
+    if cursor_order != order or not isinstance(row_id, int):
+        raise ValueError("Cursor does not match the requested sort order")
+    return created_at, row_id
+
+
+async def paginate(
+    session: AsyncSession,
+    statement,
+    created_column,
+    id_column,
+    cursor: str | None,
+    limit: int,
+    order: SortOrder = "desc",
+) -> tuple[list, str | None]:
+    """Fetch one page of a statement ordered by (created_at, id)
+
+    Pages are located with a keyset condition instead of an offset, so deep pages cost the
+    same as the first one and rows inserted meanwhile do not shift later pages.
+
+    Args:
+        session: Database session
+        statement: Select statement returning the rows to paginate
+        created_column: Creation time column to sort on
+        id_column: Id column breaking ties between equal creation times
+        cursor: Cursor returned with the previous page, or None for the first page
+        limit: Maximum number of rows in the page
+        order: Sort order, newest first by default
+
+    Returns:
+        tuple[list, str | None]: Rows of the page and the cursor of the next page, if any
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    key = tuple_(created_column, id_column)
+    if cursor is not None:
+        position = tuple_(*decode_cursor(cursor, order))
+        statement = statement.where(key < position if order == "desc" else key > position)
+
+    if order == "desc":
+        statement = statement.order_by(created_column.desc(), id_column.desc())
+    else:
+        statement = statement.order_by(created_column.asc(), id_column.asc())
+
+    rows = list((await session.exec(statement.limit(limit + 1))).all())
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id, order)
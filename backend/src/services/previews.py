@@ -0,0 +1,251 @@
+import datetime as dt
+import io
+import re
+from collections.abc import AsyncIterator, Iterable
+
+import pypdfium2 as pdfium
+from fastapi import BackgroundTasks
+from PIL import Image, ImageOps
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.config.settings import app_settings
+from backend.src.models.file import File
+from backend.src.schemas.file import FileResponse
+from backend.src.services.blobs import blob_key
+from backend.src.services.process_pool import run_in_process
+from backend.src.services.response_cache import invalidate
+from backend.src.services.signed_urls import sign_preview
+from backend.src.services.storage import StorageBackend
+
+PREVIEW_MEDIA_TYPE = "image/webp"
+PREVIEW_LAST_MODIFIED = dt.datetime(1970, 1, 1, tzinfo=dt.UTC)
+PREVIEW_QUALITY = 80
+
+PREVIEWABLE_MEDIA_TYPES = {
+    "application/pdf",
+    "image/bmp",
+    "image/gif",
+    "image/jpeg",
+    "image/png",
+    "image/tiff",
+    "image/webp",
+}
+
+
+def _normalize(media_type: str | None) -> str:
+    return (media_type or "").split(";")[0].strip().lower()
+
+
+def can_preview(media_type: str | None) -> bool:
+    """Check whether previews can be rendered for content of a media type
+
+    Args:
+        media_type: Content type of the file, if known
+
+    Returns:
+        bool: True for raster images and PDF documents
+    """
+    return _normalize(media_type) in PREVIEWABLE_MEDIA_TYPES
+
+
+def preview_prefix(digest: str) -> str:
+    """Build the storage prefix holding every preview of a blob
+
+    Args:
+        digest: SHA-256 hex digest of the blob content
+
+    Returns:
+        str: Storage prefix, fanned out like the blob keys
+    """
+    return f"previews/{digest[:2]}/{digest[2:4]}/{digest}/"
+
+
+def preview_key(digest: str, size: int) -> str:
+    """Build the storage key of a preview
+
+    Args:
+        digest: SHA-256 hex digest of the blob content
+        size: Longest side of the preview in pixels
+
+    Returns:
+        str: Storage key
+    """
+    return f"{preview_prefix(digest)}{size}.webp"
+
+
+def preview_url(digest: str, size: int = app_settings.PREVIEW_THUMBNAIL_SIZE) -> str:
+    """Build the reference to a preview stored as the thumbnail of files
+
+    The reference is not served as is: responses replace it with a signed URL.
+
+    Args:
+        digest: SHA-256 hex digest of the blob content
+        size: Longest side of the preview in pixels
+
+    Returns:
+        str: Reference to the preview
+    """
+    return f"/api/files/previews/{digest}/{size}"
+
+
+_PREVIEW_URL = re.compile(r"^/api/files/previews/([0-9a-f]{64})/(\d+)$")
+
+
+def signed_thumbnail_url(thumbnail_url: str | None) -> str | None:
+    """Replace a reference built by `preview_url` with a signed URL of the preview
+
+    Previews are addressed by the content hash, which anyone holding a copy of a document can
+    compute, so they are only served to holders of a signed URL. Other thumbnails, such as the
+    links of Google Drive, are returned unchanged.
+
+    Args:
+        thumbnail_url: Thumbnail of a file
+
+    Returns:
+        str | None: URL to show the thumbnail from
+    """
+    match = _PREVIEW_URL.match(thumbnail_url or "")
+    if match is None:
+        return thumbnail_url
+    digest, size = match.group(1), int(match.group(2))
+    return f"/api/files/previews/{sign_preview(digest, size)}"
+
+
+def to_file_response(db_file: File) -> FileResponse:
+    """Build the response of a file, with its generated thumbnail behind a signed URL
+
+    Args:
+        db_file: File to describe
+
+    Returns:
+        FileResponse: File details
+    """
+    response = FileResponse.model_validate(db_file)
+    response.thumbnail_url = signed_thumbnail_url(db_file.thumbnail_url)
+    return response
+
+
+def _open_image(content: bytes, media_type: str, size: int) -> Image.Image:
+    """Decode an image, or the first page of a PDF, at no more than the needed resolution"""
+    if media_type == "application/pdf":
+        pdf = pdfium.PdfDocument(content)
+        try:
+            page = pdf[0]
+            width, height = page.get_size()
+            bitmap = page.render(scale=size / max(width, height, 1))
+            # Copy the pixels out of the bitmap before the document is closed
+            return bitmap.to_pil().convert("RGB")
+        finally:
+            pdf.close()
+
+    image = Image.open(io.BytesIO(content))
+    # JPEG decoders can scale down while decoding, which is much cheaper than resizing after
+    image.draft("RGB", (size, size))
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+
+def render_previews(content: bytes, media_type: str, sizes: tuple[int, ...]) -> dict[int, bytes]:
+    """Render WebP previews of an image or of the first page of a PDF
+
+    This is CPU-bound and runs in the worker processes of the preview pool. Each size is scaled
+    down from the previous, larger one, and images are never scaled up.
+
+    Args:
+        content: Content of the file
+        media_type: Content type of the file
+        sizes: Longest side of each preview in pixels
+
+    Returns:
+        dict[int, bytes]: Encoded preview of each size
+    """
+    ordered = sorted(set(sizes), reverse=True)
+    image = _open_image(content, _normalize(media_type), ordered[0])
+
+    previews: dict[int, bytes] = {}
+    for size in ordered:
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, format="WEBP", quality=PREVIEW_QUALITY)
+        previews[size] = buffer.getvalue()
+    return previews
+
+
+async def _single_chunk(data: bytes) -> AsyncIterator[bytes]:
+    yield data
+
+
+async def generate_previews(
+    engine: AsyncEngine, storage: StorageBackend, digest: str, media_type: str | None
+) -> bool:
+    """Render and store the previews of a blob, then point its files' thumbnails at them
+
+    Previews are keyed by the blob's digest, so identical content is rendered once however
+    many files share it. Failures are logged and leave the files as they are.
+
+    Args:
+        engine: Database engine
+        storage: Storage backend holding the blob and its previews
+        digest: SHA-256 hex digest of the blob content
+        media_type: Content type of the blob
+
+    Returns:
+        bool: True if the previews are available
+    """
+    sizes = tuple(app_settings.PREVIEW_SIZES)
+    try:
+        stored = [await storage.exists(preview_key(digest, size)) for size in sizes]
+        if not all(stored):
+            key = blob_key(digest)
+            if await storage.size(key) > app_settings.PREVIEW_MAX_SOURCE_BYTES:
+                return False
+            content = b"".join([chunk async for chunk in storage.read(key)])
+            previews = await run_in_process(render_previews, content, media_type, sizes)
+            for size, data in previews.items():
+                await storage.write(preview_key(digest, size), _single_chunk(data))
+    except Exception as e:
+        print(f"Warning: Failed to generate previews of blob {digest}: {str(e)}")
+        return False
+
+    async with AsyncSession(engine) as session:
+        workspace_ids = (
+            (
+                await session.exec(
+                    update(File)
+                    .where(File.blob_digest == digest)
+                    .values(thumbnail_url=preview_url(digest))
+                    .returning(File.workspace_id)
+                )
+            )
+            .scalars()
+            .all()
+        )
+        await session.commit()
+    await invalidate(workspace_ids=workspace_ids)
+    return True
+
+
+def schedule_previews(
+    background_tasks: BackgroundTasks,
+    engine: AsyncEngine,
+    storage: StorageBackend,
+    files: Iterable[File],
+) -> None:
+    """Generate the previews of newly stored files once the response is sent
+
+    Args:
+        background_tasks: Background tasks of the request
+        engine: Database engine
+        storage: Storage backend holding the content
+        files: Files that were just stored
+    """
+    pending = {
+        db_file.blob_digest: db_file.mime_type
+        for db_file in files
+        if db_file.blob_digest and can_preview(db_file.mime_type)
+    }
+    for digest, media_type in pending.items():
+        background_tasks.add_task(generate_previews, engine, storage, digest, media_type)
@@ -0,0 +1,48 @@
+import asyncio
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from backend.src.config.settings import app_settings
+
+_executor: ProcessPoolExecutor | None = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Get the process pool running CPU-bound work, creating it on first use
+
+    Workers are spawned rather than forked, so they do not inherit the threads and open
+    connections of the API process.
+
+    Returns:
+        ProcessPoolExecutor: Shared process pool
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=app_settings.PROCESS_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def shutdown_process_pool() -> None:
+    """Stop the pool's workers, dropping work that has not started yet"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_in_process(function: Callable[..., Any], *args: Any) -> Any:
+    """Run a function in the process pool without blocking the event loop
+
+    Args:
+        function: Module-level function, so it can be pickled
+        *args: Picklable arguments of the function
+
+    Returns:
+        Any: Return value of the function
+    """
+    return await asyncio.get_running_loop().run_in_executor(get_process_pool(), function, *args)
@@ -0,0 +1,91 @@
+from collections.abc import Iterable
+from functools import cache
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.config.settings import app_settings
+from backend.src.models.workspace import WorkspaceMember
+from backend.src.services.response_cache.base import CacheBackend, CachedPage, ResponseCache
+from backend.src.services.response_cache.memory import MemoryCacheBackend
+
+__all__ = [
+    "CacheBackend",
+    "CachedPage",
+    "MemoryCacheBackend",
+    "ResponseCache",
+    "get_response_cache",
+    "invalidate",
+    "invalidate_workspace",
+    "user_scope",
+    "workspace_scope",
+]
+
+
+@cache
+def get_response_cache() -> ResponseCache | None:
+    """Get the response cache selected by RESPONSE_CACHE_BACKEND
+
+    Returns:
+        ResponseCache | None: Shared cache instance, or None if caching is disabled
+    """
+    if app_settings.RESPONSE_CACHE_BACKEND == "none":
+        return None
+
+    if app_settings.RESPONSE_CACHE_BACKEND == "redis":
+        # Imported lazily so redis is only needed when it is configured
+        from backend.src.services.response_cache.redis import RedisCacheBackend
+
+        backend = RedisCacheBackend.from_settings(app_settings)
+    else:
+        backend = MemoryCacheBackend(app_settings.RESPONSE_CACHE_MAX_ENTRIES)
+    return ResponseCache(backend, app_settings.RESPONSE_CACHE_TTL_SECONDS)
+
+
+def workspace_scope(workspace_id: int) -> str:
+    """Scope of the files listed in a workspace"""
+    return f"workspace:{workspace_id}"
+
+
+def user_scope(user_id: int) -> str:
+    """Scope of the workspaces listed for a user, with their members and usage"""
+    return f"user:{user_id}"
+
+
+async def invalidate(workspace_ids: Iterable[int] = (), user_ids: Iterable[int] = ()) -> None:
+    """Drop the cached listings of workspaces' files and of users' workspaces
+
+    Must be called once the change is committed, or a concurrent request could cache the
+    previous data under the new version.
+
+    Args:
+        workspace_ids: Workspaces whose files changed
+        user_ids: Users whose list of workspaces changed, or one of whose workspaces did
+    """
+    response_cache = get_response_cache()
+    if response_cache is None:
+        return
+    await response_cache.invalidate(
+        [workspace_scope(workspace_id) for workspace_id in set(workspace_ids)]
+        + [user_scope(user_id) for user_id in set(user_ids)]
+    )
+
+
+async def invalidate_workspace(session: AsyncSession, workspace_id: int) -> None:
+    """Drop the cached listings showing a workspace, after a committed change to it
+
+    Covers its files, and the workspace lists of its members, which show its name, members
+    and usage.
+
+    Args:
+        session: Database session
+        workspace_id: Workspace that changed
+    """
+    if get_response_cache() is None:
+        return
+    member_ids = (
+        await session.exec(
+            select(WorkspaceMember.user_id).where(WorkspaceMember.workspace_id == workspace_id)
+        )
+    ).all()
+    await invalidate([workspace_id], member_ids)
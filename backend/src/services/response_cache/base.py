@@ -0,0 +1,138 @@
+import hashlib
+import json
+from abc import ABC, abstractmethod
+from collections.abc import Iterable
+from dataclasses import dataclass
+from uuid import uuid4
+
+# Stamps outlive the pages keyed by them, so a page is never orphaned by an expired stamp
+VERSION_TTL_SECONDS = 24 * 3600
+
+
+class CacheBackend(ABC):
+    """Interface for storing bytes under string keys, each with a time-to-live"""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Get the value of a key, or None if it is missing or expired"""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store a value, replacing any existing one
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Seconds until the value expires
+        """
+
+    @abstractmethod
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        """Store a value only if the key is missing
+
+        Returns:
+            bool: True if the value was stored
+        """
+
+    async def set_many(self, values: dict[str, bytes], ttl: float) -> None:
+        """Store several values with the same time-to-live"""
+        for key, value in values.items():
+            await self.set(key, value, ttl)
+
+    async def close(self) -> None:
+        """Release the connections of the backend, if any"""
+        return None
+
+
+@dataclass
+class CachedPage:
+    """Serialized page of a listing, with the headers it was served with"""
+
+    body: bytes
+    next_cursor: str | None = None
+
+    @property
+    def etag(self) -> str:
+        """Weak ETag of the page content"""
+        return f'W/"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+
+    def dump(self) -> bytes:
+        return json.dumps({"next_cursor": self.next_cursor}).encode() + b"\n" + self.body
+
+    @classmethod
+    def load(cls, data: bytes) -> "CachedPage":
+        header, body = data.split(b"\n", 1)
+        return cls(body=body, next_cursor=json.loads(header)["next_cursor"])
+
+
+class ResponseCache:
+    """Cache of serialized listing pages, invalidated by version stamps
+
+    Each scope whose changes affect a listing, such as a workspace or the workspaces of a user,
+    has a version stamp, and pages are cached under keys embedding the versions they were built
+    from. Invalidating a scope only replaces its stamp: the pages built from the previous one
+    are not found anymore and expire on their own. A missing stamp is recreated with a random
+    value, so evicting it cannot bring back older pages.
+
+    Cache errors are reported and treated as misses, so an unavailable backend only makes
+    listings slower. Pages must be built from data at least as recent as their stamps, so
+    from the primary rather than a read replica.
+
+    Args:
+        backend: Backend storing the pages and the version stamps
+        ttl: Seconds a page is cached for
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+
+    async def version(self, scope: str) -> str:
+        """Get the current version stamp of a scope, e.g. `workspace:1`"""
+        key = f"version:{scope}"
+        try:
+            value = await self.backend.get(key)
+            if value is None:
+                value = uuid4().hex.encode()
+                if not await self.backend.add(key, value, VERSION_TTL_SECONDS):
+                    value = await self.backend.get(key) or value
+        except Exception as e:
+            print(f"Warning: Failed to read cache version of {scope}: {str(e)}")
+            # Unique, so nothing cached under it is ever served
+            return uuid4().hex
+        return value.decode()
+
+    async def invalidate(self, scopes: Iterable[str]) -> None:
+        """Replace the version stamps of scopes whose data changed"""
+        values = {f"version:{scope}": uuid4().hex.encode() for scope in scopes}
+        if not values:
+            return
+        try:
+            await self.backend.set_many(values, VERSION_TTL_SECONDS)
+        except Exception as e:
+            print(f"Warning: Failed to invalidate cached responses: {str(e)}")
+
+    @staticmethod
+    def key(*parts: object) -> str:
+        """Build the key of a page from its versions and query parameters"""
+        digest = hashlib.sha256("\x1f".join(map(str, parts)).encode()).hexdigest()
+        return f"page:{digest}"
+
+    async def get(self, key: str) -> CachedPage | None:
+        """Get a cached page, or None on a miss"""
+        try:
+            data = await self.backend.get(key)
+        except Exception as e:
+            print(f"Warning: Failed to read cached response: {str(e)}")
+            return None
+        return CachedPage.load(data) if data is not None else None
+
+    async def set(self, key: str, page: CachedPage) -> None:
+        """Cache a page for the cache's time-to-live"""
+        try:
+            await self.backend.set(key, page.dump(), self.ttl)
+        except Exception as e:
+            print(f"Warning: Failed to cache response: {str(e)}")
+
+    async def close(self) -> None:
+        await self.backend.close()
@@ -0,0 +1,34 @@
+from backend.src.services.response_cache.base import CacheBackend
+from backend.src.services.ttl_cache import TTLCache
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Cache backend keeping values in this process, evicting the least recently used first
+
+    Invalidations made by other processes are not seen, so this backend only suits
+    deployments running a single worker.
+
+    Args:
+        max_size: Maximum number of values, version stamps included
+    """
+
+    def __init__(self, max_size: int):
+        # Every value is stored with its own time-to-live
+        self._entries = TTLCache(max_size=max_size, ttl=0)
+
+    async def get(self, key: str) -> bytes | None:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries.set(key, value, ttl=ttl)
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        # Nothing awaits between the lookup and the write, so no other request runs in between
+        if self._entries.get(key) is not None:
+            return False
+        self._entries.set(key, value, ttl=ttl)
+        return True
+
+    def clear(self) -> None:
+        """Remove every value"""
+        self._entries.clear()
@@ -0,0 +1,47 @@
+from backend.src.config.settings import AppSettings
+from backend.src.services.response_cache.base import CacheBackend
+
+DEFAULT_PREFIX = "dataroom:cache:"
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache backend for Redis and Redis-compatible servers such as Valkey or KeyDB
+
+    Shared by every worker, so an invalidation made by one of them applies to all.
+
+    Args:
+        client: `redis.asyncio.Redis` client, or any object with the same `get`, `set` and
+            `pipeline` methods
+        prefix: Prefix of every key, to share a server with other applications
+    """
+
+    def __init__(self, client, prefix: str = DEFAULT_PREFIX):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_settings(cls, settings: AppSettings) -> "RedisCacheBackend":
+        """Connect to the server at RESPONSE_CACHE_REDIS_URL"""
+        # Imported lazily so redis is only needed when this backend is configured
+        from redis.asyncio import Redis
+
+        return cls(Redis.from_url(settings.RESPONSE_CACHE_REDIS_URL))
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    async def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return bool(await self.client.set(self.prefix + key, value, px=int(ttl * 1000), nx=True))
+
+    async def set_many(self, values: dict[str, bytes], ttl: float) -> None:
+        # One round trip for all the keys
+        async with self.client.pipeline(transaction=False) as pipeline:
+            for key, value in values.items():
+                pipeline.set(self.prefix + key, value, px=int(ttl * 1000))
+            await pipeline.execute()
+
+    async def close(self) -> None:
+        await self.client.aclose()
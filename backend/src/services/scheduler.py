@@ -0,0 +1,202 @@
+import asyncio
+import datetime as dt
+import os
+import socket
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from uuid import uuid4
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.models.job_lease import JobLease
+from backend.src.types.date import utc_now
+
+# Share of the lease duration between two renewals while a job runs
+LEASE_RENEWAL_FRACTION = 1 / 3
+
+
+class LeaseLostError(Exception):
+    """Raised when a running job's lease could not be renewed"""
+
+
+@dataclass
+class JobMetrics:
+    """Counters and timings of a scheduled job in this process"""
+
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    processed: int = 0
+    last_processed: int = 0
+    last_started_at: dt.datetime | None = None
+    last_duration: float | None = None
+    last_error: str | None = None
+
+
+@dataclass
+class Job:
+    """A maintenance task run periodically by the scheduler
+
+    `func` returns the number of items it processed.
+    """
+
+    name: str
+    func: Callable[[], Awaitable[int]]
+    interval: float
+    metrics: JobMetrics = field(default_factory=JobMetrics)
+
+
+async def acquire_lease(session: AsyncSession, name: str, owner: str, duration: float) -> bool:
+    """Take or renew the lease of a job
+
+    The lease is granted if nobody holds it, if it expired, or if the owner already holds it.
+
+    Args:
+        session: Database session
+        name: Job name
+        owner: Identifier of the competing process
+        duration: Lease duration in seconds
+
+    Returns:
+        bool: True if the owner now holds the lease
+    """
+    now = utc_now()
+    expires_at = now + dt.timedelta(seconds=duration)
+    statement = (
+        update(JobLease)
+        .where(
+            JobLease.name == name,
+            or_(JobLease.owner == owner, JobLease.expires_at < now),
+        )
+        .values(owner=owner, expires_at=expires_at, updated_at=now)
+    )
+    if (await session.exec(statement)).rowcount:
+        await session.commit()
+        return True
+
+    try:
+        async with session.begin_nested():
+            session.add(JobLease(name=name, owner=owner, expires_at=expires_at))
+    except IntegrityError:
+        # Another replica holds a live lease
+        return False
+    await session.commit()
+    return True
+
+
+class Scheduler:
+    """In-process scheduler running maintenance jobs on fixed intervals
+
+    Every replica runs a scheduler, but a job only executes on the replica holding its lease in
+    the `job_leases` table. A lease lasts one interval, so a crashed leader is replaced after at
+    most one missed run. While a job runs its lease is renewed periodically, so a run outlasting
+    its interval is not duplicated by another replica; if a renewal fails, the run is stopped.
+
+    Args:
+        engine: Database engine used for leases
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.owner = f"{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}"
+        self.jobs: dict[str, Job] = {}
+        self._tasks: list[asyncio.Task] = []
+
+    def add_job(self, name: str, func: Callable[[], Awaitable[int]], interval: float) -> Job:
+        """Register a job
+
+        Args:
+            name: Unique job name, also the lease name
+            func: Coroutine function doing the work and returning the number of items processed
+            interval: Seconds between two runs
+
+        Returns:
+            Job: The registered job
+        """
+        job = Job(name=name, func=func, interval=interval)
+        self.jobs[name] = job
+        return job
+
+    async def _acquire(self, job: Job) -> bool:
+        async with AsyncSession(self.engine) as session:
+            return await acquire_lease(session, job.name, self.owner, job.interval)
+
+    async def _run_leased(self, job: Job) -> int:
+        run = asyncio.create_task(job.func())
+        try:
+            while True:
+                done, _ = await asyncio.wait({run}, timeout=job.interval * LEASE_RENEWAL_FRACTION)
+                if done:
+                    return run.result()
+                try:
+                    renewed = await self._acquire(job)
+                except Exception as e:
+                    print(f"Warning: could not renew lease for job {job.name}: {e}")
+                    renewed = False
+                if not renewed:
+                    raise LeaseLostError(f"Lease of job {job.name} was lost while it ran")
+        finally:
+            if not run.done():
+                run.cancel()
+                await asyncio.gather(run, return_exceptions=True)
+
+    async def run_job(self, job: Job) -> bool:
+        """Run a job once if this process holds its lease
+
+        The lease is renewed while the job runs, and the job is cancelled if that fails.
+        Failures are recorded in the job metrics rather than raised.
+
+        Args:
+            job: Job to run
+
+        Returns:
+            bool: True if the job ran
+        """
+        metrics = job.metrics
+        try:
+            leader = await self._acquire(job)
+        except Exception as e:
+            print(f"Warning: could not acquire lease for job {job.name}: {e}")
+            leader = False
+        if not leader:
+            metrics.skipped += 1
+            return False
+
+        metrics.runs += 1
+        metrics.last_started_at = utc_now()
+        started = time.perf_counter()
+        try:
+            processed = await self._run_leased(job)
+        except Exception as e:
+            metrics.failures += 1
+            metrics.last_error = f"{type(e).__name__}: {e}"
+            print(f"Warning: job {job.name} failed: {metrics.last_error}")
+        else:
+            metrics.processed += processed
+            metrics.last_processed = processed
+            metrics.last_error = None
+        finally:
+            metrics.last_duration = time.perf_counter() - started
+        return True
+
+    async def _loop(self, job: Job) -> None:
+        while True:
+            await self.run_job(job)
+            await asyncio.sleep(job.interval)
+
+    def start(self) -> None:
+        """Start running every registered job in the background"""
+        for job in self.jobs.values():
+            self._tasks.append(asyncio.create_task(self._loop(job), name=f"job:{job.name}"))
+
+    async def stop(self) -> None:
+        """Cancel the running jobs and wait for them to finish"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
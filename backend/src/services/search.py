@@ -0,0 +1,255 @@
+import base64
+import html
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from fastapi import BackgroundTasks
+from sqlalchemy import Integer, column, func, literal_column, table, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.config.settings import app_settings
+from backend.src.models.file import File
+from backend.src.models.file_search import FileSearch
+from backend.src.models.workspace import WorkspaceMember
+from backend.src.services.process_pool import run_in_process
+from backend.src.services.storage import StorageBackend
+from backend.src.services.text_extraction import can_extract_text, extract_text
+from backend.src.types.date import utc_now
+
+# Snippets are highlighted with control characters, which extracted text never contains, so
+# they can be turned into markup after the text itself is escaped
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\x02", "\x03"
+HEADLINE_OPTIONS = (
+    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, "
+    'MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter=" … "'
+)
+# Matches in the file name weigh more than matches in its text
+NAME_WEIGHT, BODY_WEIGHT = 10.0, 1.0
+
+
+@dataclass
+class SearchHit:
+    """A file matching a search"""
+
+    file: File
+    rank: float
+    snippet: str | None
+
+
+def _encode_cursor(rank: float, file_id: int) -> str:
+    data = json.dumps({"r": rank, "i": file_id}).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        rank, file_id = float(data["r"]), data["i"]
+    except (ValueError, TypeError, KeyError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(file_id, int):
+        raise ValueError("Invalid cursor")
+    return rank, file_id
+
+
+def _highlight(snippet: str | None) -> str | None:
+    """Escape a snippet and mark its matches with <mark> tags"""
+    if not snippet or not snippet.strip():
+        return None
+    escaped = html.escape(snippet)
+    return escaped.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+
+
+def _fts5_query(query: str) -> str:
+    """Quote each term, so any user input is a valid FTS5 query matching all of its terms"""
+    terms = query.replace('"', " ").split()
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def _member_workspaces(user_id: int):
+    return select(WorkspaceMember.workspace_id).where(WorkspaceMember.user_id == user_id)
+
+
+def _postgres_statement(
+    query: str, user_id: int, workspace_id: int | None, position: tuple | None, limit: int
+):
+    tsquery = func.websearch_to_tsquery("english", query)
+    document = literal_column("file_search.document")
+    rank = func.ts_rank_cd(document, tsquery)
+
+    # Rank and paginate on the index alone, then build snippets for the page only
+    matches = select(FileSearch.file_id, rank.label("rank")).where(
+        document.op("@@")(tsquery),
+        FileSearch.workspace_id.in_(_member_workspaces(user_id)),
+    )
+    if workspace_id is not None:
+        matches = matches.where(FileSearch.workspace_id == workspace_id)
+    if position is not None:
+        matches = matches.where(tuple_(rank, FileSearch.file_id) < tuple_(*position))
+    page = matches.order_by(rank.desc(), FileSearch.file_id.desc()).limit(limit + 1).subquery()
+
+    headline = func.ts_headline("english", FileSearch.body, tsquery, HEADLINE_OPTIONS)
+    return (
+        select(File, page.c.rank, headline)
+        .join(page, File.id == page.c.file_id)
+        .join(FileSearch, FileSearch.file_id == File.id)
+        .order_by(page.c.rank.desc(), page.c.file_id.desc())
+    )
+
+
+def _sqlite_statement(
+    fts_query: str, user_id: int, workspace_id: int | None, position: tuple | None, limit: int
+):
+    fts = table("file_search_fts", column("rowid", Integer))
+    fts_table = literal_column("file_search_fts")
+    # bm25 scores better matches lower; negate it so ranks sort like Postgres ranks
+    rank = -func.bm25(fts_table, NAME_WEIGHT, BODY_WEIGHT)
+    snippet = func.snippet(fts_table, 1, HIGHLIGHT_START, HIGHLIGHT_STOP, " … ", 16)
+
+    statement = (
+        select(File, rank.label("rank"), snippet)
+        .select_from(fts)
+        .join(File, File.id == fts.c.rowid)
+        .where(
+            fts_table.op("MATCH")(fts_query),
+            File.workspace_id.in_(_member_workspaces(user_id)),
+        )
+    )
+    if workspace_id is not None:
+        statement = statement.where(File.workspace_id == workspace_id)
+    if position is not None:
+        statement = statement.where(tuple_(rank, fts.c.rowid) < tuple_(*position))
+    return statement.order_by(rank.desc(), fts.c.rowid.desc()).limit(limit + 1)
+
+
+async def search_files(
+    session: AsyncSession,
+    user_id: int,
+    query: str,
+    workspace_id: int | None = None,
+    cursor: str | None = None,
+    limit: int = app_settings.PAGE_SIZE_DEFAULT,
+) -> tuple[list[SearchHit], str | None]:
+    """Search the names and text of the files in the workspaces a user belongs to
+
+    Results are ordered by relevance and paginated with a keyset on (rank, file id), so deep
+    pages cost the same as the first one.
+
+    Args:
+        session: Database session
+        user_id: Id of the user searching
+        query: Search terms; on Postgres, quoted phrases, "or" and "-" work like in web search
+        workspace_id: Only search this workspace
+        cursor: Cursor returned with the previous page, or None for the first page
+        limit: Maximum number of results in the page
+
+    Returns:
+        tuple[list[SearchHit], str | None]: Results of the page and the cursor of the next
+        page, if any
+
+    Raises:
+        ValueError: If the cursor is invalid
+    """
+    position = _decode_cursor(cursor) if cursor is not None else None
+
+    if session.bind.dialect.name == "postgresql":
+        statement = _postgres_statement(query, user_id, workspace_id, position, limit)
+    else:
+        fts_query = _fts5_query(query)
+        if not fts_query:
+            return [], None
+        statement = _sqlite_statement(fts_query, user_id, workspace_id, position, limit)
+
+    rows = (await session.exec(statement)).all()
+    hits = [
+        SearchHit(file=db_file, rank=rank, snippet=_highlight(snippet))
+        for db_file, rank, snippet in rows[:limit]
+    ]
+    if len(rows) <= limit:
+        return hits, None
+    return hits, _encode_cursor(hits[-1].rank, hits[-1].file.id)
+
+
+async def _extract_text(storage: StorageBackend, db_file: File) -> str:
+    if not can_extract_text(db_file.mime_type):
+        return ""
+    try:
+        if await storage.size(db_file.file_path) > app_settings.SEARCH_MAX_SOURCE_BYTES:
+            return ""
+        content = b"".join([chunk async for chunk in storage.read(db_file.file_path)])
+        return await run_in_process(
+            extract_text, content, db_file.mime_type, app_settings.SEARCH_MAX_TEXT_CHARS
+        )
+    except Exception as e:
+        print(f"Warning: Failed to extract the text of file {db_file.id}: {str(e)}")
+        return ""
+
+
+async def index_file(engine: AsyncEngine, storage: StorageBackend, file_id: int) -> bool:
+    """Add a file to the search index, or refresh its entry
+
+    Text is extracted in the process pool, without holding a database connection. Files
+    sharing a blob reuse the text already extracted for it. A file whose text cannot be
+    extracted is still indexed under its name.
+
+    Args:
+        engine: Database engine
+        storage: Storage backend holding the content
+        file_id: Id of the file
+
+    Returns:
+        bool: True if the file was indexed, False if it no longer exists
+    """
+    async with AsyncSession(engine) as session:
+        db_file = await session.get(File, file_id)
+        if db_file is None:
+            return False
+        body = None
+        if db_file.blob_digest:
+            body = (
+                await session.exec(
+                    select(FileSearch.body)
+                    .join(File, File.id == FileSearch.file_id)
+                    .where(File.blob_digest == db_file.blob_digest, FileSearch.file_id != file_id)
+                    .limit(1)
+                )
+            ).first()
+
+    if body is None:
+        body = await _extract_text(storage, db_file)
+
+    async with AsyncSession(engine) as session:
+        entry = await session.get(FileSearch, file_id) or FileSearch(file_id=file_id)
+        entry.workspace_id = db_file.workspace_id
+        entry.name = db_file.name
+        entry.body = body
+        entry.indexed_at = utc_now()
+        session.add(entry)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # The file was deleted while its text was being extracted
+            return False
+    return True
+
+
+def schedule_indexing(
+    background_tasks: BackgroundTasks,
+    engine: AsyncEngine,
+    storage: StorageBackend,
+    files: Iterable[File],
+) -> None:
+    """Index newly stored files once the response is sent
+
+    Args:
+        background_tasks: Background tasks of the request
+        engine: Database engine
+        storage: Storage backend holding the content
+        files: Files that were just stored
+    """
+    for db_file in files:
+        background_tasks.add_task(index_file, engine, storage, db_file.id)
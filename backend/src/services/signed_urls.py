@@ -0,0 +1,151 @@
+import datetime as dt
+from dataclasses import dataclass
+
+import jwt
+
+from backend.src.config.settings import app_settings
+from backend.src.models.file import File
+from backend.src.services.downloads import file_etag
+from backend.src.types.date import as_utc, utc_now
+
+# Audiences that keep download, preview and access tokens from being used in place of each other
+DOWNLOAD_AUDIENCE = "dataroom:download"
+PREVIEW_AUDIENCE = "dataroom:preview"
+
+
+@dataclass
+class SignedPreview:
+    """Preview details carried inside a signed preview token"""
+
+    digest: str
+    size: int
+    expires_at: dt.datetime
+
+
+@dataclass
+class SignedDownload:
+    """File details carried inside a signed download token"""
+
+    key: str
+    filename: str
+    media_type: str
+    size: int
+    etag: str
+    last_modified: dt.datetime
+    expires_at: dt.datetime
+
+
+def sign_download(
+    db_file: File, expires_in: int = app_settings.DOWNLOAD_URL_EXPIRE_SECONDS
+) -> tuple[str, dt.datetime]:
+    """Create a signed token granting download access to a file
+
+    The token carries everything needed to serve the file, so redeeming it needs no database
+    access.
+
+    Args:
+        db_file: File to grant access to
+        expires_in: Validity of the token in seconds
+
+    Returns:
+        tuple[str, dt.datetime]: Signed token and its expiry time
+    """
+    expires_at = utc_now() + dt.timedelta(seconds=expires_in)
+    payload = {
+        "aud": DOWNLOAD_AUDIENCE,
+        "sub": str(db_file.id),
+        "key": db_file.file_path,
+        "name": db_file.name,
+        "mime": db_file.mime_type or "application/octet-stream",
+        "size": db_file.file_size,
+        "etag": file_etag(db_file),
+        "mod": int(as_utc(db_file.updated_at).timestamp()),
+        "exp": expires_at,
+    }
+    token = jwt.encode(
+        payload, app_settings.SECRET_KEY.get_secret_value(), algorithm=app_settings.ALGORITHM
+    )
+    return token, expires_at
+
+
+def verify_download(token: str) -> SignedDownload | None:
+    """Verify a signed download token
+
+    Args:
+        token: Token created by `sign_download`
+
+    Returns:
+        SignedDownload | None: Download details, or None if the token is invalid or expired
+    """
+    try:
+        payload = jwt.decode(
+            token,
+            app_settings.SECRET_KEY.get_secret_value(),
+            algorithms=[app_settings.ALGORITHM],
+            audience=DOWNLOAD_AUDIENCE,
+        )
+        return SignedDownload(
+            key=payload["key"],
+            filename=payload["name"],
+            media_type=payload["mime"],
+            size=payload["size"],
+            etag=payload["etag"],
+            last_modified=dt.datetime.fromtimestamp(payload["mod"], tz=dt.UTC),
+            expires_at=dt.datetime.fromtimestamp(payload["exp"], tz=dt.UTC),
+        )
+    except (jwt.InvalidTokenError, KeyError, TypeError):
+        return None
+
+
+def sign_preview(
+    digest: str, size: int, expires_in: int = app_settings.PREVIEW_URL_EXPIRE_SECONDS
+) -> str:
+    """Create a signed token granting access to a preview of a blob
+
+    The expiry is rounded up to the end of the next period of `expires_in` seconds, so the
+    token is valid for one to two periods. Signing the same preview within a period gives the
+    same token, which keeps preview URLs cacheable by browsers and listings.
+
+    Args:
+        digest: SHA-256 hex digest of the blob content
+        size: Longest side of the preview in pixels
+        expires_in: Length of the period in seconds
+
+    Returns:
+        str: Signed token
+    """
+    now = int(utc_now().timestamp())
+    payload = {
+        "aud": PREVIEW_AUDIENCE,
+        "sub": digest,
+        "size": size,
+        "exp": (now // expires_in + 2) * expires_in,
+    }
+    return jwt.encode(
+        payload, app_settings.SECRET_KEY.get_secret_value(), algorithm=app_settings.ALGORITHM
+    )
+
+
+def verify_preview(token: str) -> SignedPreview | None:
+    """Verify a signed preview token
+
+    Args:
+        token: Token created by `sign_preview`
+
+    Returns:
+        SignedPreview | None: Preview details, or None if the token is invalid or expired
+    """
+    try:
+        payload = jwt.decode(
+            token,
+            app_settings.SECRET_KEY.get_secret_value(),
+            algorithms=[app_settings.ALGORITHM],
+            audience=PREVIEW_AUDIENCE,
+        )
+        return SignedPreview(
+            digest=payload["sub"],
+            size=int(payload["size"]),
+            expires_at=dt.datetime.fromtimestamp(payload["exp"], tz=dt.UTC),
+        )
+    except (jwt.InvalidTokenError, KeyError, TypeError, ValueError):
+        return None
@@ -0,0 +1,37 @@
+from functools import cache
+
+from backend.src.config.settings import app_settings
+from backend.src.services.storage.base import (
+    StorageBackend,
+    StorageObject,
+    StoragePart,
+    iter_upload_file,
+)
+from backend.src.services.storage.local import LocalStorageBackend
+from backend.src.services.storage.metered import MeteredStorageBackend
+
+__all__ = [
+    "LocalStorageBackend",
+    "MeteredStorageBackend",
+    "StorageBackend",
+    "StorageObject",
+    "StoragePart",
+    "get_storage",
+    "iter_upload_file",
+]
+
+
+@cache
+def get_storage() -> StorageBackend:
+    """Get the storage backend selected by STORAGE_BACKEND
+
+    Returns:
+        StorageBackend: Shared storage backend instance, recording the bytes it moves
+    """
+    if app_settings.STORAGE_BACKEND == "s3":
+        # Imported lazily so boto3 is only needed when S3 is configured
+        from backend.src.services.storage.s3 import S3StorageBackend
+
+        return MeteredStorageBackend(S3StorageBackend.from_settings(app_settings))
+
+    return MeteredStorageBackend(LocalStorageBackend(app_settings.STORAGE_BASE_PATH))
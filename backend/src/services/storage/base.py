@@ -0,0 +1,183 @@
+import datetime as dt
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+
+from fastapi import UploadFile
+
+from backend.src.config.settings import app_settings
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+@dataclass
+class StoragePart:
+    """A part of a multipart upload"""
+
+    number: int
+    etag: str
+    size: int
+
+
+@dataclass
+class StorageObject:
+    """A stored key as returned by listings"""
+
+    key: str
+    size: int
+    modified_at: dt.datetime
+
+
+class StorageBackend(ABC):
+    """Interface for storing file content under string keys
+
+    Keys are relative, slash-separated paths such as ``blobs/ab/cd/<digest>``.
+    """
+
+    min_part_size: int = 1
+
+    @abstractmethod
+    async def write(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        """Write a stream of chunks to a key, replacing any existing content
+
+        Args:
+            key: Storage key
+            chunks: Async iterator of byte chunks
+
+        Returns:
+            int: Number of bytes written
+        """
+
+    @abstractmethod
+    def read(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """Stream the content of a key
+
+        Args:
+            key: Storage key
+            chunk_size: Maximum size of each chunk
+
+        Returns:
+            AsyncIterator[bytes]: Content of the key in chunks
+        """
+
+    @abstractmethod
+    def read_range(
+        self, key: str, start: int, length: int, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """Stream a byte range of a key
+
+        Args:
+            key: Storage key
+            start: Offset of the first byte
+            length: Number of bytes to read
+            chunk_size: Maximum size of each chunk
+
+        Returns:
+            AsyncIterator[bytes]: Requested bytes in chunks
+        """
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Check whether a key exists"""
+
+    @abstractmethod
+    async def size(self, key: str) -> int:
+        """Get the size of the content stored under a key in bytes"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete a key, ignoring missing keys"""
+
+    @abstractmethod
+    async def delete_prefix(self, prefix: str) -> None:
+        """Delete every key under a prefix"""
+
+    @abstractmethod
+    def list_keys(self, prefix: str) -> AsyncIterator[StorageObject]:
+        """List the keys under a prefix
+
+        Args:
+            prefix: Key prefix, e.g. ``tmp/``
+
+        Returns:
+            AsyncIterator[StorageObject]: Stored keys in no particular order
+        """
+
+    @abstractmethod
+    async def move(self, source: str, destination: str) -> None:
+        """Move content from one key to another, replacing the destination"""
+
+    @abstractmethod
+    async def create_multipart(self, key: str) -> str:
+        """Start a multipart upload to a key
+
+        Returns:
+            str: Backend identifier of the multipart upload
+        """
+
+    @abstractmethod
+    async def upload_part(
+        self,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        limit: int | None = None,
+    ) -> StoragePart:
+        """Upload one part of a multipart upload
+
+        Args:
+            key: Storage key the upload will be stored under
+            upload_id: Backend identifier of the multipart upload
+            part_number: 1-based part number
+            offset: Position of the part in the assembled object
+            chunks: Async iterator of byte chunks
+            limit: Maximum number of bytes to accept
+
+        Returns:
+            StoragePart: The stored part
+
+        Raises:
+            ValueError: If the part exceeds the limit
+        """
+
+    @abstractmethod
+    async def complete_multipart(self, key: str, upload_id: str, parts: list[StoragePart]) -> None:
+        """Assemble the uploaded parts into the object stored under the key"""
+
+    @abstractmethod
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        """Abort a multipart upload and discard its parts"""
+
+    async def presigned_url(
+        self, key: str, filename: str, media_type: str, expires_in: int
+    ) -> str | None:
+        """Create a URL that lets clients download a key directly from the backend
+
+        Args:
+            key: Storage key
+            filename: File name suggested to the client
+            media_type: Content type of the download
+            expires_in: Validity of the URL in seconds
+
+        Returns:
+            str | None: Presigned URL, or None if the backend cannot serve downloads itself
+        """
+        return None
+
+
+async def iter_upload_file(
+    file: UploadFile, chunk_size: int = app_settings.UPLOAD_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Iterate over an uploaded file in chunks without blocking the event loop
+
+    Args:
+        file: Uploaded file
+        chunk_size: Maximum size of each chunk
+
+    Yields:
+        bytes: Next chunk of the file
+    """
+    while chunk := await file.read(chunk_size):
+        yield chunk
@@ -0,0 +1,136 @@
+import datetime as dt
+import shutil
+from collections.abc import AsyncIterator
+from pathlib import Path
+from uuid import uuid4
+
+import anyio
+
+from backend.src.services.storage.base import (
+    DEFAULT_CHUNK_SIZE,
+    StorageBackend,
+    StorageObject,
+    StoragePart,
+)
+
+
+async def _write_chunks(
+    path: anyio.Path,
+    chunks: AsyncIterator[bytes],
+    offset: int | None = None,
+    limit: int | None = None,
+) -> int:
+    """Write chunks to a file, flushing what was received even if the stream fails"""
+    written = 0
+    mode = "wb" if offset is None else "r+b"
+    async with await anyio.open_file(path, mode) as buffer:
+        if offset:
+            await buffer.seek(offset)
+        try:
+            async for chunk in chunks:
+                if limit is not None and written + len(chunk) > limit:
+                    raise ValueError("Upload exceeds the declared file size")
+                await buffer.write(chunk)
+                written += len(chunk)
+        finally:
+            await buffer.flush()
+    return written
+
+
+class LocalStorageBackend(StorageBackend):
+    """Storage backend keeping content on the local filesystem"""
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _path(self, key: str) -> anyio.Path:
+        return anyio.Path(self.root / key)
+
+    async def write(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        path = self._path(key)
+        await path.parent.mkdir(parents=True, exist_ok=True)
+        return await _write_chunks(path, chunks)
+
+    async def read(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        async with await anyio.open_file(self._path(key), "rb") as source:
+            while chunk := await source.read(chunk_size):
+                yield chunk
+
+    async def read_range(
+        self, key: str, start: int, length: int, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        async with await anyio.open_file(self._path(key), "rb") as source:
+            await source.seek(start)
+            remaining = length
+            while remaining > 0 and (chunk := await source.read(min(chunk_size, remaining))):
+                remaining -= len(chunk)
+                yield chunk
+
+    async def exists(self, key: str) -> bool:
+        return await self._path(key).is_file()
+
+    async def size(self, key: str) -> int:
+        return (await self._path(key).stat()).st_size
+
+    async def delete(self, key: str) -> None:
+        await self._path(key).unlink(missing_ok=True)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        path = self.root / prefix
+        if path.is_dir():
+            await anyio.to_thread.run_sync(shutil.rmtree, path)
+        else:
+            await self.delete(prefix)
+
+    def _scan(self, prefix: str) -> list[StorageObject]:
+        base = self.root / prefix
+        if not base.is_dir():
+            return []
+        objects = []
+        for path in base.rglob("*"):
+            if path.is_file():
+                stat = path.stat()
+                objects.append(
+                    StorageObject(
+                        key=path.relative_to(self.root).as_posix(),
+                        size=stat.st_size,
+                        modified_at=dt.datetime.fromtimestamp(stat.st_mtime, tz=dt.UTC),
+                    )
+                )
+        return objects
+
+    async def list_keys(self, prefix: str) -> AsyncIterator[StorageObject]:
+        for item in await anyio.to_thread.run_sync(self._scan, prefix):
+            yield item
+
+    async def move(self, source: str, destination: str) -> None:
+        target = self._path(destination)
+        await target.parent.mkdir(parents=True, exist_ok=True)
+        await self._path(source).replace(target)
+
+    async def create_multipart(self, key: str) -> str:
+        # Parts are written in place, so completing the upload needs no copy
+        path = self._path(key)
+        await path.parent.mkdir(parents=True, exist_ok=True)
+        await path.touch()
+        return uuid4().hex
+
+    async def upload_part(
+        self,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        limit: int | None = None,
+    ) -> StoragePart:
+        written = await _write_chunks(self._path(key), chunks, offset=offset, limit=limit)
+        return StoragePart(number=part_number, etag="", size=written)
+
+    async def complete_multipart(self, key: str, upload_id: str, parts: list[StoragePart]) -> None:
+        # Drop any bytes past the last recorded part, e.g. from a discarded retry
+        async with await anyio.open_file(self._path(key), "r+b") as target:
+            await target.truncate(sum(part.size for part in parts))
+
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        await self.delete(key)
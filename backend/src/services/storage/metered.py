@@ -0,0 +1,83 @@
+from collections.abc import AsyncIterator
+
+from backend.src.services.metrics import record_storage_bytes
+from backend.src.services.storage.base import (
+    DEFAULT_CHUNK_SIZE,
+    StorageBackend,
+    StorageObject,
+    StoragePart,
+)
+
+
+async def _count(chunks: AsyncIterator[bytes], operation: str) -> AsyncIterator[bytes]:
+    async for chunk in chunks:
+        record_storage_bytes(operation, len(chunk))
+        yield chunk
+
+
+class MeteredStorageBackend(StorageBackend):
+    """Storage backend wrapper recording the bytes read and written through it
+
+    Args:
+        backend: Backend doing the actual storage
+    """
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+        self.min_part_size = backend.min_part_size
+
+    async def write(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        return await self.backend.write(key, _count(chunks, "write"))
+
+    def read(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        return _count(self.backend.read(key, chunk_size), "read")
+
+    def read_range(
+        self, key: str, start: int, length: int, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        return _count(self.backend.read_range(key, start, length, chunk_size), "read")
+
+    async def exists(self, key: str) -> bool:
+        return await self.backend.exists(key)
+
+    async def size(self, key: str) -> int:
+        return await self.backend.size(key)
+
+    async def delete(self, key: str) -> None:
+        await self.backend.delete(key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        await self.backend.delete_prefix(prefix)
+
+    def list_keys(self, prefix: str) -> AsyncIterator[StorageObject]:
+        return self.backend.list_keys(prefix)
+
+    async def move(self, source: str, destination: str) -> None:
+        await self.backend.move(source, destination)
+
+    async def create_multipart(self, key: str) -> str:
+        return await self.backend.create_multipart(key)
+
+    async def upload_part(
+        self,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        limit: int | None = None,
+    ) -> StoragePart:
+        return await self.backend.upload_part(
+            key, upload_id, part_number, offset, _count(chunks, "write"), limit
+        )
+
+    async def complete_multipart(self, key: str, upload_id: str, parts: list[StoragePart]) -> None:
+        await self.backend.complete_multipart(key, upload_id, parts)
+
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        await self.backend.abort_multipart(key, upload_id)
+
+    async def presigned_url(
+        self, key: str, filename: str, media_type: str, expires_in: int
+    ) -> str | None:
+        return await self.backend.presigned_url(key, filename, media_type, expires_in)
@@ -0,0 +1,267 @@
+import tempfile
+from collections.abc import AsyncIterator
+from functools import partial
+from urllib.parse import quote
+
+import anyio
+import boto3
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+from backend.src.config.settings import AppSettings
+from backend.src.services.storage.base import (
+    DEFAULT_CHUNK_SIZE,
+    StorageBackend,
+    StorageObject,
+    StoragePart,
+)
+
+# S3 rejects non-final multipart parts smaller than 5 MiB
+S3_MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class S3StorageBackend(StorageBackend):
+    """Storage backend for S3 and S3-compatible services such as MinIO
+
+    boto3 is synchronous, so every call runs in a worker thread.
+    """
+
+    min_part_size = S3_MIN_PART_SIZE
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        part_size: int = S3_MIN_PART_SIZE,
+        client=None,
+    ):
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.part_size = max(part_size, S3_MIN_PART_SIZE)
+        self.client = client or boto3.client("s3")
+
+    @classmethod
+    def from_settings(cls, settings: AppSettings) -> "S3StorageBackend":
+        """Create a backend from the S3_* application settings"""
+        client = boto3.client(
+            "s3",
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+            aws_secret_access_key=(
+                settings.S3_SECRET_ACCESS_KEY.get_secret_value()
+                if settings.S3_SECRET_ACCESS_KEY
+                else None
+            ),
+            config=Config(max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS),
+        )
+        return cls(
+            bucket=settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            part_size=settings.UPLOAD_CHUNK_SIZE,
+            client=client,
+        )
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    async def _call(self, method: str, **kwargs):
+        return await anyio.to_thread.run_sync(partial(getattr(self.client, method), **kwargs))
+
+    async def write(self, key: str, chunks: AsyncIterator[bytes]) -> int:
+        buffer = bytearray()
+        upload_id: str | None = None
+        parts: list[StoragePart] = []
+        size = 0
+
+        try:
+            async for chunk in chunks:
+                buffer += chunk
+                size += len(chunk)
+                if len(buffer) >= self.part_size:
+                    if upload_id is None:
+                        upload_id = await self.create_multipart(key)
+                    parts.append(
+                        await self._put_part(
+                            key, upload_id, len(parts) + 1, bytes(buffer), len(buffer)
+                        )
+                    )
+                    buffer = bytearray()
+
+            if upload_id is None:
+                # Small objects go up in a single request
+                await self._call(
+                    "put_object", Bucket=self.bucket, Key=self._key(key), Body=bytes(buffer)
+                )
+                return size
+
+            if buffer:
+                parts.append(
+                    await self._put_part(key, upload_id, len(parts) + 1, bytes(buffer), len(buffer))
+                )
+            await self.complete_multipart(key, upload_id, parts)
+        except BaseException:
+            if upload_id is not None:
+                with anyio.CancelScope(shield=True):
+                    await self.abort_multipart(key, upload_id)
+            raise
+
+        return size
+
+    async def _put_part(
+        self, key: str, upload_id: str, part_number: int, body, size: int
+    ) -> StoragePart:
+        response = await self._call(
+            "upload_part",
+            Bucket=self.bucket,
+            Key=self._key(key),
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body,
+            ContentLength=size,
+        )
+        return StoragePart(number=part_number, etag=response["ETag"], size=size)
+
+    async def read(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        response = await self._call("get_object", Bucket=self.bucket, Key=self._key(key))
+        body = response["Body"]
+        try:
+            while chunk := await anyio.to_thread.run_sync(body.read, chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
+    async def read_range(
+        self, key: str, start: int, length: int, chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        if length <= 0:
+            return
+        response = await self._call(
+            "get_object",
+            Bucket=self.bucket,
+            Key=self._key(key),
+            Range=f"bytes={start}-{start + length - 1}",
+        )
+        body = response["Body"]
+        try:
+            while chunk := await anyio.to_thread.run_sync(body.read, chunk_size):
+                yield chunk
+        finally:
+            body.close()
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await self._call("head_object", Bucket=self.bucket, Key=self._key(key))
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    async def size(self, key: str) -> int:
+        response = await self._call("head_object", Bucket=self.bucket, Key=self._key(key))
+        return response["ContentLength"]
+
+    async def delete(self, key: str) -> None:
+        await self._call("delete_object", Bucket=self.bucket, Key=self._key(key))
+
+    async def delete_prefix(self, prefix: str) -> None:
+        paginator = self.client.get_paginator("list_objects_v2")
+        pages = await anyio.to_thread.run_sync(
+            lambda: list(paginator.paginate(Bucket=self.bucket, Prefix=self._key(prefix)))
+        )
+        for page in pages:
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                await self._call(
+                    "delete_objects", Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True}
+                )
+
+    async def list_keys(self, prefix: str) -> AsyncIterator[StorageObject]:
+        strip = len(self._key("")) if self.prefix else 0
+        token = None
+        while True:
+            kwargs = {"Bucket": self.bucket, "Prefix": self._key(prefix)}
+            if token:
+                kwargs["ContinuationToken"] = token
+            page = await self._call("list_objects_v2", **kwargs)
+            for item in page.get("Contents", []):
+                yield StorageObject(
+                    key=item["Key"][strip:], size=item["Size"], modified_at=item["LastModified"]
+                )
+            token = page.get("NextContinuationToken")
+            if not token:
+                return
+
+    async def move(self, source: str, destination: str) -> None:
+        # Managed copy switches to multipart copy for objects over 5 GB
+        await anyio.to_thread.run_sync(
+            partial(
+                self.client.copy,
+                {"Bucket": self.bucket, "Key": self._key(source)},
+                self.bucket,
+                self._key(destination),
+            )
+        )
+        await self.delete(source)
+
+    async def create_multipart(self, key: str) -> str:
+        response = await self._call(
+            "create_multipart_upload", Bucket=self.bucket, Key=self._key(key)
+        )
+        return response["UploadId"]
+
+    async def upload_part(
+        self,
+        key: str,
+        upload_id: str,
+        part_number: int,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        limit: int | None = None,
+    ) -> StoragePart:
+        # S3 needs the part length up front, so spool it before sending
+        with tempfile.SpooledTemporaryFile(max_size=self.part_size) as spool:
+            written = 0
+            async for chunk in chunks:
+                if limit is not None and written + len(chunk) > limit:
+                    raise ValueError("Upload exceeds the declared file size")
+                await anyio.to_thread.run_sync(spool.write, chunk)
+                written += len(chunk)
+            spool.seek(0)
+            return await self._put_part(key, upload_id, part_number, spool, written)
+
+    async def complete_multipart(self, key: str, upload_id: str, parts: list[StoragePart]) -> None:
+        await self._call(
+            "complete_multipart_upload",
+            Bucket=self.bucket,
+            Key=self._key(key),
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": [{"PartNumber": part.number, "ETag": part.etag} for part in parts]
+            },
+        )
+
+    async def abort_multipart(self, key: str, upload_id: str) -> None:
+        try:
+            await self._call(
+                "abort_multipart_upload", Bucket=self.bucket, Key=self._key(key), UploadId=upload_id
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] != "NoSuchUpload":
+                raise
+
+    async def presigned_url(
+        self, key: str, filename: str, media_type: str, expires_in: int
+    ) -> str | None:
+        return await self._call(
+            "generate_presigned_url",
+            ClientMethod="get_object",
+            Params={
+                "Bucket": self.bucket,
+                "Key": self._key(key),
+                "ResponseContentType": media_type,
+                "ResponseContentDisposition": f"attachment; filename*=utf-8''{quote(filename)}",
+            },
+            ExpiresIn=expires_in,
+        )
@@ -0,0 +1,90 @@
+import io
+import re
+import zipfile
+from xml.etree import ElementTree
+
+import pypdfium2 as pdfium
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+TEXT_MEDIA_TYPES = {"text/plain", "text/markdown", "text/csv"}
+
+WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# Control characters have no business in a search index, and Postgres text cannot hold NUL
+CONTROL_CHARACTERS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+
+
+def _normalize(media_type: str | None) -> str:
+    return (media_type or "").split(";")[0].strip().lower()
+
+
+def can_extract_text(media_type: str | None) -> bool:
+    """Check whether text can be extracted from content of a media type
+
+    Args:
+        media_type: Content type of the file, if known
+
+    Returns:
+        bool: True for PDF, DOCX and plain text files
+    """
+    media_type = _normalize(media_type)
+    return media_type in TEXT_MEDIA_TYPES or media_type in {"application/pdf", DOCX_MEDIA_TYPE}
+
+
+def _pdf_text(content: bytes, max_chars: int) -> str:
+    pdf = pdfium.PdfDocument(content)
+    try:
+        parts: list[str] = []
+        length = 0
+        for page in pdf:
+            text = page.get_textpage().get_text_bounded()
+            parts.append(text)
+            length += len(text)
+            if length >= max_chars:
+                break
+        return "\n".join(parts)
+    finally:
+        pdf.close()
+
+
+def _docx_text(content: bytes, max_chars: int) -> str:
+    parts: list[str] = []
+    length = 0
+    with zipfile.ZipFile(io.BytesIO(content)) as archive:
+        with archive.open("word/document.xml") as document:
+            # Stream the XML so a huge document is not loaded as a whole tree
+            for _, element in ElementTree.iterparse(document):
+                if element.tag == f"{WORD_NAMESPACE}t" and element.text:
+                    parts.append(element.text)
+                    length += len(element.text)
+                elif element.tag == f"{WORD_NAMESPACE}p":
+                    parts.append("\n")
+                    element.clear()
+                if length >= max_chars:
+                    break
+    return "".join(parts)
+
+
+def extract_text(content: bytes, media_type: str | None, max_chars: int) -> str:
+    """Extract the text of a PDF, DOCX or plain text file
+
+    This is CPU-bound and runs in the worker processes of the process pool.
+
+    Args:
+        content: Content of the file
+        media_type: Content type of the file
+        max_chars: Maximum number of characters returned
+
+    Returns:
+        str: Text of the file, truncated to `max_chars`
+    """
+    media_type = _normalize(media_type)
+    if media_type == "application/pdf":
+        text = _pdf_text(content, max_chars)
+    elif media_type == DOCX_MEDIA_TYPE:
+        text = _docx_text(content, max_chars)
+    elif media_type in TEXT_MEDIA_TYPES:
+        # A character takes at most 4 bytes in UTF-8
+        text = content[: max_chars * 4].decode("utf-8", errors="replace")
+    else:
+        return ""
+    return CONTROL_CHARACTERS.sub(" ", text[:max_chars])
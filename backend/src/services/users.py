@@ -0,0 +1,46 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.models.user import User
+from backend.src.schemas.auth import GoogleLoginResponse
+from backend.src.types.date import utc_now
+
+
+async def upsert_google_user(session: AsyncSession, profile: GoogleLoginResponse) -> User:
+    """Create the user behind a Google account, or refresh their profile, in one statement
+
+    An `INSERT ... ON CONFLICT (google_user_id) DO UPDATE ... RETURNING` cannot race with a
+    concurrent first login of the same account, and keeps the email, name and picture in step
+    with Google. The change is not committed.
+
+    Args:
+        session: Database session
+        profile: Claims of the verified Google ID token
+
+    Returns:
+        User: The created or updated user
+    """
+    insert = postgresql.insert if session.bind.dialect.name == "postgresql" else sqlite.insert
+    now = utc_now()
+    statement = insert(User).values(
+        email=profile.email,
+        full_name=profile.name,
+        google_user_id=profile.user_id,
+        google_picture=profile.picture,
+        created_at=now,
+        updated_at=now,
+    )
+    statement = (
+        statement.on_conflict_do_update(
+            index_elements=[User.google_user_id],
+            set_={
+                "email": statement.excluded.email,
+                "full_name": statement.excluded.full_name,
+                "google_picture": statement.excluded.google_picture,
+                "updated_at": statement.excluded.updated_at,
+            },
+        )
+        .returning(User)
+        .execution_options(populate_existing=True)
+    )
+    return (await session.exec(statement)).scalar_one()
@@ -0,0 +1,195 @@
+from collections import Counter
+
+import anyio
+from fastapi import BackgroundTasks
+from sqlalchemy import exists
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import delete, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.config.settings import app_settings
+from backend.src.models.file import File
+from backend.src.models.upload_session import UploadSession
+from backend.src.models.workspace import Workspace, WorkspaceMember
+from backend.src.models.workspace_deletion import WorkspaceDeletion
+from backend.src.services.blobs import release_blob
+from backend.src.services.response_cache import invalidate
+from backend.src.services.storage import StorageBackend
+from backend.src.types.date import utc_now
+
+
+async def start_workspace_deletion(
+    session: AsyncSession, workspace: Workspace, user_id: int
+) -> WorkspaceDeletion:
+    """Delete a workspace for its users, leaving the removal of its files to a background job
+
+    The workspace is marked as deleted and its memberships are dropped, which takes a couple
+    of statements however many files the workspace holds.
+
+    Args:
+        session: Database session
+        workspace: Workspace to delete
+        user_id: Id of the user deleting the workspace
+
+    Returns:
+        WorkspaceDeletion: Committed deletion, tracking the progress of the background job
+    """
+    workspace.deleted_at = utc_now()
+    session.add(workspace)
+    member_ids = (
+        (
+            await session.exec(
+                delete(WorkspaceMember)
+                .where(WorkspaceMember.workspace_id == workspace.id)
+                .returning(WorkspaceMember.user_id)
+            )
+        )
+        .scalars()
+        .all()
+    )
+    deletion = WorkspaceDeletion(
+        workspace_id=workspace.id, requested_by=user_id, total_files=workspace.file_count
+    )
+    session.add(deletion)
+    await session.commit()
+    await session.refresh(deletion)
+    await invalidate([deletion.workspace_id], member_ids)
+    return deletion
+
+
+async def _purge_file_batch(
+    engine: AsyncEngine, deletion_id: str, workspace_id: int, batch_size: int
+) -> int:
+    async with AsyncSession(engine) as session:
+        batch = select(File.id).where(File.workspace_id == workspace_id).limit(batch_size)
+        # Only the rows this statement removed are released, so two jobs purging the same
+        # workspace cannot release a blob reference twice
+        deleted = (
+            await session.exec(delete(File).where(File.id.in_(batch)).returning(File.blob_digest))
+        ).all()
+        if not deleted:
+            return 0
+
+        for digest, count in Counter(digest for (digest,) in deleted if digest).items():
+            await release_blob(session, digest, count)
+        await session.exec(
+            update(WorkspaceDeletion)
+            .where(WorkspaceDeletion.id == deletion_id)
+            .values(
+                deleted_files=WorkspaceDeletion.deleted_files + len(deleted),
+                updated_at=utc_now(),
+            )
+        )
+        await session.commit()
+        return len(deleted)
+
+
+async def _abort_uploads(engine: AsyncEngine, storage: StorageBackend, workspace_id: int) -> None:
+    async with AsyncSession(engine) as session:
+        uploads = (
+            await session.exec(
+                select(UploadSession).where(UploadSession.workspace_id == workspace_id)
+            )
+        ).all()
+    for upload in uploads:
+        await storage.abort_multipart(upload.storage_key, upload.storage_upload_id)
+
+
+async def _finish_deletion(engine: AsyncEngine, deletion_id: str, workspace_id: int) -> bool:
+    async with AsyncSession(engine) as session:
+        # The workspace only goes once no file is left, so the blob references of files added
+        # while the batches ran are released in another round. Rows still pointing at the
+        # workspace, like memberships and import jobs, go with the database cascades
+        removed = (
+            await session.exec(
+                delete(Workspace).where(
+                    Workspace.id == workspace_id,
+                    ~exists().where(File.workspace_id == workspace_id),
+                )
+            )
+        ).rowcount
+        if not removed and await session.get(Workspace, workspace_id) is not None:
+            await session.rollback()
+            return False
+
+        now = utc_now()
+        await session.exec(
+            update(WorkspaceDeletion)
+            .where(WorkspaceDeletion.id == deletion_id)
+            .values(updated_at=now, finished_at=now)
+        )
+        await session.commit()
+        return True
+
+
+async def purge_workspace(
+    engine: AsyncEngine,
+    storage: StorageBackend,
+    deletion_id: str,
+    batch_size: int,
+    pause: float,
+) -> bool:
+    """Remove the files, pending uploads and storage of a deleted workspace, then the workspace
+
+    Files are deleted in batches with a pause in between, releasing their blob references as
+    they go; the content itself is removed by blob garbage collection once no other workspace
+    uses it. Progress is recorded on the deletion after every batch, and a purge that stops
+    halfway is resumed by the next run.
+
+    Args:
+        engine: Database engine
+        storage: Storage backend holding the content
+        deletion_id: Id of the workspace deletion
+        batch_size: Maximum number of files deleted per transaction
+        pause: Seconds to wait between two batches
+
+    Returns:
+        bool: True if the workspace is gone, False if the deletion does not exist
+    """
+    async with AsyncSession(engine) as session:
+        deletion = await session.get(WorkspaceDeletion, deletion_id)
+        if deletion is None:
+            return False
+        workspace_id, finished = deletion.workspace_id, deletion.finished_at is not None
+    if finished:
+        return True
+
+    while True:
+        while await _purge_file_batch(engine, deletion_id, workspace_id, batch_size):
+            await anyio.sleep(pause)
+
+        await _abort_uploads(engine, storage, workspace_id)
+        # Remove files stored before the blob store existed
+        try:
+            await storage.delete_prefix(f"{workspace_id}/")
+        except Exception as e:
+            print(f"Warning: Failed to delete workspace directory: {str(e)}")
+
+        if await _finish_deletion(engine, deletion_id, workspace_id):
+            return True
+
+
+def schedule_purge(
+    background_tasks: BackgroundTasks,
+    engine: AsyncEngine,
+    storage: StorageBackend,
+    deletion: WorkspaceDeletion,
+) -> None:
+    """Start purging a deleted workspace once the response is sent
+
+    Should the process stop before the purge is done, the maintenance job picks it up.
+
+    Args:
+        background_tasks: Background tasks of the request
+        engine: Database engine
+        storage: Storage backend holding the content
+        deletion: Deletion that was just started
+    """
+    background_tasks.add_task(
+        purge_workspace,
+        engine,
+        storage,
+        deletion.id,
+        app_settings.MAINTENANCE_BATCH_SIZE,
+        app_settings.MAINTENANCE_BATCH_PAUSE_SECONDS,
+    )
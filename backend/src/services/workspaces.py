@@ -0,0 +1,136 @@
+from sqlalchemy import func, or_
+from sqlalchemy.orm import selectinload
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.config.settings import app_settings
+from backend.src.models.workspace import Workspace, WorkspaceMember
+from backend.src.schemas.workspace import WorkspaceMemberResponse, WorkspaceResponse
+
+# Loads every member and their user in one extra query, however many workspaces are selected
+WITH_MEMBERS = selectinload(Workspace.members).joinedload(WorkspaceMember.user)
+
+
+class QuotaExceededError(Exception):
+    """Storing more files would take a workspace over its storage quota"""
+
+
+def storage_quota(workspace: Workspace) -> int | None:
+    """Get the storage quota of a workspace
+
+    Args:
+        workspace: Workspace to check
+
+    Returns:
+        int | None: Quota in bytes, or None if the workspace is unlimited
+    """
+    if workspace.storage_quota_bytes is not None:
+        return workspace.storage_quota_bytes
+    return app_settings.WORKSPACE_STORAGE_QUOTA_BYTES
+
+
+def _quota_column():
+    default = app_settings.WORKSPACE_STORAGE_QUOTA_BYTES
+    if default is None:
+        return Workspace.storage_quota_bytes
+    return func.coalesce(Workspace.storage_quota_bytes, default)
+
+
+async def record_usage(session: AsyncSession, workspace_id: int, files: int, size: int) -> None:
+    """Add files to, or remove them from, the usage counters of a workspace
+
+    The counters are changed with a single conditional UPDATE, so concurrent uploads cannot
+    exceed the quota together and the quota is checked without scanning the files table. The
+    change is not committed, so it lands in the same transaction as the `File` rows.
+
+    Args:
+        session: Database session
+        workspace_id: Workspace the files belong to
+        files: Number of files added, negative when removing files
+        size: Number of bytes added, negative when removing files
+
+    Raises:
+        QuotaExceededError: If adding the bytes would take the workspace over its quota
+    """
+    statement = (
+        update(Workspace)
+        .where(Workspace.id == workspace_id)
+        .values(file_count=Workspace.file_count + files, total_bytes=Workspace.total_bytes + size)
+    )
+    if size > 0:
+        quota = _quota_column()
+        statement = statement.where(or_(quota.is_(None), Workspace.total_bytes + size <= quota))
+
+    if not (await session.exec(statement)).rowcount and size > 0:
+        raise QuotaExceededError("Storage quota exceeded")
+
+
+async def check_quota(session: AsyncSession, workspace_id: int, size: int) -> None:
+    """Check up front that a workspace has room for more bytes
+
+    This only spares clients from uploading content that would be refused; `record_usage`
+    enforces the quota when the files are added.
+
+    Args:
+        session: Database session
+        workspace_id: Workspace the bytes would be added to
+        size: Number of bytes to add
+
+    Raises:
+        QuotaExceededError: If adding the bytes would take the workspace over its quota
+    """
+    workspace = await session.get(Workspace, workspace_id)
+    quota = storage_quota(workspace) if workspace else None
+    if quota is not None and workspace.total_bytes + size > quota:
+        raise QuotaExceededError("Storage quota exceeded")
+
+
+async def get_workspace_with_members(session: AsyncSession, workspace_id: int) -> Workspace | None:
+    """Load a workspace together with its members and their users
+
+    Args:
+        session: Database session
+        workspace_id: Workspace to load
+
+    Returns:
+        Workspace | None: The workspace, or None if it does not exist
+    """
+    statement = (
+        select(Workspace)
+        .where(Workspace.id == workspace_id)
+        .options(WITH_MEMBERS)
+        .execution_options(populate_existing=True)
+    )
+    return (await session.exec(statement)).first()
+
+
+def to_workspace_response(workspace: Workspace) -> WorkspaceResponse:
+    """Build the response of a workspace loaded with `WITH_MEMBERS`
+
+    Args:
+        workspace: Workspace with its members and their users loaded
+
+    Returns:
+        WorkspaceResponse: Workspace with its members
+    """
+    return WorkspaceResponse(
+        id=workspace.id,
+        name=workspace.name,
+        description=workspace.description,
+        created_at=workspace.created_at,
+        updated_at=workspace.updated_at,
+        created_by=workspace.created_by,
+        file_count=workspace.file_count,
+        total_bytes=workspace.total_bytes,
+        storage_quota_bytes=storage_quota(workspace),
+        members=[
+            WorkspaceMemberResponse(
+                id=member.user.id,
+                email=member.user.email,
+                name=member.user.full_name,
+                picture=member.user.google_picture,
+                role=member.role,
+            )
+            for member in workspace.members
+        ],
+    )
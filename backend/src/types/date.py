@@ -1,6 +1,16 @@
 import datetime as dt
 
+from sqlalchemy import DateTime
+
+# Column type of every timestamp: values are timezone-aware, as returned by `utc_now`
+UTCDateTime = DateTime(timezone=True)
+
 
 def utc_now() -> dt.datetime:
     """Get the current UTC datetime"""
     return dt.datetime.now(dt.UTC)
+
+
+def as_utc(value: dt.datetime) -> dt.datetime:
+    """Attach the UTC timezone to naive datetimes, as returned by SQLite"""
+    return value if value.tzinfo else value.replace(tzinfo=dt.UTC)
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class ImportStatusEnum(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
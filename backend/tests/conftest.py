@@ -1,35 +1,202 @@
-from collections.abc import Generator
+from collections.abc import Callable, Generator
+from contextlib import AbstractContextManager, contextmanager
+from datetime import timedelta
+from pathlib import Path
 
+import jwt
 import pytest
+from fastapi import Request
 from fastapi.testclient import TestClient
+from sqlalchemy import NullPool, event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, SQLModel, create_engine
-from sqlmodel.pool import StaticPool
 
+from backend.src.api.auth.cache import revoked_tokens, token_cache
+from backend.src.api.auth.permissions import membership_cache
 from backend.src.asgi import app
-from backend.src.database.session import get_session
+from backend.src.config.settings import app_settings
+from backend.src.database.session import get_read_session, get_session, open_session
+from backend.src.models.user import User
+from backend.src.models.workspace import Workspace, WorkspaceMember
+from backend.src.services.response_cache import get_response_cache
+from backend.src.services.storage import get_storage
+from backend.src.types.date import utc_now
+from backend.src.types.roles import RoleEnum
+
+
+@pytest.fixture(name="database_path")
+def database_path_fixture(tmp_path: Path) -> Path:
+    """SQLite database file shared by the test session and the app under test."""
+    return tmp_path / "test.db"
 
 
 @pytest.fixture(name="session")
-def session_fixture() -> Generator[Session]:
-    """Create a fresh database session for each test."""
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-    )
+def session_fixture(database_path: Path) -> Generator[Session]:
+    """Create a fresh database and a synchronous session to arrange and inspect it."""
+    engine = create_engine(f"sqlite:///{database_path}")
     SQLModel.metadata.create_all(engine)
     with Session(engine) as session:
         yield session
+    engine.dispose()
+
+
+@pytest.fixture(name="async_engine")
+def async_engine_fixture(session: Session, database_path: Path) -> Generator[AsyncEngine]:
+    """Async engine the app under test runs its queries on.
+
+    Connections are not pooled, since every TestClient request runs on its own event loop.
+    Foreign keys are enforced, so ON DELETE cascades apply like on Postgres.
+    """
+    engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def enable_foreign_keys(connection, record) -> None:
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    yield engine
+    engine.sync_engine.dispose()
 
 
 @pytest.fixture(name="client")
-def client_fixture(session: Session) -> Generator[TestClient]:
+def client_fixture(async_engine: AsyncEngine) -> Generator[TestClient]:
     """Create a test client with a test database session."""
 
-    def get_session_override():
-        return session
+    async def get_session_override(request: Request):
+        async with open_session(async_engine, None, request.state) as session:
+            yield session
+
+    async def get_read_session_override(request: Request):
+        async with open_session(async_engine, None, request.state, read_only=True) as session:
+            yield session
 
     app.dependency_overrides[get_session] = get_session_override
+    app.dependency_overrides[get_read_session] = get_read_session_override
     client = TestClient(app)
     yield client
     app.dependency_overrides.clear()
+
+
+@pytest.fixture(name="count_queries")
+def count_queries_fixture(
+    async_engine: AsyncEngine,
+) -> Callable[[], AbstractContextManager[list[str]]]:
+    """Record the SQL statements the app executes inside a `with count_queries() as queries:`."""
+
+    @contextmanager
+    def count_queries() -> Generator[list[str]]:
+        statements: list[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany) -> None:
+            statements.append(statement)
+
+        engine = async_engine.sync_engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return count_queries
+
+
+@pytest.fixture(name="collect_pages")
+def collect_pages_fixture(client: TestClient) -> Callable[..., list[list]]:
+    """Fetch a paginated endpoint, following next-page cursors until the last page."""
+
+    def collect_pages(url: str, headers: dict[str, str], **params) -> list[list]:
+        pages = []
+        cursor = None
+        while True:
+            query = {**params, **({"cursor": cursor} if cursor else {})}
+            response = client.get(url, params=query, headers=headers)
+            assert response.status_code == 200
+            pages.append(response.json())
+            cursor = response.headers.get("x-next-cursor")
+            if not cursor:
+                return pages
+
+    return collect_pages
+
+
+@pytest.fixture(name="storage_path", autouse=True)
+def storage_path_fixture(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Generator[Path]:
+    """Point file storage at a temporary directory for each test."""
+    storage_path = tmp_path / "storage"
+    monkeypatch.setattr(app_settings, "STORAGE_BASE_PATH", storage_path)
+    get_storage.cache_clear()
+    yield storage_path
+    get_storage.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_auth_caches() -> Generator[None]:
+    """Keep cached tokens, revocations and memberships from leaking between test databases."""
+    token_cache.clear()
+    revoked_tokens.clear()
+    membership_cache.clear()
+    yield
+    token_cache.clear()
+    revoked_tokens.clear()
+    membership_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache() -> Generator[None]:
+    """Give each test an empty response cache, since ids are reused between test databases."""
+    get_response_cache.cache_clear()
+    yield
+    get_response_cache.cache_clear()
+
+
+@pytest.fixture(name="user")
+def user_fixture(session: Session) -> User:
+    """Create a user to authenticate requests with."""
+    user = User(
+        email="owner@example.com",
+        full_name="Owner User",
+        google_user_id="google_owner",
+    )
+    session.add(user)
+    session.commit()
+    session.refresh(user)
+    return user
+
+
+def auth_headers_for(user: User) -> dict[str, str]:
+    """Build authorization headers carrying a valid access token for a user."""
+    token = jwt.encode(
+        {"sub": str(user.id), "email": user.email, "exp": utc_now() + timedelta(minutes=5)},
+        app_settings.SECRET_KEY.get_secret_value(),
+        algorithm=app_settings.ALGORITHM,
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(name="auth_headers")
+def auth_headers_fixture(user: User) -> dict[str, str]:
+    """Authorization headers for the test user."""
+    return auth_headers_for(user)
+
+
+@pytest.fixture(name="outsider_headers")
+def outsider_headers_fixture(session: Session) -> dict[str, str]:
+    """Authorization headers for a user who is not a member of any workspace."""
+    outsider = User(email="outsider@example.com", full_name="Outsider", google_user_id="google_out")
+    session.add(outsider)
+    session.commit()
+    session.refresh(outsider)
+    return auth_headers_for(outsider)
+
+
+@pytest.fixture(name="workspace")
+def workspace_fixture(session: Session, user: User) -> Workspace:
+    """Create a workspace with the test user as admin."""
+    workspace = Workspace(name="Deal Room", created_by=user.id)
+    session.add(workspace)
+    session.commit()
+    session.refresh(workspace)
+    session.add(WorkspaceMember(workspace_id=workspace.id, user_id=user.id, role=RoleEnum.ADMIN))
+    session.commit()
+    return workspace
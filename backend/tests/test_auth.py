@@ -1,57 +1,100 @@
+import hashlib
 from collections.abc import Generator
-from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import timedelta
 
+import httpx
+import jwt
 import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
 from fastapi import status
 from fastapi.testclient import TestClient
+from jwt.algorithms import RSAAlgorithm
 from sqlmodel import Session, select
 
+from backend.src.api.auth import google
+from backend.src.api.auth.cache import revoked_tokens, token_hash
+from backend.src.api.auth.google import GoogleKeySet, cache_lifetime
+from backend.src.api.routes.auth import get_google_keys
+from backend.src.asgi import app
 from backend.src.models.token_blacklist import TokenBlacklist
 from backend.src.models.user import User
-
-
-@pytest.fixture(autouse=True)
-def mock_httpx_client() -> Generator[tuple[MagicMock | AsyncMock, MagicMock]]:
-    """Automatically mock httpx.AsyncClient for all tests."""
-    with patch("httpx.AsyncClient") as mock_client_class:
-        # Default success response
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_response.json.return_value = {
+from backend.src.types.date import utc_now
+
+
+class KeyServer:
+    """Local stand-in for Google's key server, signing ID tokens with its own RSA keys."""
+
+    def __init__(self) -> None:
+        self.private_keys: dict[str, rsa.RSAPrivateKey] = {}
+        self.requests = 0
+        self.rotate()
+
+    def rotate(self) -> str:
+        """Publish a new signing key, keeping the old ones, and return its key id."""
+        key_id = f"key-{len(self.private_keys)}"
+        self.private_keys[key_id] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self.key_id = key_id
+        return key_id
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        keys = [
+            {
+                **RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True),
+                "kid": key_id,
+                "alg": "RS256",
+                "use": "sig",
+            }
+            for key_id, private_key in self.private_keys.items()
+        ]
+        return httpx.Response(
+            200, json={"keys": keys}, headers={"Cache-Control": "public, max-age=3600"}
+        )
+
+    def id_token(self, key_id: str | None = None, **claims) -> str:
+        """Sign an ID token for the test client, with default claims overridden by `claims`."""
+        key_id = key_id or self.key_id
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": "test_google_client_id",
             "sub": "default_user",
             "email": "default@example.com",
-            "email_verified": "true",
+            "email_verified": True,
             "name": "Default User",
-            "aud": "test_google_client_id",
+            "iat": utc_now(),
+            "exp": utc_now() + timedelta(hours=1),
+            **claims,
         }
+        return jwt.encode(
+            payload, self.private_keys[key_id], algorithm="RS256", headers={"kid": key_id}
+        )
 
-        # Mock the async context manager
-        mock_client = AsyncMock()
-        mock_client.get = AsyncMock(return_value=mock_response)
-        mock_client_class.return_value.__aenter__.return_value = mock_client
 
-        yield mock_client_class, mock_response
+@pytest.fixture(name="key_server", autouse=True)
+def key_server_fixture() -> Generator[KeyServer]:
+    """Verify Google ID tokens against a local key server instead of Google's."""
+    key_server = KeyServer()
+    http = httpx.AsyncClient(transport=httpx.MockTransport(key_server.handle))
+    keys = GoogleKeySet(http, "https://keys.example.com/certs")
+    app.dependency_overrides[get_google_keys] = lambda: keys
+    yield key_server
+    app.dependency_overrides.pop(get_google_keys, None)
 
 
 async def test_google_login_success_new_user(
-    mock_httpx_client, client: TestClient, session: Session
+    key_server: KeyServer, client: TestClient, session: Session
 ) -> None:
     """Test successful login with a new Google user."""
-    _, mock_response = mock_httpx_client
-
-    # Update mock response for this test
-    mock_response.json.return_value = {
-        "sub": "google_user_123",
-        "email": "test@example.com",
-        "email_verified": "true",
-        "name": "Test User",
-        "picture": "https://example.com/photo.jpg",
-        "aud": "test_google_client_id",
-    }
+    credential = key_server.id_token(
+        sub="google_user_123",
+        email="test@example.com",
+        name="Test User",
+        picture="https://example.com/photo.jpg",
+    )
 
     response = client.post(
         "/api/auth/google",
-        json={"credential": "fake_google_token"},
+        json={"credential": credential},
     )
 
     assert response.status_code == status.HTTP_200_OK
@@ -67,11 +110,9 @@ async def test_google_login_success_new_user(
 
 
 async def test_google_login_success_existing_user(
-    mock_httpx_client, client: TestClient, session: Session
+    key_server: KeyServer, client: TestClient, session: Session, count_queries
 ) -> None:
-    """Test successful login with an existing Google user."""
-    _, mock_response = mock_httpx_client
-
+    """Test that logging in again updates the user's profile in a single statement."""
     existing_user = User(
         email="existing@example.com",
         full_name="Existing User",
@@ -82,33 +123,34 @@ async def test_google_login_success_existing_user(
     session.commit()
     session.refresh(existing_user)
 
-    mock_response.json.return_value = {
-        "sub": "google_user_456",
-        "email": "existing@example.com",
-        "email_verified": "true",
-        "name": "Existing User",
-        "picture": "https://example.com/old.jpg",
-        "aud": "test_google_client_id",
-    }
-
-    response = client.post(
-        "/api/auth/google",
-        json={"credential": "fake_google_token"},
+    credential = key_server.id_token(
+        sub="google_user_456",
+        email="renamed@example.com",
+        name="Renamed User",
+        picture="https://example.com/new.jpg",
     )
 
+    with count_queries() as queries:
+        response = client.post(
+            "/api/auth/google",
+            json={"credential": credential},
+        )
+
     assert response.status_code == status.HTTP_200_OK
     data = response.json()
     assert "token" in data
-    assert data["user"]["email"] == "existing@example.com"
-
+    assert data["user"]["id"] == existing_user.id
+    assert data["user"]["email"] == "renamed@example.com"
+    assert len(queries) == 1
 
-async def test_google_login_invalid_token(mock_httpx_client, client: TestClient) -> None:
-    """Test login with invalid Google token."""
-    _, mock_response = mock_httpx_client
+    session.refresh(existing_user)
+    assert existing_user.full_name == "Renamed User"
+    assert existing_user.google_picture == "https://example.com/new.jpg"
+    assert len(session.exec(select(User)).all()) == 1
 
-    # Update mock to return error
-    mock_response.status_code = 400
 
+async def test_google_login_invalid_token(client: TestClient) -> None:
+    """Test login with invalid Google token."""
     response = client.post(
         "/api/auth/google",
         json={"credential": "invalid_token"},
@@ -118,23 +160,73 @@ async def test_google_login_invalid_token(mock_httpx_client, client: TestClient)
     assert "Invalid Google token" in response.json()["detail"]
 
 
-async def test_get_me_success(mock_httpx_client, client: TestClient, session: Session) -> None:
+def test_google_login_rejects_forged_tokens(key_server: KeyServer, client: TestClient) -> None:
+    """Test that tokens for another client, expired or signed by an unknown key are rejected."""
+    forger = KeyServer()
+    credentials = [
+        key_server.id_token(aud="another_client_id"),
+        key_server.id_token(iss="https://evil.example.com"),
+        key_server.id_token(exp=utc_now() - timedelta(hours=1)),
+        forger.id_token(),
+    ]
+
+    for credential in credentials:
+        response = client.post("/api/auth/google", json={"credential": credential})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response.json()["detail"] == "Invalid Google token"
+
+
+def test_google_keys_fetched_once(
+    key_server: KeyServer, client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that logins share the cached keys and a rotated key is fetched once."""
+    for index in range(3):
+        credential = key_server.id_token(sub=f"user_{index}", email=f"user{index}@example.com")
+        response = client.post("/api/auth/google", json={"credential": credential})
+        assert response.status_code == status.HTTP_200_OK
+    assert key_server.requests == 1
+
+    # Pretend the keys were fetched long ago, as they would be by the time Google rotates them
+    monkeypatch.setattr(google, "MIN_REFETCH_SECONDS", 0)
+    key_server.rotate()
+    response = client.post("/api/auth/google", json={"credential": key_server.id_token()})
+    assert response.status_code == status.HTTP_200_OK
+    assert key_server.requests == 2
+
+    # Unknown key ids do not reach the key server again right away
+    monkeypatch.undo()
+    response = client.post("/api/auth/google", json={"credential": KeyServer().id_token()})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert key_server.requests == 2
+
+
+@pytest.mark.parametrize(
+    ("headers", "expected"),
+    [
+        ({"Cache-Control": "public, max-age=21600, must-revalidate"}, 21600),
+        ({"Cache-Control": "public, max-age=21600", "Age": "600"}, 21000),
+        ({"Cache-Control": "no-store"}, 0),
+        ({}, 3600),
+    ],
+)
+def test_cache_lifetime(headers: dict[str, str], expected: float) -> None:
+    """Test that the key cache follows the Cache-Control and Age headers."""
+    assert cache_lifetime(httpx.Headers(headers)) == expected
+
+
+async def test_get_me_success(key_server: KeyServer, client: TestClient, session: Session) -> None:
     """Test successfully getting current user info."""
-    _, mock_response = mock_httpx_client
-
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
-        "sub": "google_user_789",
-        "email": "me@example.com",
-        "email_verified": "true",
-        "name": "Me User",
-        "picture": "https://example.com/me.jpg",
-        "aud": "test_google_client_id",
-    }
+    credential = key_server.id_token(
+        sub="google_user_789",
+        email="me@example.com",
+        name="Me User",
+        picture="https://example.com/me.jpg",
+    )
 
     login_response = client.post(
         "/api/auth/google",
-        json={"credential": "fake_token"},
+        json={"credential": credential},
     )
     token = login_response.json()["token"]
 
@@ -155,23 +247,18 @@ def test_get_me_unauthorized(client: TestClient) -> None:
     assert response.status_code == status.HTTP_403_FORBIDDEN
 
 
-async def test_logout_success(mock_httpx_client, client: TestClient, session: Session) -> None:
+async def test_logout_success(key_server: KeyServer, client: TestClient, session: Session) -> None:
     """Test successful logout."""
-    _, mock_response = mock_httpx_client
-
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
-        "sub": "google_user_999",
-        "email": "logout@example.com",
-        "email_verified": "true",
-        "name": "Logout User",
-        "picture": "https://example.com/logout.jpg",
-        "aud": "test_google_client_id",
-    }
+    credential = key_server.id_token(
+        sub="google_user_999",
+        email="logout@example.com",
+        name="Logout User",
+        picture="https://example.com/logout.jpg",
+    )
 
     login_response = client.post(
         "/api/auth/google",
-        json={"credential": "fake_token"},
+        json={"credential": credential},
     )
     token = login_response.json()["token"]
 
@@ -182,30 +269,29 @@ async def test_logout_success(mock_httpx_client, client: TestClient, session: Se
 
     assert response.status_code == status.HTTP_200_OK
 
-    blacklisted = session.exec(select(TokenBlacklist).where(TokenBlacklist.token == token)).first()
+    payload = jwt.decode(token, options={"verify_signature": False})
+    jti_hash = hashlib.sha256(payload["jti"].encode()).hexdigest()
+    blacklisted = session.exec(
+        select(TokenBlacklist).where(TokenBlacklist.jti_hash == jti_hash)
+    ).first()
     assert blacklisted is not None
+    assert blacklisted.expires_bucket == blacklisted.expires_at.date()
 
 
 async def test_logout_token_becomes_invalid(
-    mock_httpx_client, client: TestClient, session: Session
+    key_server: KeyServer, client: TestClient, session: Session
 ) -> None:
     """Test that blacklisted token cannot be used."""
-    _, mock_response = mock_httpx_client
-
-    # Update mock response for this test
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
-        "sub": "google_user_111",
-        "email": "blacklist@example.com",
-        "email_verified": "true",
-        "name": "Blacklist User",
-        "picture": "https://example.com/blacklist.jpg",
-        "aud": "test_google_client_id",
-    }
+    credential = key_server.id_token(
+        sub="google_user_111",
+        email="blacklist@example.com",
+        name="Blacklist User",
+        picture="https://example.com/blacklist.jpg",
+    )
 
     login_response = client.post(
         "/api/auth/google",
-        json={"credential": "fake_token"},
+        json={"credential": credential},
     )
     token = login_response.json()["token"]
 
@@ -227,3 +313,47 @@ def test_logout_unauthorized(client: TestClient) -> None:
     """Test logout without authentication."""
     response = client.post("/api/auth/logout")
     assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_cached_token_skips_database(
+    client: TestClient, user: User, auth_headers: dict[str, str], count_queries
+) -> None:
+    """Test that a verified token is served from the cache without database queries."""
+    assert client.get("/api/auth/me", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    with count_queries() as queries:
+        response = client.get("/api/auth/me", headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["email"] == user.email
+    assert queries == []
+
+
+def test_revocation_from_another_process(
+    client: TestClient,
+    session: Session,
+    user: User,
+    auth_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that blacklist rows written elsewhere reach the in-memory filter on refresh."""
+    # Refresh on every request instead of waiting for the interval
+    monkeypatch.setattr(revoked_tokens, "refresh_interval", 0)
+    assert client.get("/api/auth/me", headers=auth_headers).status_code == status.HTTP_200_OK
+
+    token = auth_headers["Authorization"].removeprefix("Bearer ")
+    expires_at = utc_now() + timedelta(minutes=5)
+    session.add(
+        TokenBlacklist(
+            jti_hash=token_hash(token),
+            user_id=user.id,
+            expires_at=expires_at,
+            expires_bucket=expires_at.date(),
+        )
+    )
+    session.commit()
+
+    response = client.get("/api/auth/me", headers=auth_headers)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert token_hash(token) in revoked_tokens
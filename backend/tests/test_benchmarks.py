@@ -0,0 +1,56 @@
+from collections.abc import Generator
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.benchmarks.baseline import compare
+from backend.benchmarks.runner import SCENARIOS, app_client, load_context, run_scenario
+from backend.benchmarks.seed import Scale, seed
+from backend.src.asgi import app
+from backend.src.database.instrumentation import instrument_engine
+from backend.src.services.storage import get_storage
+
+
+@pytest.fixture(name="benchmark_engine")
+def benchmark_engine_fixture(async_engine: AsyncEngine) -> Generator[AsyncEngine]:
+    """Test engine counting queries like the app's, with the app's sessions pointed at it."""
+    instrument_engine(async_engine, "primary")
+    yield async_engine
+    app.dependency_overrides.clear()
+
+
+async def test_benchmark_scenarios_run_on_seeded_data(benchmark_engine: AsyncEngine):
+    scale = Scale(workspaces=4, files_per_workspace=5, members_per_workspace=3, users=6)
+    await seed(benchmark_engine, get_storage(), scale)
+    context = await load_context(benchmark_engine, users=6)
+
+    async with app_client(benchmark_engine) as client:
+        for name in SCENARIOS:
+            result = await run_scenario(client, name, context, requests=6, concurrency=2)
+            summary = result.summary()
+
+            assert summary["requests"] == 6
+            assert summary["errors"] == 0, name
+            assert summary["queries_per_request"] is not None
+            assert summary["p50_ms"] <= summary["p95_ms"] <= summary["max_ms"]
+
+
+def test_compare_flags_regressions_against_baseline():
+    baseline = {
+        "list_files": {
+            "errors": 0,
+            "throughput_rps": 100.0,
+            "p95_ms": 20.0,
+            "p99_ms": 30.0,
+            "queries_per_request": 2.0,
+        }
+    }
+    noisy = {**baseline["list_files"], "p95_ms": 22.0, "queries_per_request": 2.05}
+    slower = {**baseline["list_files"], "p99_ms": 45.0, "throughput_rps": 70.0}
+    more_queries = {**baseline["list_files"], "queries_per_request": 3.0}
+
+    assert compare(baseline, {"list_files": noisy}, latency_tolerance=0.25) == []
+    assert len(compare(baseline, {"list_files": slower}, latency_tolerance=0.25)) == 2
+    assert compare(baseline, {"list_files": more_queries}, latency_tolerance=0.25) == [
+        "list_files: queries per request went from 2.0 to 3.0"
+    ]
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from backend.src.models.blob import Blob
+from backend.src.models.user import User
+from backend.src.models.workspace import Workspace, WorkspaceMember
+from backend.src.types.roles import RoleEnum
+
+CONTENT = b"%PDF-1.7 term sheet"
+
+
+def upload(client: TestClient, workspace_id: int, headers: dict[str, str]) -> dict:
+    response = client.post(
+        f"/api/workspaces/{workspace_id}/files/import/google-drive",
+        files={"file": ("term_sheet.pdf", CONTENT, "application/pdf")},
+        headers=headers,
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+def create_workspace(session: Session, user: User) -> Workspace:
+    workspace = Workspace(name="Second Room", created_by=user.id)
+    session.add(workspace)
+    session.commit()
+    session.refresh(workspace)
+    session.add(WorkspaceMember(workspace_id=workspace.id, user_id=user.id, role=RoleEnum.ADMIN))
+    session.commit()
+    return workspace
+
+
+def test_identical_uploads_share_one_blob(
+    client: TestClient,
+    session: Session,
+    user: User,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    storage_path: Path,
+) -> None:
+    """Test that the same content uploaded twice is stored once and referenced twice."""
+    other_workspace = create_workspace(session, user)
+
+    first = upload(client, workspace.id, auth_headers)
+    second = upload(client, other_workspace.id, auth_headers)
+
+    assert first["filePath"] == second["filePath"]
+    assert (storage_path / first["filePath"]).read_bytes() == CONTENT
+    assert len([path for path in (storage_path / "blobs").rglob("*") if path.is_file()]) == 1
+
+    blob = session.exec(select(Blob)).one()
+    assert blob.ref_count == 2
+    assert blob.size == len(CONTENT)
+
+
+def test_deleting_files_releases_references_not_bytes(
+    client: TestClient,
+    session: Session,
+    user: User,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    storage_path: Path,
+) -> None:
+    """Test that deleting files and workspaces only drops blob references."""
+    other_workspace = create_workspace(session, user)
+    first = upload(client, workspace.id, auth_headers)
+    upload(client, other_workspace.id, auth_headers)
+
+    response = client.delete(
+        f"/api/workspaces/{workspace.id}/files/{first['id']}", headers=auth_headers
+    )
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+    blob = session.get(Blob, Path(first["filePath"]).name)
+    session.refresh(blob)
+    assert blob.ref_count == 1
+
+    response = client.delete(f"/api/workspaces/{other_workspace.id}", headers=auth_headers)
+    assert response.status_code == status.HTTP_202_ACCEPTED
+
+    session.refresh(blob)
+    assert blob.ref_count == 0
+    assert (storage_path / first["filePath"]).read_bytes() == CONTENT
@@ -0,0 +1,220 @@
+import io
+import zipfile
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from backend.src.models.file import File
+from backend.src.models.workspace import Workspace
+from backend.src.services.signed_urls import sign_download
+
+CONTENT = bytes(range(256)) * 4
+
+
+def upload(client: TestClient, workspace: Workspace, headers: dict[str, str]) -> str:
+    response = client.post(
+        f"/api/workspaces/{workspace.id}/files/import/google-drive",
+        files={"file": ("deck.pdf", CONTENT, "application/pdf")},
+        headers=headers,
+    )
+    return f"/api/workspaces/{workspace.id}/files/{response.json()['id']}/download"
+
+
+def test_download_sends_validators(
+    client: TestClient, workspace: Workspace, auth_headers: dict[str, str]
+) -> None:
+    """Test that full downloads carry a strong ETag and advertise range support."""
+    url = upload(client, workspace, auth_headers)
+
+    response = client.get(url, headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.content == CONTENT
+    assert response.headers["etag"].startswith('"')
+    assert response.headers["accept-ranges"] == "bytes"
+    assert "last-modified" in response.headers
+
+
+def test_conditional_download_returns_not_modified(
+    client: TestClient, workspace: Workspace, auth_headers: dict[str, str]
+) -> None:
+    """Test If-None-Match and If-Modified-Since revalidation."""
+    url = upload(client, workspace, auth_headers)
+    first = client.get(url, headers=auth_headers)
+
+    by_etag = client.get(url, headers={**auth_headers, "If-None-Match": first.headers["etag"]})
+    by_date = client.get(
+        url, headers={**auth_headers, "If-Modified-Since": first.headers["last-modified"]}
+    )
+    stale = client.get(url, headers={**auth_headers, "If-None-Match": '"other"'})
+
+    assert by_etag.status_code == status.HTTP_304_NOT_MODIFIED
+    assert by_etag.content == b""
+    assert by_etag.headers["etag"] == first.headers["etag"]
+    assert by_date.status_code == status.HTTP_304_NOT_MODIFIED
+    assert stale.status_code == status.HTTP_200_OK
+
+
+def test_single_and_suffix_ranges(
+    client: TestClient, workspace: Workspace, auth_headers: dict[str, str]
+) -> None:
+    """Test that single byte ranges are served as 206 partial content."""
+    url = upload(client, workspace, auth_headers)
+
+    response = client.get(url, headers={**auth_headers, "Range": "bytes=10-19"})
+    suffix = client.get(url, headers={**auth_headers, "Range": "bytes=-5"})
+
+    assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert response.content == CONTENT[10:20]
+    assert response.headers["content-range"] == f"bytes 10-19/{len(CONTENT)}"
+    assert suffix.content == CONTENT[-5:]
+
+
+def test_multiple_ranges(
+    client: TestClient, workspace: Workspace, auth_headers: dict[str, str]
+) -> None:
+    """Test that multiple ranges are served as multipart/byteranges."""
+    url = upload(client, workspace, auth_headers)
+
+    response = client.get(url, headers={**auth_headers, "Range": "bytes=0-3,100-103"})
+
+    assert response.status_code == status.HTTP_206_PARTIAL_CONTENT
+    content_type = response.headers["content-type"]
+    assert content_type.startswith("multipart/byteranges")
+    boundary = content_type.split("boundary=")[1]
+    parts = response.content.split(f"--{boundary}".encode())[1:-1]
+    bodies = [part.split(b"\r\n\r\n", 1)[1][:-2] for part in parts]
+    assert bodies == [CONTENT[0:4], CONTENT[100:104]]
+    assert int(response.headers["content-length"]) == len(response.content)
+
+
+def test_if_range_and_unsatisfiable_ranges(
+    client: TestClient, workspace: Workspace, auth_headers: dict[str, str]
+) -> None:
+    """Test If-Range fallbacks and 416 responses."""
+    url = upload(client, workspace, auth_headers)
+    etag = client.get(url, headers=auth_headers).headers["etag"]
+
+    matching = client.get(url, headers={**auth_headers, "Range": "bytes=0-0", "If-Range": etag})
+    changed = client.get(
+        url, headers={**auth_headers, "Range": "bytes=0-0", "If-Range": '"changed"'}
+    )
+    outside = client.get(url, headers={**auth_headers, "Range": f"bytes={len(CONTENT)}-"})
+
+    assert matching.status_code == status.HTTP_206_PARTIAL_CONTENT
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.content == CONTENT
+    assert outside.status_code == status.HTTP_416_RANGE_NOT_SATISFIABLE
+    assert outside.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_download_requires_membership(
+    client: TestClient,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    outsider_headers: dict[str, str],
+) -> None:
+    """Test that only workspace members can download files."""
+    url = upload(client, workspace, auth_headers)
+
+    response = client.get(url, headers=outsider_headers)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_signed_download_url(
+    client: TestClient, workspace: Workspace, auth_headers: dict[str, str]
+) -> None:
+    """Test that signed URLs serve files without credentials."""
+    url = upload(client, workspace, auth_headers)
+
+    response = client.post(url.replace("/download", "/download-url"), headers=auth_headers)
+    assert response.status_code == status.HTTP_200_OK
+    signed_url = response.json()["url"]
+
+    download = client.get(signed_url)
+    partial = client.get(signed_url, headers={"Range": "bytes=0-9"})
+    revalidated = client.get(signed_url, headers={"If-None-Match": download.headers["etag"]})
+
+    assert download.status_code == status.HTTP_200_OK
+    assert download.content == CONTENT
+    assert download.headers["cache-control"].startswith("private, max-age=")
+    assert partial.content == CONTENT[:10]
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+
+
+def test_batch_signed_download_urls(
+    client: TestClient,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    outsider_headers: dict[str, str],
+) -> None:
+    """Test issuing signed URLs for several files and the membership check."""
+    file_ids = [int(upload(client, workspace, auth_headers).split("/")[-2]) for _ in range(3)]
+    urls_endpoint = f"/api/workspaces/{workspace.id}/files/download-urls"
+
+    response = client.post(urls_endpoint, json={"fileIds": file_ids}, headers=auth_headers)
+    denied = client.post(urls_endpoint, json={"fileIds": file_ids}, headers=outsider_headers)
+
+    assert sorted(item["fileId"] for item in response.json()) == file_ids
+    assert denied.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_signed_download_rejects_bad_tokens(
+    client: TestClient, workspace: Workspace, auth_headers: dict[str, str], session: Session
+) -> None:
+    """Test that expired, tampered and access tokens are refused."""
+    url = upload(client, workspace, auth_headers)
+    db_file = session.get(File, int(url.split("/")[-2]))
+    expired, _ = sign_download(db_file, expires_in=-10)
+    valid, _ = sign_download(db_file)
+    access_token = auth_headers["Authorization"].removeprefix("Bearer ")
+
+    for token in (expired, valid[:-2] + "xx", access_token):
+        response = client.get(f"/api/files/signed/{token}")
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_export_workspace_as_zip(
+    client: TestClient, workspace: Workspace, auth_headers: dict[str, str]
+) -> None:
+    """Test that exports stream every file, store compressed types and deflate the rest."""
+    upload(client, workspace, auth_headers)
+    upload(client, workspace, auth_headers)
+    client.post(
+        f"/api/workspaces/{workspace.id}/files/import/google-drive",
+        files={"file": ("notes.txt", b"notes " * 1000, "text/plain")},
+        headers=auth_headers,
+    )
+
+    response = client.get(f"/api/workspaces/{workspace.id}/files/export", headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/zip"
+    assert response.headers["content-disposition"] == "attachment; filename*=utf-8''Deal%20Room.zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == ["deck.pdf", "deck (1).pdf", "notes.txt"]
+        assert archive.read("deck (1).pdf") == CONTENT
+        assert archive.read("notes.txt") == b"notes " * 1000
+        assert archive.getinfo("deck.pdf").compress_type == zipfile.ZIP_STORED
+        assert archive.getinfo("notes.txt").compress_type == zipfile.ZIP_DEFLATED
+
+
+def test_export_selected_files(
+    client: TestClient,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    outsider_headers: dict[str, str],
+) -> None:
+    """Test exporting a selection of files and the membership check."""
+    file_ids = [int(upload(client, workspace, auth_headers).split("/")[-2]) for _ in range(3)]
+    url = f"/api/workspaces/{workspace.id}/files/export"
+
+    response = client.get(url, params={"file_ids": file_ids[1:]}, headers=auth_headers)
+    denied = client.get(url, headers=outsider_headers)
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.namelist() == ["deck.pdf", "deck (1).pdf"]
+    assert denied.status_code == status.HTTP_403_FORBIDDEN
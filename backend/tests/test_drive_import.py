@@ -0,0 +1,231 @@
+import json
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import anyio
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session
+
+from backend.src.api.routes.imports import get_drive_importer
+from backend.src.asgi import app
+from backend.src.models.file import File
+from backend.src.models.user import User
+from backend.src.models.workspace import Workspace, WorkspaceMember
+from backend.src.services.drive_import import DriveImporter
+from backend.src.services.storage import get_storage
+from backend.src.types.roles import RoleEnum
+from backend.tests.conftest import auth_headers_for
+
+ACCESS_TOKEN = "drive-token"
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+class FakeDrive:
+    """Google Drive v3 stand-in serving a few files over real HTTP"""
+
+    def __init__(self):
+        self.files = {
+            "report": ("Report.pdf", "application/pdf", b"%PDF report" * 100),
+            "notes": ("Notes", "application/vnd.google-apps.document", b"docx bytes"),
+            "flaky": ("Flaky.txt", "text/plain", b"eventually"),
+        }
+        # Downloads answered with a 503 before succeeding
+        self.failures = {"flaky": 1}
+        self.delay = 0.0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        url = urlparse(request.path)
+        query = parse_qs(url.query)
+        parts = url.path.removeprefix("/drive/v3/files/").split("/")
+        entry = self.files.get(parts[0])
+
+        if request.headers.get("Authorization") != f"Bearer {ACCESS_TOKEN}":
+            return self.reply(request, 401, b"{}")
+        if entry is None:
+            return self.reply(request, 404, b"{}")
+
+        name, mime_type, content = entry
+        if len(parts) == 1 and "alt" not in query:
+            metadata = {
+                "id": parts[0],
+                "name": name,
+                "mimeType": mime_type,
+                "webViewLink": f"https://drive.google.com/file/d/{parts[0]}/view",
+                "thumbnailLink": f"https://lh3.googleusercontent.com/{parts[0]}",
+            }
+            return self.reply(request, 200, json.dumps(metadata).encode())
+
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.delay)
+            if self.failures.get(parts[0]):
+                self.failures[parts[0]] -= 1
+                return self.reply(request, 503, b"")
+            if parts[1:] == ["export"] and query["mimeType"] != [DOCX]:
+                return self.reply(request, 400, b"")
+            return self.reply(request, 200, content)
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    @staticmethod
+    def reply(request: BaseHTTPRequestHandler, status: int, body: bytes) -> None:
+        request.send_response(status)
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
+
+
+@pytest.fixture(name="drive")
+def drive_fixture() -> Generator[tuple[FakeDrive, str]]:
+    """Run a fake Drive API on a local port."""
+    drive = FakeDrive()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            drive.handle(self)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield drive, f"http://127.0.0.1:{server.server_port}/drive/v3"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(name="importer")
+async def importer_fixture(
+    drive: tuple[FakeDrive, str], async_engine: AsyncEngine
+) -> AsyncGenerator[DriveImporter]:
+    """Drive import workers running on the test's event loop against the fake Drive."""
+    async with httpx.AsyncClient() as http:
+        importer = DriveImporter(
+            async_engine,
+            get_storage(),
+            http,
+            workers=4,
+            per_user=1,
+            max_attempts=3,
+            backoff=0.01,
+            api_url=drive[1],
+        )
+        importer.start()
+        yield importer
+        await importer.stop()
+
+
+@pytest.fixture(name="api")
+async def api_fixture(
+    client: TestClient, importer: DriveImporter
+) -> AsyncGenerator[httpx.AsyncClient]:
+    """Async client sharing the event loop with the import workers."""
+    app.dependency_overrides[get_drive_importer] = lambda: importer
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as api:
+        yield api
+
+
+async def run_import(
+    api: httpx.AsyncClient, workspace: Workspace, headers: dict[str, str], drive_ids: list[str]
+) -> dict:
+    url = f"/api/workspaces/{workspace.id}/files/imports/"
+    response = await api.post(
+        url, json={"googleDriveIds": drive_ids, "accessToken": ACCESS_TOKEN}, headers=headers
+    )
+    assert response.status_code == 202
+    job = response.json()
+    with anyio.fail_after(5):
+        while job["status"] != "completed":
+            await anyio.sleep(0.02)
+            job = (await api.get(f"{url}{job['id']}", headers=headers)).json()
+    return job
+
+
+async def test_import_streams_drive_files(
+    api: httpx.AsyncClient,
+    session: Session,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    drive: tuple[FakeDrive, str],
+) -> None:
+    """Test that Drive files are imported with their links, retried, exported or failed."""
+    job = await run_import(api, workspace, auth_headers, ["report", "notes", "flaky", "missing"])
+
+    report, notes, flaky, missing = job["items"]
+    assert (job["succeeded"], job["failed"]) == (3, 1)
+    assert (report["status"], report["attempts"]) == ("succeeded", 1)
+    assert (flaky["status"], flaky["attempts"]) == ("succeeded", 2)
+    assert missing["status"] == "failed" and missing["attempts"] == 1
+    assert "not accessible" in missing["error"]
+
+    imported = session.get(File, report["fileId"])
+    assert imported.name == "Report.pdf"
+    assert imported.file_size == len(drive[0].files["report"][2])
+    assert imported.google_drive_id == "report"
+    assert imported.web_view_link == "https://drive.google.com/file/d/report/view"
+    assert imported.thumbnail_url == "https://lh3.googleusercontent.com/report"
+    exported = session.get(File, notes["fileId"])
+    assert (exported.name, exported.mime_type) == ("Notes.docx", DOCX)
+
+
+async def test_import_limits_concurrency_per_user(
+    api: httpx.AsyncClient,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    drive: tuple[FakeDrive, str],
+) -> None:
+    """Test that one user's files are downloaded one at a time despite idle workers."""
+    drive[0].delay = 0.05
+    drive[0].failures.clear()
+
+    job = await run_import(api, workspace, auth_headers, ["report", "notes", "flaky"])
+
+    assert job["succeeded"] == 3
+    assert drive[0].max_active == 1
+
+
+async def test_import_job_access(
+    api: httpx.AsyncClient,
+    session: Session,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    outsider_headers: dict[str, str],
+) -> None:
+    """Test that non-members cannot import and jobs are only visible to their creator."""
+    viewer = User(email="viewer@example.com", full_name="Viewer", google_user_id="google_viewer")
+    session.add(viewer)
+    session.commit()
+    session.add(WorkspaceMember(workspace_id=workspace.id, user_id=viewer.id, role=RoleEnum.VIEWER))
+    session.commit()
+    job = await run_import(api, workspace, auth_headers, ["report"])
+    url = f"/api/workspaces/{workspace.id}/files/imports/"
+
+    denied = await api.post(
+        url, json={"googleDriveIds": ["report"], "accessToken": "x"}, headers=outsider_headers
+    )
+    hidden = await api.get(f"{url}{job['id']}", headers=auth_headers_for(viewer))
+    # Ids are interpolated into Drive API URLs, so they cannot alter the path or query
+    malformed = [
+        await api.post(
+            url, json={"googleDriveIds": [drive_id], "accessToken": "x"}, headers=auth_headers
+        )
+        for drive_id in ["../about", "report?alt=json", "report#", ""]
+    ]
+
+    assert denied.status_code == 403
+    assert hidden.status_code == 404
+    assert [response.status_code for response in malformed] == [422] * 4
@@ -0,0 +1,163 @@
+from collections.abc import AsyncIterator
+from unittest.mock import ANY
+
+import pytest
+from fastapi import UploadFile
+from fastapi.testclient import TestClient
+from sqlmodel import Session, func, select
+
+from backend.src.api.routes import files as files_routes
+from backend.src.config.settings import app_settings
+from backend.src.models.blob import Blob
+from backend.src.models.file import File
+from backend.src.models.user import User
+from backend.src.models.workspace import Workspace
+from backend.src.services.storage import iter_upload_file
+from backend.src.types.date import utc_now
+
+
+def test_list_files_pagination(
+    session: Session,
+    user: User,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    collect_pages,
+) -> None:
+    """Test that files are paged by (created_at, id), even when timestamps collide."""
+    created_at = utc_now()
+    session.add_all(
+        File(
+            name=f"file-{index}.txt",
+            file_path=f"{workspace.id}/file-{index}.txt",
+            workspace_id=workspace.id,
+            uploaded_by=user.id,
+            created_at=created_at,
+        )
+        for index in range(5)
+    )
+    session.commit()
+    url = f"/api/workspaces/{workspace.id}/files/"
+
+    pages = collect_pages(url, auth_headers, limit=2)
+    newest_first = collect_pages(url, auth_headers, limit=2, order="desc")
+
+    ids = [file["id"] for page in pages for file in page]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert ids == sorted(ids) and len(set(ids)) == 5
+    assert [file["id"] for page in newest_first for file in page] == ids[::-1]
+
+
+def test_batch_upload(
+    client: TestClient,
+    session: Session,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a batch stores every file, shares identical content and reports failures."""
+
+    async def failing_iter_upload_file(file: UploadFile) -> AsyncIterator[bytes]:
+        if file.filename == "broken.txt":
+            raise OSError("disk full")
+        async for chunk in iter_upload_file(file):
+            yield chunk
+
+    monkeypatch.setattr(files_routes, "iter_upload_file", failing_iter_upload_file)
+
+    response = client.post(
+        f"/api/workspaces/{workspace.id}/files/batch",
+        files=[
+            ("files", ("a.txt", b"same", "text/plain")),
+            ("files", ("broken.txt", b"lost", "text/plain")),
+            ("files", ("b.txt", b"same", "text/plain")),
+            ("files", ("c.txt", b"other", "text/plain")),
+        ],
+        data={"google_drive_ids": ["d1", "d2", "d3", "d4"]},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [item["filename"] for item in results] == ["a.txt", "broken.txt", "b.txt", "c.txt"]
+    assert results[1] == {"filename": "broken.txt", "file": None, "error": ANY}
+    assert "disk full" in results[1]["error"]
+    assert [item["file"]["googleDriveId"] for item in (results[0], results[2], results[3])] == [
+        "d1",
+        "d3",
+        "d4",
+    ]
+    assert session.exec(select(func.count()).select_from(File)).one() == 3
+    blob = session.get(Blob, results[0]["file"]["filePath"].rsplit("/", 1)[-1])
+    assert blob.ref_count == 2
+
+
+def test_batch_upload_limits(
+    client: TestClient,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that oversized batches and misaligned Drive ids are rejected."""
+    monkeypatch.setattr(app_settings, "BATCH_UPLOAD_MAX_FILES", 1)
+    url = f"/api/workspaces/{workspace.id}/files/batch"
+    files = [("files", ("a.txt", b"a")), ("files", ("b.txt", b"b"))]
+
+    too_many = client.post(url, files=files, headers=auth_headers)
+    misaligned = client.post(
+        url, files=files[:1], data={"google_drive_ids": ["d1", "d2"]}, headers=auth_headers
+    )
+
+    assert too_many.status_code == 413
+    assert misaligned.status_code == 400
+
+
+def test_usage_counters_and_quota(
+    client: TestClient,
+    session: Session,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that uploads and deletions keep the counters current and the quota is enforced."""
+    files_url = f"/api/workspaces/{workspace.id}/files"
+    workspace.storage_quota_bytes = 10
+    session.add(workspace)
+    session.commit()
+
+    first = client.post(
+        f"{files_url}/import/google-drive",
+        files={"file": ("a.txt", b"123456")},
+        headers=auth_headers,
+    )
+    refused = client.post(
+        f"{files_url}/import/google-drive",
+        files={"file": ("b.txt", b"abcdef")},
+        headers=auth_headers,
+    )
+    batch = client.post(
+        f"{files_url}/batch",
+        files=[("files", ("c.txt", b"12")), ("files", ("d.txt", b"34"))],
+        headers=auth_headers,
+    )
+    chunked = client.post(
+        f"{files_url}/uploads/", json={"filename": "e.zip", "size": 100}, headers=auth_headers
+    )
+    usage = client.get("/api/workspaces/", headers=auth_headers).json()[0]
+
+    assert first.status_code == 200
+    assert refused.status_code == 413
+    assert [result["error"] for result in batch.json()] == [None, None]
+    assert chunked.status_code == 413
+    assert (usage["fileCount"], usage["totalBytes"], usage["storageQuotaBytes"]) == (3, 10, 10)
+    # The refused content is left unreferenced for garbage collection
+    assert sorted(session.exec(select(Blob.ref_count).where(Blob.size == 6)).all()) == [0, 1]
+
+    client.delete(f"{files_url}/{first.json()['id']}", headers=auth_headers)
+    session.refresh(workspace)
+    assert (workspace.file_count, workspace.total_bytes) == (2, 4)
+
+    # New workspaces report the default quota
+    monkeypatch.setattr(app_settings, "WORKSPACE_STORAGE_QUOTA_BYTES", 1000)
+    created = client.post("/api/workspaces/", json={"name": "New"}, headers=auth_headers).json()
+    assert created["storageQuotaBytes"] == 1000
+    assert [member["role"] for member in created["members"]] == ["admin"]
@@ -0,0 +1,385 @@
+import os
+from collections.abc import AsyncIterator
+from datetime import timedelta
+from pathlib import Path
+
+import anyio
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session, select
+
+from backend.src.models.blob import Blob
+from backend.src.models.file import File
+from backend.src.models.import_job import ImportItem, ImportJob
+from backend.src.models.job_lease import JobLease
+from backend.src.models.token_blacklist import TokenBlacklist
+from backend.src.models.upload_session import UploadSession
+from backend.src.models.user import User
+from backend.src.models.workspace import Workspace
+from backend.src.models.workspace_deletion import WorkspaceDeletion
+from backend.src.services.blobs import blob_key, store_stream
+from backend.src.services.maintenance import (
+    cleanup_abandoned_uploads,
+    collect_orphan_blobs,
+    fail_stale_imports,
+    purge_deleted_workspaces,
+    purge_expired_tokens,
+    reconcile_workspace_usage,
+)
+from backend.src.services.previews import preview_key
+from backend.src.services.scheduler import Scheduler
+from backend.src.services.storage import LocalStorageBackend
+from backend.src.types.date import utc_now
+from backend.src.types.imports import ImportStatusEnum
+
+
+async def stream(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def test_purge_expired_tokens_in_batches(
+    session: Session, async_engine: AsyncEngine, user: User
+) -> None:
+    """Test that expired blacklist buckets are purged in batches and live ones are kept."""
+    now = utc_now()
+    for index in range(5):
+        expires_at = now - timedelta(days=2)
+        session.add(
+            TokenBlacklist(
+                jti_hash=f"{index:064d}",
+                user_id=user.id,
+                expires_at=expires_at,
+                expires_bucket=expires_at.date(),
+            )
+        )
+    session.add(
+        TokenBlacklist(
+            jti_hash="f" * 64, user_id=user.id, expires_at=now, expires_bucket=now.date()
+        )
+    )
+    session.commit()
+
+    deleted = await purge_expired_tokens(async_engine, batch_size=2, pause=0)
+
+    assert deleted == 5
+    assert session.exec(select(TokenBlacklist.jti_hash)).all() == ["f" * 64]
+
+
+async def test_collect_orphan_blobs(
+    session: Session, async_engine: AsyncEngine, storage_path: Path
+) -> None:
+    """Test that only blobs unreferenced for the grace period are collected."""
+    storage = LocalStorageBackend(storage_path)
+    old = utc_now() - timedelta(hours=2)
+    blobs = [
+        Blob(digest="a" * 64, size=1, ref_count=0, updated_at=old),
+        Blob(digest="b" * 64, size=1, ref_count=1, updated_at=old),
+        Blob(digest="c" * 64, size=1, ref_count=0),
+    ]
+    for blob in blobs:
+        session.add(blob)
+        await storage.write(blob_key(blob.digest), stream(b"x"))
+        await storage.write(preview_key(blob.digest, 160), stream(b"x"))
+    session.commit()
+
+    collected = await collect_orphan_blobs(
+        async_engine, storage, grace=3600, batch_size=10, pause=0
+    )
+
+    assert collected == 1
+    assert not await storage.exists(blob_key("a" * 64))
+    assert not await storage.exists(preview_key("a" * 64, 160))
+    assert await storage.exists(blob_key("b" * 64))
+    assert await storage.exists(preview_key("b" * 64, 160))
+    assert sorted(session.exec(select(Blob.digest)).all()) == ["b" * 64, "c" * 64]
+
+
+async def test_collect_orphan_blobs_spares_stored_again(
+    session: Session, async_engine: AsyncEngine, storage_path: Path
+) -> None:
+    """Test that storing orphaned content again keeps it until the upload references it."""
+    storage = LocalStorageBackend(storage_path)
+    digest, _ = await store_stream(async_engine, storage, stream(b"content"))
+    blob = session.get(Blob, digest)
+    blob.updated_at = utc_now() - timedelta(hours=2)
+    session.add(blob)
+    session.commit()
+
+    # The duplicate finds the content stored and skips the write, before referencing it
+    await store_stream(async_engine, storage, stream(b"content"))
+    collected = await collect_orphan_blobs(
+        async_engine, storage, grace=3600, batch_size=10, pause=0
+    )
+
+    assert collected == 0
+    assert await storage.exists(blob_key(digest))
+
+
+async def test_collect_orphan_blobs_during_upload(
+    session: Session, async_engine: AsyncEngine, storage_path: Path
+) -> None:
+    """Test that content stored while its blob is being collected is stored anew."""
+    deleting, resume = anyio.Event(), anyio.Event()
+
+    class PausingStorage(LocalStorageBackend):
+        async def delete(self, key: str) -> None:
+            if key.startswith("blobs/"):
+                deleting.set()
+                await resume.wait()
+            await super().delete(key)
+
+    storage = PausingStorage(storage_path)
+    digest = (await store_stream(async_engine, LocalStorageBackend(storage_path), stream(b"x")))[0]
+    session.get(Blob, digest).updated_at = utc_now() - timedelta(hours=2)
+    session.commit()
+    stored = []
+
+    async def upload() -> None:
+        stored.append(await store_stream(async_engine, storage, stream(b"x")))
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(collect_orphan_blobs, async_engine, storage, 3600, 10, 0)
+        await deleting.wait()
+        task_group.start_soon(upload)
+        await anyio.sleep(0.2)
+        # The upload waits for the collection holding the blob
+        assert stored == []
+        resume.set()
+
+    assert stored == [(digest, 1)]
+    assert await storage.exists(blob_key(digest))
+    session.expire_all()
+    assert session.get(Blob, digest).ref_count == 0
+
+
+async def test_cleanup_abandoned_uploads(
+    session: Session,
+    async_engine: AsyncEngine,
+    storage_path: Path,
+    user: User,
+    workspace: Workspace,
+) -> None:
+    """Test that idle uploads are aborted and stray temp files are removed."""
+    storage = LocalStorageBackend(storage_path)
+    old = utc_now() - timedelta(days=2)
+
+    sessions = []
+    for key, updated_at in (("tmp/idle", old), ("tmp/active", utc_now())):
+        upload_id = await storage.create_multipart(key)
+        sessions.append(
+            UploadSession(
+                workspace_id=workspace.id,
+                uploaded_by=user.id,
+                filename="a.bin",
+                total_size=10,
+                storage_key=key,
+                storage_upload_id=upload_id,
+                updated_at=updated_at,
+            )
+        )
+    session.add_all(sessions)
+    session.commit()
+
+    await storage.write("tmp/stray", stream(b"x"))
+    await storage.write("tmp/fresh", stream(b"x"))
+    os.utime(storage_path / "tmp" / "stray", (old.timestamp(), old.timestamp()))
+    # The active upload's part file is old too, but it is owned by a live session
+    os.utime(storage_path / "tmp" / "active", (old.timestamp(), old.timestamp()))
+
+    cleaned = await cleanup_abandoned_uploads(
+        async_engine, storage, ttl=86400, batch_size=10, pause=0
+    )
+
+    assert cleaned == 2
+    assert session.exec(select(UploadSession.storage_key)).all() == ["tmp/active"]
+    assert sorted([item.key async for item in storage.list_keys("tmp/")]) == [
+        "tmp/active",
+        "tmp/fresh",
+    ]
+
+
+async def test_fail_stale_imports(
+    session: Session, async_engine: AsyncEngine, user: User, workspace: Workspace
+) -> None:
+    """Test that unfinished import items without progress are failed and others kept."""
+    job = ImportJob(workspace_id=workspace.id, created_by=user.id)
+    old = utc_now() - timedelta(hours=3)
+    session.add(job)
+    session.add_all(
+        [
+            ImportItem(job_id=job.id, google_drive_id="stale", updated_at=old),
+            ImportItem(
+                job_id=job.id,
+                google_drive_id="running",
+                status=ImportStatusEnum.RUNNING,
+                updated_at=utc_now(),
+            ),
+            ImportItem(
+                job_id=job.id,
+                google_drive_id="done",
+                status=ImportStatusEnum.SUCCEEDED,
+                updated_at=old,
+            ),
+        ]
+    )
+    session.commit()
+
+    failed = await fail_stale_imports(async_engine, ttl=3600)
+
+    assert failed == 1
+    statuses = dict(session.exec(select(ImportItem.google_drive_id, ImportItem.status)).all())
+    assert statuses == {
+        "stale": ImportStatusEnum.FAILED,
+        "running": ImportStatusEnum.RUNNING,
+        "done": ImportStatusEnum.SUCCEEDED,
+    }
+
+
+async def test_reconcile_workspace_usage(
+    session: Session, async_engine: AsyncEngine, user: User, workspace: Workspace
+) -> None:
+    """Test that drifted usage counters are recomputed from the files table."""
+    empty = Workspace(name="Empty", created_by=user.id, file_count=4, total_bytes=40)
+    exact = Workspace(name="Exact", created_by=user.id)
+    session.add_all([empty, exact])
+    session.add_all(
+        File(
+            name=f"file-{size}.txt",
+            file_path=f"{workspace.id}/file-{size}.txt",
+            file_size=size,
+            workspace_id=workspace.id,
+            uploaded_by=user.id,
+        )
+        for size in (3, 4)
+    )
+    session.commit()
+
+    repaired = await reconcile_workspace_usage(async_engine, batch_size=2, pause=0)
+
+    assert repaired == 2
+    usage = session.exec(select(Workspace.name, Workspace.file_count, Workspace.total_bytes)).all()
+    assert sorted(usage) == sorted([("Empty", 0, 0), ("Exact", 0, 0), (workspace.name, 2, 7)])
+
+
+async def test_scheduler_lease_and_metrics(session: Session, async_engine: AsyncEngine) -> None:
+    """Test that only the lease holder runs a job and that runs are measured."""
+    leader, follower = Scheduler(async_engine), Scheduler(async_engine)
+    calls: list[str] = []
+
+    async def work() -> int:
+        calls.append("work")
+        return 3
+
+    async def fail() -> int:
+        raise RuntimeError("boom")
+
+    job = leader.add_job("work", work, interval=60)
+    other = follower.add_job("work", work, interval=60)
+    failing = leader.add_job("fail", fail, interval=60)
+
+    assert await leader.run_job(job)
+    assert not await follower.run_job(other)
+    assert await leader.run_job(job)
+    assert await leader.run_job(failing)
+
+    assert calls == ["work", "work"]
+    assert (job.metrics.runs, job.metrics.processed, job.metrics.last_processed) == (2, 6, 3)
+    assert other.metrics.skipped == 1
+    assert failing.metrics.failures == 1
+    assert failing.metrics.last_error == "RuntimeError: boom"
+    assert session.get(JobLease, "work").owner == leader.owner
+
+
+async def test_scheduler_renews_lease_while_running(
+    session: Session, async_engine: AsyncEngine
+) -> None:
+    """Test that a run outlasting its lease keeps it, and is stopped once it is lost."""
+    leader, follower = Scheduler(async_engine), Scheduler(async_engine)
+    started, stopped = anyio.Event(), anyio.Event()
+
+    async def slow() -> int:
+        started.set()
+        try:
+            await anyio.sleep(0.6)
+        except BaseException:
+            stopped.set()
+            raise
+        return 1
+
+    job = leader.add_job("slow", slow, interval=0.3)
+    other = follower.add_job("slow", slow, interval=0.3)
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(leader.run_job, job)
+        await started.wait()
+        await anyio.sleep(0.45)
+        # Past the first lease, which the leader renewed in the meantime
+        assert not await follower.run_job(other)
+    assert (job.metrics.processed, other.metrics.skipped) == (1, 1)
+
+    started = anyio.Event()
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(leader.run_job, job)
+        await started.wait()
+        lease = session.get(JobLease, "slow")
+        lease.owner, lease.expires_at = follower.owner, utc_now() + timedelta(hours=1)
+        session.add(lease)
+        session.commit()
+
+    assert stopped.is_set()
+    assert job.metrics.failures == 1
+    assert job.metrics.last_error.startswith("LeaseLostError")
+
+
+async def test_purge_deleted_workspaces(
+    session: Session,
+    async_engine: AsyncEngine,
+    storage_path: Path,
+    user: User,
+    workspace: Workspace,
+) -> None:
+    """Test that an unfinished workspace deletion is purged in batches, storage included."""
+    storage = LocalStorageBackend(storage_path)
+    workspace_id = workspace.id
+    upload_id = await storage.create_multipart("tmp/pending")
+    await storage.write(f"{workspace_id}/legacy.txt", stream(b"x"))
+    session.add(Blob(digest="a" * 64, size=1, ref_count=3))
+    session.add_all(
+        File(
+            name=f"file-{index}.txt",
+            file_path=blob_key("a" * 64),
+            file_size=1,
+            workspace_id=workspace_id,
+            uploaded_by=user.id,
+            blob_digest="a" * 64,
+        )
+        for index in range(3)
+    )
+    session.add(
+        UploadSession(
+            workspace_id=workspace_id,
+            uploaded_by=user.id,
+            filename="a.bin",
+            total_size=10,
+            storage_key="tmp/pending",
+            storage_upload_id=upload_id,
+        )
+    )
+    workspace.deleted_at = utc_now()
+    session.add(workspace)
+    deletion = WorkspaceDeletion(workspace_id=workspace_id, requested_by=user.id, total_files=3)
+    session.add(deletion)
+    session.commit()
+
+    purged = await purge_deleted_workspaces(async_engine, storage, batch_size=2, pause=0)
+
+    assert purged == 1
+    session.expire_all()
+    assert session.get(Workspace, workspace_id) is None
+    assert session.exec(select(File)).all() == []
+    assert session.exec(select(UploadSession)).all() == []
+    assert session.get(Blob, "a" * 64).ref_count == 0
+    assert session.get(WorkspaceDeletion, deletion.id).deleted_files == 3
+    assert session.get(WorkspaceDeletion, deletion.id).finished_at is not None
+    assert not await storage.exists(f"{workspace_id}/legacy.txt")
+    assert await purge_deleted_workspaces(async_engine, storage, batch_size=2, pause=0) == 0
@@ -0,0 +1,77 @@
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import SecretStr
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from backend.src.config.settings import app_settings
+from backend.src.database.instrumentation import instrument_engine
+from backend.src.models.workspace import Workspace
+from backend.src.services.metrics import Histogram
+
+
+def sample(metrics: str, name: str) -> float:
+    match = re.search(rf"^{re.escape(name)} (\S+)$", metrics, re.MULTILINE)
+    assert match, f"{name} not found"
+    return float(match[1])
+
+
+def test_request_metrics(
+    client: TestClient,
+    async_engine: AsyncEngine,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that requests report their timings and feed the per-route metrics."""
+    monkeypatch.setattr(app_settings, "METRICS_TOKEN", SecretStr("scrape-me"))
+    instrument_engine(async_engine, "test")
+
+    response = client.get("/api/workspaces/", headers=auth_headers)
+    assert response.status_code == 200
+    assert re.search(r'db;desc="[1-9]\d* queries";dur=[\d.]+', response.headers["server-timing"])
+
+    response = client.post(
+        f"/api/workspaces/{workspace.id}/files/import/google-drive",
+        files={"file": ("notes.txt", b"12345", "text/plain")},
+        headers=auth_headers,
+    )
+    assert response.status_code == 200
+    assert 'storage-write;desc="5 bytes"' in response.headers["server-timing"]
+
+    metrics = client.get("/metrics", headers={"Authorization": "Bearer scrape-me"}).text
+    route = 'method="GET",route="/api/workspaces/"'
+    assert sample(metrics, f'http_request_duration_seconds_count{{{route},status="200"}}') >= 1
+    assert sample(metrics, f"http_request_db_queries_count{{{route}}}") >= 1
+    assert sample(metrics, 'db_query_duration_seconds_count{engine="test"}') >= 1
+    upload_route = "/api/workspaces/{workspace_id}/files/import/google-drive"
+    written = f'storage_bytes_total{{operation="write",route="{upload_route}"}}'
+    assert sample(metrics, written) >= 5
+
+
+def test_metrics_token(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the metrics are only served with a token, and not at all without one."""
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(app_settings, "METRICS_TOKEN", SecretStr("scrape-me"))
+
+    assert client.get("/metrics").status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+
+def test_histogram_rendering() -> None:
+    """Test that histograms render cumulative buckets in the Prometheus text format."""
+    histogram = Histogram("latency_seconds", "Latency", ["route"], buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.5, 3):
+        histogram.observe(value, route='/a"b')
+
+    assert histogram.samples() == [
+        'latency_seconds_bucket{route="/a\\"b",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a\\"b",le="1"} 3',
+        'latency_seconds_bucket{route="/a\\"b",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a\\"b"} 4.05',
+        'latency_seconds_count{route="/a\\"b"} 4',
+    ]
@@ -0,0 +1,136 @@
+from collections.abc import Callable
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from backend.src.models.file import File
+from backend.src.models.user import User
+from backend.src.models.workspace import Workspace, WorkspaceMember
+from backend.src.types.roles import RoleEnum
+from backend.tests.conftest import auth_headers_for
+
+
+@pytest.fixture(name="member_headers")
+def member_headers_fixture(
+    session: Session, workspace: Workspace
+) -> Callable[[RoleEnum], dict[str, str]]:
+    """Add a new user to the test workspace with the given role and return their headers."""
+
+    def member_headers(role: RoleEnum) -> dict[str, str]:
+        member = User(
+            email=f"{role.value}@example.com", full_name=role.value, google_user_id=role.value
+        )
+        session.add(member)
+        session.commit()
+        session.refresh(member)
+        session.add(WorkspaceMember(workspace_id=workspace.id, user_id=member.id, role=role))
+        session.commit()
+        return auth_headers_for(member)
+
+    return member_headers
+
+
+def test_file_listing_reuses_cached_membership(
+    client: TestClient, workspace: Workspace, auth_headers: dict[str, str], count_queries
+) -> None:
+    """Test that a repeated file request only runs its own query."""
+    url = f"/api/workspaces/{workspace.id}/files/"
+    assert client.get(url, headers=auth_headers).status_code == status.HTTP_200_OK
+
+    with count_queries() as queries:
+        response = client.get(url, headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(queries) == 1
+
+
+def test_viewer_can_read_but_not_write(
+    client: TestClient, workspace: Workspace, member_headers
+) -> None:
+    """Test that viewers can list files but not add them."""
+    headers = member_headers(RoleEnum.VIEWER)
+    files_url = f"/api/workspaces/{workspace.id}/files"
+
+    listing = client.get(f"{files_url}/", headers=headers)
+    upload = client.post(
+        f"{files_url}/uploads/", json={"filename": "a.txt", "size": 1}, headers=headers
+    )
+    import_ = client.post(
+        f"{files_url}/import/google-drive", files={"file": ("a.txt", b"a")}, headers=headers
+    )
+
+    assert listing.status_code == status.HTTP_200_OK
+    assert upload.status_code == status.HTTP_403_FORBIDDEN
+    assert import_.status_code == status.HTTP_403_FORBIDDEN
+
+
+def test_workspace_changes_require_admin(
+    client: TestClient,
+    workspace: Workspace,
+    member_headers,
+    outsider_headers: dict[str, str],
+) -> None:
+    """Test that only admins can update a workspace or manage its members."""
+    headers = member_headers(RoleEnum.USER)
+    url = f"/api/workspaces/{workspace.id}"
+
+    update = client.put(url, json={"name": "Mine now"}, headers=headers)
+    add_member = client.post(
+        f"{url}/members", json={"email": "outsider@example.com"}, headers=headers
+    )
+    delete = client.delete(url, headers=outsider_headers)
+    missing = client.delete("/api/workspaces/9999", headers=headers)
+
+    assert update.status_code == status.HTTP_403_FORBIDDEN
+    assert update.json()["detail"] == "Insufficient permissions"
+    assert add_member.status_code == status.HTTP_403_FORBIDDEN
+    assert delete.status_code == status.HTTP_403_FORBIDDEN
+    assert delete.json()["detail"] == "Access denied"
+    assert missing.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_adding_member_invalidates_cached_denial(
+    client: TestClient,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    outsider_headers: dict[str, str],
+) -> None:
+    """Test that a new member gets access right away instead of after the cache expires."""
+    url = f"/api/workspaces/{workspace.id}/files/"
+    assert client.get(url, headers=outsider_headers).status_code == status.HTTP_403_FORBIDDEN
+
+    response = client.post(
+        f"/api/workspaces/{workspace.id}/members",
+        json={"email": "outsider@example.com", "role": RoleEnum.VIEWER.value},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert client.get(url, headers=outsider_headers).status_code == status.HTTP_200_OK
+
+
+def test_users_delete_only_their_own_files(
+    client: TestClient,
+    session: Session,
+    user: User,
+    workspace: Workspace,
+    member_headers,
+) -> None:
+    """Test that users cannot delete files uploaded by someone else."""
+    db_file = File(
+        name="owner.txt",
+        file_path=f"{workspace.id}/owner.txt",
+        workspace_id=workspace.id,
+        uploaded_by=user.id,
+    )
+    session.add(db_file)
+    session.commit()
+
+    response = client.delete(
+        f"/api/workspaces/{workspace.id}/files/{db_file.id}", headers=member_headers(RoleEnum.USER)
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    assert session.get(File, db_file.id) is not None
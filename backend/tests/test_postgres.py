@@ -0,0 +1,85 @@
+import os
+from collections.abc import AsyncGenerator
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from backend.src.asgi import app  # noqa: F401  Registers every model
+from backend.src.database.session import upgrade_timestamp_columns
+from backend.src.models.blob import Blob
+from backend.src.models.token_blacklist import TokenBlacklist
+from backend.src.models.user import User
+from backend.src.models.workspace import Workspace
+from backend.src.services.blobs import acquire_blob, release_blob
+from backend.src.types.date import utc_now
+
+# Set in CI, which runs a PostgreSQL service; the rest of the suite runs on SQLite
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+pytestmark = pytest.mark.skipif(POSTGRES_URL is None, reason="TEST_POSTGRES_URL is not set")
+
+
+@pytest.fixture(name="postgres_engine")
+async def postgres_engine_fixture() -> AsyncGenerator[AsyncEngine]:
+    """Engine on an emptied PostgreSQL database, using the asyncpg driver of the app."""
+    engine = create_async_engine(POSTGRES_URL)
+    async with engine.begin() as connection:
+        await connection.run_sync(SQLModel.metadata.drop_all)
+        await connection.run_sync(SQLModel.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+async def test_write_timestamps(postgres_engine: AsyncEngine) -> None:
+    """Test that aware timestamps are written by ORM inserts and Core updates alike."""
+    async with AsyncSession(postgres_engine) as session:
+        user = User(email="owner@example.com", full_name="Owner", google_user_id="google_owner")
+        session.add(user)
+        await session.commit()
+        expires_at = utc_now() + timedelta(hours=1)
+        session.add(
+            TokenBlacklist(
+                jti_hash="a" * 64,
+                user_id=user.id,
+                expires_at=expires_at,
+                expires_bucket=expires_at.date(),
+            )
+        )
+        session.add(Workspace(name="Deal Room", created_by=user.id, deleted_at=utc_now()))
+        await acquire_blob(session, "b" * 64, 1)
+        await release_blob(session, "b" * 64)
+        await session.commit()
+
+        blob = (await session.exec(select(Blob))).one()
+        token = (await session.exec(select(TokenBlacklist))).one()
+
+    assert blob.ref_count == 0 and blob.updated_at.tzinfo is not None
+    assert token.expires_at == expires_at
+
+
+async def test_upgrade_timestamp_columns(postgres_engine: AsyncEngine) -> None:
+    """Test that columns created without a time zone are converted, keeping their UTC values."""
+    async with postgres_engine.begin() as connection:
+        await connection.execute(
+            text("ALTER TABLE blobs ALTER COLUMN updated_at TYPE TIMESTAMP WITHOUT TIME ZONE")
+        )
+        await connection.execute(
+            text(
+                "INSERT INTO blobs (digest, size, ref_count, created_at, updated_at)"
+                " VALUES (:digest, 1, 0, now(), '2024-01-01 12:00:00')"
+            ),
+            {"digest": "c" * 64},
+        )
+        converted = await connection.run_sync(upgrade_timestamp_columns)
+        again = await connection.run_sync(upgrade_timestamp_columns)
+
+    async with AsyncSession(postgres_engine) as session:
+        blob = await session.get(Blob, "c" * 64)
+
+    assert converted == ["blobs.updated_at"]
+    assert again == []
+    assert blob.updated_at.isoformat() == "2024-01-01T12:00:00+00:00"
@@ -0,0 +1,67 @@
+import io
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from PIL import Image
+from sqlmodel import Session
+
+from backend.src.models.file import File
+from backend.src.models.workspace import Workspace
+from backend.src.services.previews import render_previews
+from backend.src.services.signed_urls import sign_preview
+
+
+def encode(image: Image.Image, format: str) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=format)
+    return buffer.getvalue()
+
+
+def test_render_previews_of_images_and_pdfs() -> None:
+    """Test that images and PDF first pages are scaled to fit each size, but never up."""
+    photo = encode(Image.new("RGB", (1200, 600), "red"), "JPEG")
+    pdf = encode(Image.new("RGB", (400, 800), "white"), "PDF")
+
+    photo_previews = render_previews(photo, "image/jpeg", (160, 480, 2000))
+    pdf_previews = render_previews(pdf, "application/pdf; charset=binary", (160, 480))
+
+    sizes = {size: Image.open(io.BytesIO(data)).size for size, data in photo_previews.items()}
+    assert sizes == {2000: (1200, 600), 480: (480, 240), 160: (160, 80)}
+    pdf_preview = Image.open(io.BytesIO(pdf_previews[160]))
+    assert (pdf_preview.format, pdf_preview.size) == ("WEBP", (80, 160))
+
+
+def test_upload_generates_cacheable_thumbnail(
+    client: TestClient, session: Session, workspace: Workspace, auth_headers: dict[str, str]
+) -> None:
+    """Test that an uploaded image gets a cacheable thumbnail, served through a signed URL."""
+    url = f"/api/workspaces/{workspace.id}/files/import/google-drive"
+    image = encode(Image.new("RGBA", (800, 800), (0, 128, 255, 128)), "PNG")
+
+    uploaded = client.post(
+        url, files={"file": ("logo.png", image, "image/png")}, headers=auth_headers
+    )
+    text = client.post(url, files={"file": ("a.txt", b"text", "text/plain")}, headers=auth_headers)
+
+    db_file = session.get(File, uploaded.json()["id"])
+    assert db_file.thumbnail_url == f"/api/files/previews/{db_file.blob_digest}/480"
+    assert session.get(File, text.json()["id"]).thumbnail_url is None
+
+    listed = client.get(url.removesuffix("import/google-drive"), headers=auth_headers).json()
+    thumbnail_url = next(file["thumbnailUrl"] for file in listed if file["id"] == db_file.id)
+    assert db_file.blob_digest not in thumbnail_url
+    preview = client.get(thumbnail_url)
+    assert preview.status_code == status.HTTP_200_OK
+    assert preview.headers["content-type"] == "image/webp"
+    assert preview.headers["cache-control"].startswith("private, max-age=")
+    assert Image.open(io.BytesIO(preview.content)).size == (480, 480)
+
+    revalidated = client.get(thumbnail_url, headers={"If-None-Match": preview.headers["etag"]})
+    assert revalidated.status_code == status.HTTP_304_NOT_MODIFIED
+    # Knowing the content is not enough to fetch its preview
+    assert client.get(db_file.thumbnail_url).status_code == status.HTTP_404_NOT_FOUND
+    assert client.get(f"{thumbnail_url}x").status_code == status.HTTP_403_FORBIDDEN
+    expired = sign_preview(db_file.blob_digest, 480, expires_in=-10)
+    assert client.get(f"/api/files/previews/{expired}").status_code == 403
+    other_size = sign_preview(db_file.blob_digest, 100)
+    assert client.get(f"/api/files/previews/{other_size}").status_code == 404
@@ -0,0 +1,146 @@
+import shutil
+from collections.abc import Callable, Generator
+from pathlib import Path
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+from sqlalchemy import NullPool
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import Session
+
+from backend.src.asgi import app
+from backend.src.config.settings import app_settings
+from backend.src.database.routing import ReplicaSet, recent_writers
+from backend.src.database.session import get_read_session, open_session
+from backend.src.models.workspace import Workspace
+
+
+@pytest.fixture(name="use_replicas")
+def use_replicas_fixture(
+    client: TestClient, async_engine: AsyncEngine
+) -> Generator[Callable[[list[AsyncEngine]], ReplicaSet]]:
+    """Route the app's read-only sessions to the given replica engines."""
+
+    def use_replicas(engines: list[AsyncEngine]) -> ReplicaSet:
+        replicas = ReplicaSet(engines, cooldown=30)
+
+        async def get_read_session_override(request: Request):
+            async with open_session(async_engine, replicas, request.state, read_only=True) as s:
+                yield s
+
+        app.dependency_overrides[get_read_session] = get_read_session_override
+        return replicas
+
+    recent_writers.clear()
+    yield use_replicas
+    recent_writers.clear()
+
+
+@pytest.fixture(name="replica")
+def replica_fixture(
+    workspace: Workspace, database_path: Path, tmp_path: Path, use_replicas
+) -> Generator[AsyncEngine]:
+    """A replica holding a snapshot of the database taken after setup."""
+    replica_path = tmp_path / "replica.db"
+    shutil.copy(database_path, replica_path)
+    replica = create_async_engine(f"sqlite+aiosqlite:///{replica_path}", poolclass=NullPool)
+    use_replicas([replica])
+    yield replica
+    replica.sync_engine.dispose()
+
+
+def rename_on_primary(session: Session, workspace: Workspace, name: str) -> None:
+    """Change the primary behind the replica's back, simulating replication lag."""
+    workspace.name = name
+    session.add(workspace)
+    session.commit()
+
+
+def listed_names(client: TestClient, auth_headers: dict[str, str]) -> list[str]:
+    response = client.get("/api/workspaces/", headers=auth_headers)
+    assert response.status_code == 200
+    return [workspace["name"] for workspace in response.json()]
+
+
+def test_reads_are_served_by_replica(
+    client: TestClient,
+    session: Session,
+    workspace: Workspace,
+    replica: AsyncEngine,
+    auth_headers: dict[str, str],
+) -> None:
+    """Test that read-only routes query the replica."""
+    rename_on_primary(session, workspace, "Renamed on primary")
+
+    assert listed_names(client, auth_headers) == ["Deal Room"]
+
+
+def test_reads_after_write_stick_to_primary(
+    client: TestClient, workspace: Workspace, replica: AsyncEngine, auth_headers: dict[str, str]
+) -> None:
+    """Test that a user who just wrote reads their own writes."""
+    response = client.put(
+        f"/api/workspaces/{workspace.id}", json={"name": "Renamed"}, headers=auth_headers
+    )
+
+    assert response.status_code == 200
+    assert listed_names(client, auth_headers) == ["Renamed"]
+
+
+def test_reads_after_core_write_stick_to_primary(
+    client: TestClient, workspace: Workspace, replica: AsyncEngine, auth_headers: dict[str, str]
+) -> None:
+    """Test that writes made by DML statements, without a flush, also make reads sticky."""
+    # Batch uploads insert files and update usage counters with statements only
+    response = client.post(
+        f"/api/workspaces/{workspace.id}/files/batch",
+        files=[("files", ("a.txt", b"123"))],
+        headers=auth_headers,
+    )
+    listed = client.get("/api/workspaces/", headers=auth_headers).json()
+
+    assert response.status_code == 200
+    assert [workspace["fileCount"] for workspace in listed] == [1]
+
+
+def test_cached_pages_are_built_on_primary(
+    client: TestClient,
+    workspace: Workspace,
+    replica: AsyncEngine,
+    auth_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a listing missing from the response cache is not cached from a lagging replica."""
+    monkeypatch.setattr(app_settings, "RESPONSE_CACHE_BACKEND", "memory")
+    url = f"/api/workspaces/{workspace.id}/files/"
+    client.post(
+        f"{url}import/google-drive", files={"file": ("a.txt", b"123")}, headers=auth_headers
+    )
+    # Once the writer is no longer sticky, its reads may go to the replica again
+    recent_writers.clear()
+
+    listed = client.get(url, headers=auth_headers).json()
+
+    assert [file["name"] for file in listed] == ["a.txt"]
+
+
+def test_unhealthy_replica_falls_back_to_primary(
+    client: TestClient,
+    session: Session,
+    workspace: Workspace,
+    use_replicas,
+    auth_headers: dict[str, str],
+    tmp_path: Path,
+) -> None:
+    """Test that a replica failing to connect is skipped and reads go to the primary."""
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db")
+    replicas = use_replicas([broken])
+    rename_on_primary(session, workspace, "Renamed on primary")
+
+    with pytest.raises(OperationalError):
+        listed_names(client, auth_headers)
+
+    assert replicas.choose() is None
+    assert listed_names(client, auth_headers) == ["Renamed on primary"]
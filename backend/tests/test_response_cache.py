@@ -0,0 +1,161 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.src.config.settings import app_settings
+from backend.src.models.workspace import Workspace
+from backend.src.services.response_cache import CachedPage, ResponseCache, get_response_cache
+from backend.src.services.response_cache.redis import RedisCacheBackend
+from backend.src.types.roles import RoleEnum
+
+
+@pytest.fixture(autouse=True)
+def memory_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Enable the in-process response cache, which is off by default."""
+    monkeypatch.setattr(app_settings, "RESPONSE_CACHE_BACKEND", "memory")
+
+
+class FakeRedis:
+    """In-memory stand-in for the subset of `redis.asyncio.Redis` used by the backend."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.closed = False
+
+    async def get(self, key: str) -> bytes | None:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: bytes, px: int | None = None, nx: bool = False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = True):
+        commands = []
+
+        class Pipeline:
+            def set(self, *args, **kwargs) -> None:
+                commands.append((args, kwargs))
+
+            async def execute(pipeline) -> None:
+                for args, kwargs in commands:
+                    await self.set(*args, **kwargs)
+
+        yield Pipeline()
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def test_file_listing_cache(
+    client: TestClient, workspace: Workspace, auth_headers: dict[str, str], count_queries
+) -> None:
+    """Test that file listings are served from the cache until files are uploaded or deleted."""
+    url = f"/api/workspaces/{workspace.id}/files/"
+    first = client.get(url, headers=auth_headers)
+
+    with count_queries() as queries:
+        cached = client.get(url, headers=auth_headers)
+        not_modified = client.get(
+            url, headers={**auth_headers, "If-None-Match": first.headers["ETag"]}
+        )
+
+    assert cached.json() == first.json() == []
+    assert first.headers["ETag"].startswith('W/"')
+    assert cached.headers["ETag"] == first.headers["ETag"]
+    assert (not_modified.status_code, not_modified.content) == (304, b"")
+    assert queries == []
+
+    uploaded = client.post(
+        f"{url}import/google-drive", files={"file": ("a.txt", b"123")}, headers=auth_headers
+    )
+    after_upload = client.get(url, headers={**auth_headers, "If-None-Match": first.headers["ETag"]})
+    assert after_upload.status_code == 200
+    assert [file["name"] for file in after_upload.json()] == ["a.txt"]
+
+    client.delete(f"{url}{uploaded.json()['id']}", headers=auth_headers)
+    assert client.get(url, headers=auth_headers).json() == []
+
+
+def test_workspace_listing_invalidation(
+    client: TestClient,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    outsider_headers: dict[str, str],
+) -> None:
+    """Test that changes to a workspace refresh the cached workspace lists of all its members."""
+
+    def names(headers: dict[str, str]) -> list[str]:
+        return [
+            workspace["name"]
+            for workspace in client.get("/api/workspaces/", headers=headers).json()
+        ]
+
+    assert names(outsider_headers) == []
+    client.post(
+        f"/api/workspaces/{workspace.id}/members",
+        json={"email": "outsider@example.com", "role": RoleEnum.USER.value},
+        headers=auth_headers,
+    )
+    assert names(outsider_headers) == ["Deal Room"]
+
+    client.put(f"/api/workspaces/{workspace.id}", json={"name": "Renamed"}, headers=auth_headers)
+    assert names(outsider_headers) == ["Renamed"]
+
+    client.post("/api/workspaces/", json={"name": "Second"}, headers=auth_headers)
+    assert names(auth_headers) == ["Renamed", "Second"]
+
+    assert client.delete(f"/api/workspaces/{workspace.id}", headers=auth_headers).status_code == 202
+    assert names(outsider_headers) == []
+    assert names(auth_headers) == ["Second"]
+
+
+def test_disabled_response_cache(
+    client: TestClient,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that listings still carry ETags when the response cache is disabled."""
+    monkeypatch.setattr(app_settings, "RESPONSE_CACHE_BACKEND", "none")
+    get_response_cache.cache_clear()
+    first = client.get("/api/workspaces/", headers=auth_headers)
+
+    second = client.get(
+        "/api/workspaces/", headers={**auth_headers, "If-None-Match": first.headers["ETag"]}
+    )
+
+    assert get_response_cache() is None
+    assert [workspace["name"] for workspace in first.json()] == ["Deal Room"]
+    assert second.status_code == 304
+
+
+async def test_redis_backend() -> None:
+    """Test versioned pages on the Redis backend, and that its failures only cause misses."""
+    client = FakeRedis()
+    response_cache = ResponseCache(RedisCacheBackend(client), ttl=60)
+    page = CachedPage(body=b"[]", next_cursor="abc")
+
+    version = await response_cache.version("workspace:1")
+    assert await response_cache.version("workspace:1") == version
+    await response_cache.set(response_cache.key(version, "files"), page)
+    assert await response_cache.get(response_cache.key(version, "files")) == page
+
+    await response_cache.invalidate(["workspace:1"])
+    assert await response_cache.version("workspace:1") != version
+    assert all(key.startswith("dataroom:cache:") for key in client.values)
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("Connection refused")
+
+    client.get = unavailable
+    assert await response_cache.get(response_cache.key(version, "files")) is None
+    # Each failed read gets a fresh version, so nothing cached under it is served
+    assert await response_cache.version("workspace:1") != await response_cache.version(
+        "workspace:1"
+    )
+    await response_cache.close()
+    assert client.closed
@@ -0,0 +1,133 @@
+import io
+import zipfile
+from xml.sax.saxutils import escape
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import Session
+
+from backend.src.models.file import File
+from backend.src.models.user import User
+from backend.src.models.workspace import Workspace, WorkspaceMember
+from backend.src.services.maintenance import index_missing_files
+from backend.src.services.storage import get_storage
+from backend.src.services.text_extraction import DOCX_MEDIA_TYPE, extract_text
+from backend.src.types.roles import RoleEnum
+
+PDF = b"""%PDF-1.4
+1 0 obj <</Type/Catalog/Pages 2 0 R>> endobj
+2 0 obj <</Type/Pages/Kids[3 0 R]/Count 1>> endobj
+3 0 obj <</Type/Page/Parent 2 0 R/MediaBox[0 0 300 100]/Contents 4 0 R
+/Resources<</Font<</F1 5 0 R>>>>>> endobj
+4 0 obj <</Length 49>> stream
+BT /F1 12 Tf 10 50 Td (Quarterly revenue grew) Tj ET
+endstream endobj
+5 0 obj <</Type/Font/Subtype/Type1/BaseFont/Helvetica>> endobj
+trailer <</Root 1 0 R>>
+%%EOF"""
+
+
+def docx(*paragraphs: str) -> bytes:
+    namespace = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    body = "".join(f"<w:p><w:r><w:t>{escape(text)}</w:t></w:r></w:p>" for text in paragraphs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(
+            "word/document.xml",
+            f'<w:document xmlns:w="{namespace}"><w:body>{body}</w:body></w:document>',
+        )
+    return buffer.getvalue()
+
+
+def test_extract_text_from_documents() -> None:
+    """Test that PDF, DOCX and plain text are extracted, cleaned and truncated."""
+    assert "Quarterly revenue grew" in extract_text(PDF, "application/pdf", 1000)
+    assert extract_text(docx("Term sheet", "Closing"), DOCX_MEDIA_TYPE, 1000) == (
+        "Term sheet\nClosing\n"
+    )
+    assert extract_text(b"plain\x00text", "text/plain; charset=utf-8", 8) == "plain te"
+    assert extract_text(b"\x89PNG", "image/png", 1000) == ""
+
+
+def test_search_ranks_highlights_and_scopes(
+    client: TestClient,
+    session: Session,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    outsider_headers: dict[str, str],
+) -> None:
+    """Test that search ranks name matches first, escapes snippets and hides other workspaces."""
+    url = f"/api/workspaces/{workspace.id}/files/import/google-drive"
+    uploads = [
+        ("revenue.txt", b"Figures for the board", "text/plain"),
+        ("report.pdf", PDF, "application/pdf"),
+        ("memo.docx", docx("Revenue <script> was up"), DOCX_MEDIA_TYPE),
+        ("minutes.txt", b"Nothing relevant", "text/plain"),
+    ]
+    ids = {
+        name: client.post(url, files={"file": (name, content, type_)}, headers=auth_headers).json()[
+            "id"
+        ]
+        for name, content, type_ in uploads
+    }
+
+    response = client.get("/api/search/", params={"q": "revenue"}, headers=auth_headers)
+    hidden = client.get("/api/search/", params={"q": "revenue"}, headers=outsider_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    results = response.json()
+    assert [result["file"]["id"] for result in results][0] == ids["revenue.txt"]
+    assert {result["file"]["id"] for result in results} == {
+        ids["revenue.txt"],
+        ids["report.pdf"],
+        ids["memo.docx"],
+    }
+    memo = next(result for result in results if result["file"]["id"] == ids["memo.docx"])
+    assert "<mark>Revenue</mark> &lt;script&gt;" in memo["snippet"]
+    assert hidden.json() == []
+
+
+async def test_search_pages_files_indexed_by_maintenance(
+    client: TestClient,
+    session: Session,
+    async_engine: AsyncEngine,
+    user: User,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    collect_pages,
+) -> None:
+    """Test that files missing from the index are caught up and paged through by relevance."""
+    other = Workspace(name="Other", created_by=user.id)
+    session.add(other)
+    session.commit()
+    session.add(WorkspaceMember(workspace_id=other.id, user_id=user.id, role=RoleEnum.ADMIN))
+    session.add_all(
+        File(
+            name=f"contract-{index}.bin",
+            file_path=f"{target.id}/contract-{index}.bin",
+            workspace_id=target.id,
+            uploaded_by=user.id,
+        )
+        for index, target in enumerate([workspace, workspace, workspace, other, other])
+    )
+    session.commit()
+
+    indexed = await index_missing_files(async_engine, get_storage(), batch_size=2, pause=0)
+    pages = collect_pages("/api/search/", auth_headers, q="contract", limit=2)
+    scoped = client.get(
+        "/api/search/",
+        params={"q": "contract", "workspace_id": other.id},
+        headers=auth_headers,
+    )
+    invalid = client.get(
+        "/api/search/", params={"q": "contract", "cursor": "bogus"}, headers=auth_headers
+    )
+
+    assert indexed == 5
+    assert await index_missing_files(async_engine, get_storage(), batch_size=2, pause=0) == 0
+    ids = [result["file"]["id"] for page in pages for result in page]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert len(set(ids)) == 5
+    assert {result["file"]["workspaceId"] for result in scoped.json()} == {other.id}
+    assert invalid.status_code == status.HTTP_400_BAD_REQUEST
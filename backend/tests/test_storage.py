@@ -0,0 +1,159 @@
+from collections.abc import AsyncIterator, Generator
+from pathlib import Path
+
+import boto3
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from moto import mock_aws
+
+from backend.src.asgi import app
+from backend.src.models.workspace import Workspace
+from backend.src.services.storage import LocalStorageBackend, StorageBackend, get_storage
+from backend.src.services.storage.s3 import S3_MIN_PART_SIZE, S3StorageBackend
+
+
+async def stream(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def collect(chunks: AsyncIterator[bytes]) -> bytes:
+    return b"".join([chunk async for chunk in chunks])
+
+
+@pytest.fixture(name="s3_backend")
+def s3_backend_fixture() -> Generator[S3StorageBackend]:
+    """S3 backend talking to an in-process moto stand-in."""
+    with mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="dataroom-test")
+        yield S3StorageBackend(bucket="dataroom-test", prefix="files", client=client)
+
+
+@pytest.fixture(name="backend", params=["local", "s3"])
+def backend_fixture(request: pytest.FixtureRequest, storage_path: Path) -> StorageBackend:
+    """Run each test against every storage driver."""
+    if request.param == "s3":
+        return request.getfixturevalue("s3_backend")
+    return LocalStorageBackend(storage_path)
+
+
+async def test_write_read_and_range(backend: StorageBackend) -> None:
+    """Test streaming writes, full reads and range reads."""
+    size = await backend.write("docs/a.txt", stream(b"hello ", b"data ", b"room"))
+
+    assert size == 15
+    assert await backend.exists("docs/a.txt")
+    assert await backend.size("docs/a.txt") == 15
+    assert await collect(backend.read("docs/a.txt", chunk_size=4)) == b"hello data room"
+    assert await collect(backend.read_range("docs/a.txt", 6, 4)) == b"data"
+
+
+async def test_move_and_delete(backend: StorageBackend) -> None:
+    """Test moving content between keys and deleting by key and prefix."""
+    await backend.write("tmp/a", stream(b"a"))
+    await backend.write("7/b", stream(b"b"))
+    await backend.write("7/c", stream(b"c"))
+
+    await backend.move("tmp/a", "blobs/a")
+    await backend.delete_prefix("7/")
+    await backend.delete("missing")
+
+    assert not await backend.exists("tmp/a")
+    assert await collect(backend.read("blobs/a")) == b"a"
+    assert not await backend.exists("7/b")
+    assert not await backend.exists("7/c")
+
+
+async def test_list_keys(backend: StorageBackend) -> None:
+    """Test listing keys under a prefix."""
+    await backend.write("tmp/a", stream(b"a"))
+    await backend.write("tmp/nested/b", stream(b"bb"))
+    await backend.write("blobs/c", stream(b"c"))
+
+    listed = {item.key: item.size async for item in backend.list_keys("tmp/")}
+
+    assert listed == {"tmp/a": 1, "tmp/nested/b": 2}
+
+
+async def test_multipart_upload(backend: StorageBackend) -> None:
+    """Test assembling an object from parts."""
+    first = b"x" * backend.min_part_size
+    upload_id = await backend.create_multipart("tmp/upload")
+
+    parts = [
+        await backend.upload_part("tmp/upload", upload_id, 1, 0, stream(first)),
+        await backend.upload_part("tmp/upload", upload_id, 2, len(first), stream(b"tail")),
+    ]
+    await backend.complete_multipart("tmp/upload", upload_id, parts)
+
+    assert await backend.size("tmp/upload") == len(first) + 4
+    assert await collect(backend.read_range("tmp/upload", len(first), 4)) == b"tail"
+
+
+async def test_multipart_part_limit(backend: StorageBackend) -> None:
+    """Test that parts larger than the allowed limit are rejected."""
+    upload_id = await backend.create_multipart("tmp/upload")
+
+    with pytest.raises(ValueError):
+        await backend.upload_part("tmp/upload", upload_id, 1, 0, stream(b"abc"), limit=2)
+
+    await backend.abort_multipart("tmp/upload", upload_id)
+
+
+async def test_s3_large_write_uses_multipart(s3_backend: S3StorageBackend) -> None:
+    """Test that writes larger than a part are streamed as a multipart upload."""
+    chunk = b"y" * (1024 * 1024)
+    chunks = [chunk] * (S3_MIN_PART_SIZE // len(chunk) + 1)
+
+    size = await s3_backend.write("big", stream(*chunks))
+
+    assert size == len(chunk) * len(chunks)
+    assert await s3_backend.size("big") == size
+
+
+async def test_presigned_urls(s3_backend: S3StorageBackend, storage_path: Path) -> None:
+    """Test that only the S3 driver hands out presigned download URLs."""
+    await s3_backend.write("report.pdf", stream(b"%PDF"))
+
+    url = await s3_backend.presigned_url(
+        "report.pdf", filename="Q3 report.pdf", media_type="application/pdf", expires_in=60
+    )
+
+    assert url is not None
+    query = httpx.URL(url).params
+    assert "files/report.pdf" in url
+    assert query["response-content-type"] == "application/pdf"
+    assert await LocalStorageBackend(storage_path).presigned_url("a", "a", "a", 60) is None
+
+
+def test_routes_use_configured_backend(
+    client: TestClient,
+    s3_backend: S3StorageBackend,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+) -> None:
+    """Test that uploads land in the selected backend and downloads redirect to it."""
+    app.dependency_overrides[get_storage] = lambda: s3_backend
+    files_url = f"/api/workspaces/{workspace.id}/files"
+
+    response = client.post(
+        f"{files_url}/import/google-drive",
+        files={"file": ("memo.txt", b"memo", "text/plain")},
+        headers=auth_headers,
+    )
+    file_id = response.json()["id"]
+    key = response.json()["filePath"]
+
+    assert (
+        s3_backend.client.get_object(Bucket="dataroom-test", Key=f"files/{key}")["Body"].read()
+        == b"memo"
+    )
+
+    response = client.get(
+        f"{files_url}/{file_id}/download", headers=auth_headers, follow_redirects=False
+    )
+
+    assert response.status_code == 307
+    assert key in response.headers["location"]
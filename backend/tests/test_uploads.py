@@ -0,0 +1,121 @@
+from pathlib import Path
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from backend.src.models.file import File
+from backend.src.models.upload_session import UploadSession
+from backend.src.models.workspace import Workspace
+
+CONTENT = b"deal archive " * 100
+
+
+def start_upload(client: TestClient, workspace: Workspace, headers: dict[str, str]) -> dict:
+    response = client.post(
+        f"/api/workspaces/{workspace.id}/files/uploads/",
+        json={"filename": "archive.zip", "size": len(CONTENT), "mimeType": "application/zip"},
+        headers=headers,
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    return response.json()
+
+
+def test_chunked_upload_roundtrip(
+    client: TestClient,
+    session: Session,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    storage_path: Path,
+) -> None:
+    """Test uploading a file in chunks and completing it."""
+    upload = start_upload(client, workspace, auth_headers)
+    assert upload["offset"] == 0
+    url = f"/api/workspaces/{workspace.id}/files/uploads/{upload['id']}"
+
+    for offset in range(0, len(CONTENT), 500):
+        response = client.put(
+            url,
+            params={"offset": offset},
+            content=CONTENT[offset : offset + 500],
+            headers=auth_headers,
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["offset"] == min(offset + 500, len(CONTENT))
+
+    response = client.post(f"{url}/complete", headers=auth_headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    data = response.json()
+    assert data["name"] == "archive.zip"
+    assert data["fileSize"] == len(CONTENT)
+
+    db_file = session.get(File, data["id"])
+    assert (storage_path / db_file.file_path).read_bytes() == CONTENT
+    assert session.exec(select(UploadSession)).first() is None
+
+
+def test_chunked_upload_resume_reports_offset(
+    client: TestClient, workspace: Workspace, auth_headers: dict[str, str]
+) -> None:
+    """Test that a client can resume from the offset the server already has."""
+    upload = start_upload(client, workspace, auth_headers)
+    url = f"/api/workspaces/{workspace.id}/files/uploads/{upload['id']}"
+
+    client.put(url, params={"offset": 0}, content=CONTENT[:300], headers=auth_headers)
+
+    status_response = client.get(url, headers=auth_headers)
+    assert status_response.json()["offset"] == 300
+
+    response = client.put(url, params={"offset": 0}, content=CONTENT[:300], headers=auth_headers)
+    assert response.status_code == status.HTTP_409_CONFLICT
+    assert response.headers["Upload-Offset"] == "300"
+
+    response = client.put(url, params={"offset": 300}, content=CONTENT[300:], headers=auth_headers)
+    assert response.json()["offset"] == len(CONTENT)
+
+
+def test_chunked_upload_rejects_incomplete_and_oversized(
+    client: TestClient, workspace: Workspace, auth_headers: dict[str, str]
+) -> None:
+    """Test that incomplete uploads cannot be finalized and extra bytes are refused."""
+    upload = start_upload(client, workspace, auth_headers)
+    url = f"/api/workspaces/{workspace.id}/files/uploads/{upload['id']}"
+
+    client.put(url, params={"offset": 0}, content=CONTENT[:10], headers=auth_headers)
+    response = client.post(f"{url}/complete", headers=auth_headers)
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    response = client.put(url, params={"offset": 10}, content=CONTENT + b"x", headers=auth_headers)
+    assert response.status_code == status.HTTP_413_CONTENT_TOO_LARGE
+
+
+def test_abort_upload_removes_partial_file(
+    client: TestClient,
+    session: Session,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    storage_path: Path,
+) -> None:
+    """Test that aborting an upload discards its partial data."""
+    upload = start_upload(client, workspace, auth_headers)
+    url = f"/api/workspaces/{workspace.id}/files/uploads/{upload['id']}"
+    temp_path = storage_path / session.get(UploadSession, upload["id"]).storage_key
+    assert temp_path.exists()
+
+    response = client.delete(url, headers=auth_headers)
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not temp_path.exists()
+
+
+def test_upload_requires_membership(
+    client: TestClient, workspace: Workspace, outsider_headers: dict[str, str]
+) -> None:
+    """Test that non-members cannot start uploads."""
+    response = client.post(
+        f"/api/workspaces/{workspace.id}/files/uploads/",
+        json={"filename": "a.txt", "size": 1},
+        headers=outsider_headers,
+    )
+    assert response.status_code == status.HTTP_403_FORBIDDEN
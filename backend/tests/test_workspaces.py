@@ -0,0 +1,175 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from backend.src.models.file import File
+from backend.src.models.user import User
+from backend.src.models.workspace import Workspace, WorkspaceMember
+from backend.src.types.roles import RoleEnum
+
+
+@pytest.fixture(name="members")
+def members_fixture(session: Session, user: User) -> list[User]:
+    """Create three workspaces shared by the test user and three other members."""
+    members = [
+        User(
+            email=f"member{index}@example.com",
+            full_name=f"Member {index}",
+            google_user_id=f"g{index}",
+        )
+        for index in range(3)
+    ]
+    session.add_all(members)
+    session.commit()
+
+    for index in range(3):
+        workspace = Workspace(name=f"Room {index}", created_by=user.id)
+        session.add(workspace)
+        session.commit()
+        session.add(
+            WorkspaceMember(workspace_id=workspace.id, user_id=user.id, role=RoleEnum.ADMIN)
+        )
+        session.add_all(
+            WorkspaceMember(workspace_id=workspace.id, user_id=member.id) for member in members
+        )
+    session.commit()
+    return members
+
+
+def warm_up(client: TestClient, auth_headers: dict[str, str]) -> None:
+    """Authenticate once so the token cache keeps auth queries out of the counts."""
+    assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+
+
+def test_list_workspaces_query_count(
+    client: TestClient, members: list[User], auth_headers: dict[str, str], count_queries
+) -> None:
+    """Test that listing workspaces loads all members in a constant number of queries."""
+    warm_up(client, auth_headers)
+
+    with count_queries() as queries:
+        response = client.get("/api/workspaces/", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    assert all(len(workspace["members"]) == 4 for workspace in response.json())
+    assert len(queries) == 2
+
+
+def test_update_workspace_query_count(
+    client: TestClient, members: list[User], auth_headers: dict[str, str], count_queries
+) -> None:
+    """Test that updating a workspace reloads its members in one query."""
+    warm_up(client, auth_headers)
+    workspace_id = client.get("/api/workspaces/", headers=auth_headers).json()[0]["id"]
+
+    with count_queries() as queries:
+        response = client.put(
+            f"/api/workspaces/{workspace_id}", json={"name": "Renamed"}, headers=auth_headers
+        )
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed"
+    assert len(response.json()["members"]) == 4
+    # Authorize, load, update, then reload with members
+    assert len(queries) == 5
+
+
+def test_add_member_query_count(
+    client: TestClient,
+    session: Session,
+    workspace: Workspace,
+    members: list[User],
+    auth_headers: dict[str, str],
+    count_queries,
+) -> None:
+    """Test that adding a member builds the response without per-member queries."""
+    warm_up(client, auth_headers)
+    url = f"/api/workspaces/{workspace.id}/members"
+    email = members[0].email
+
+    with count_queries() as queries:
+        response = client.post(
+            url,
+            json={"email": email, "role": RoleEnum.USER.value},
+            headers=auth_headers,
+        )
+
+    assert response.status_code == 200
+    assert {member["email"] for member in response.json()["members"]} == {
+        "owner@example.com",
+        email,
+    }
+    # Workspace, user, existing membership, insert, then reload with members
+    assert len(queries) == 6
+
+
+def test_list_workspaces_pagination(
+    members: list[User], auth_headers: dict[str, str], collect_pages
+) -> None:
+    """Test walking workspaces page by page in both sort orders."""
+    pages = collect_pages("/api/workspaces/", auth_headers, limit=2)
+    newest_first = collect_pages("/api/workspaces/", auth_headers, limit=2, order="desc")
+
+    assert [len(page) for page in pages] == [2, 1]
+    names = [workspace["name"] for page in pages for workspace in page]
+    assert names == ["Room 0", "Room 1", "Room 2"]
+    assert [workspace["name"] for page in newest_first for workspace in page] == names[::-1]
+
+
+def test_list_workspaces_rejects_bad_cursor(
+    client: TestClient, members: list[User], auth_headers: dict[str, str]
+) -> None:
+    """Test that malformed cursors and cursors from another sort order are rejected."""
+    cursor = client.get("/api/workspaces/", params={"limit": 1}, headers=auth_headers).headers[
+        "x-next-cursor"
+    ]
+
+    garbage = client.get("/api/workspaces/", params={"cursor": "nope"}, headers=auth_headers)
+    mismatch = client.get(
+        "/api/workspaces/", params={"cursor": cursor, "order": "desc"}, headers=auth_headers
+    )
+
+    assert garbage.status_code == 400
+    assert mismatch.status_code == 400
+
+
+def test_delete_workspace_in_background(
+    client: TestClient,
+    session: Session,
+    user: User,
+    workspace: Workspace,
+    auth_headers: dict[str, str],
+    outsider_headers: dict[str, str],
+) -> None:
+    """Test that deleting a workspace hides it at once and purges its files in the background."""
+    workspace_id = workspace.id
+    session.add_all(
+        File(
+            name=f"file-{index}.txt",
+            file_path=f"{workspace_id}/file-{index}.txt",
+            file_size=1,
+            workspace_id=workspace_id,
+            uploaded_by=user.id,
+        )
+        for index in range(3)
+    )
+    workspace.file_count = 3
+    session.add(workspace)
+    session.commit()
+
+    response = client.delete(f"/api/workspaces/{workspace_id}", headers=auth_headers)
+
+    assert response.status_code == 202
+    assert response.json()["totalFiles"] == 3
+    deletion_url = f"/api/workspaces/deletions/{response.json()['id']}"
+    progress = client.get(deletion_url, headers=auth_headers).json()
+    assert progress["status"] == "completed"
+    assert progress["deletedFiles"] == 3
+    assert client.get(deletion_url, headers=outsider_headers).status_code == 404
+    assert client.delete(f"/api/workspaces/{workspace_id}", headers=auth_headers).status_code == 404
+
+    session.expire_all()
+    assert session.get(Workspace, workspace_id) is None
+    assert session.exec(select(File)).all() == []
+    assert session.exec(select(WorkspaceMember)).all() == []
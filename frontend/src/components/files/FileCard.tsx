@@ -1,6 +1,11 @@
 import type { DataRoomFile } from "@/types/file";
 import { Card, CardContent } from "../ui/card";
-import { formatBytes, formatDate, getFileIcon } from "@/lib/utils";
+import {
+  formatBytes,
+  formatDate,
+  getFileIcon,
+  resolveApiUrl,
+} from "@/lib/utils";
 import { FileActions } from "./FileActions";
 
 export interface FileCardProps {
@@ -50,7 +55,7 @@ export function FileCard({
         {file.thumbnailUrl && (
           <div className="mt-3 aspect-video bg-muted rounded-md overflow-hidden">
             <img
-              src={file.thumbnailUrl}
+              src={resolveApiUrl(file.thumbnailUrl)}
               alt={file.name}
               className="w-full h-full object-cover"
             />
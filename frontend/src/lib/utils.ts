@@ -1,5 +1,6 @@
 import { clsx, type ClassValue } from "clsx";
 import { twMerge } from "tailwind-merge";
+import { CONFIG } from "./config";
 
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs));
@@ -66,3 +67,8 @@ export function getFileType(mimeType?: string | null) {
       mimeType.includes("ms-powerpoint"),
   };
 }
+
+// Previews generated by the backend are linked by path; resolve them against the API host
+export function resolveApiUrl(url: string): string {
+  return new URL(url, CONFIG.BASE_URL).toString();
+}
@@ -8,10 +8,18 @@ import { downloadGoogleDriveFile } from "@/lib/googleDrive";
 
 export const fileService = {
   getAll: async (workspaceId: number): Promise<DataRoomFile[]> => {
-    const { data } = await apiClient.get<DataRoomFile[]>(
-      `/workspaces/${workspaceId}/files`
-    );
-    return data;
+    // The list is paginated; follow the next-page cursor until the last page
+    const files: DataRoomFile[] = [];
+    let cursor: string | undefined;
+    do {
+      const { data, headers } = await apiClient.get<DataRoomFile[]>(
+        `/workspaces/${workspaceId}/files`,
+        { params: cursor ? { cursor } : undefined }
+      );
+      files.push(...data);
+      cursor = headers["x-next-cursor"];
+    } while (cursor);
+    return files;
   },
 
   getById: async (workspaceId: number, id: number): Promise<DataRoomFile> => {
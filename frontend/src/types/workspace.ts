@@ -8,6 +8,9 @@ export interface Workspace {
   updatedAt: string;
   ownerId: number;
   members: User[];
+  fileCount?: number;
+  totalBytes?: number;
+  storageQuotaBytes?: number | null;
 }
 
 export interface CreateWorkspace {